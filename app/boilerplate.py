@@ -0,0 +1,132 @@
+"""
+Cross-page boilerplate removal for website ingestion.
+
+Navigation menus, headers, footers and cookie notices repeat on every page of a
+site. While a crawl runs, BoilerplateFilter counts on how many pages each text
+block occurs; blocks found on enough pages are treated as the site template and
+removed from every page. One copy of the template is kept as a separate page so
+the information (contact details, opening hours, ...) stays searchable.
+
+The filter buffers the first pages of a crawl to learn the template before
+releasing them, afterwards pages pass straight through.
+"""
+
+import hashlib
+import logging
+
+import config
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_URL_SUFFIX = "#site-template"
+
+
+class BoilerplateFilter:
+    """Learns text blocks repeated across the pages of one site and strips them"""
+
+    def __init__(self, site_url, min_pages=None, min_ratio=None, warmup_pages=None):
+        """
+        Args:
+            site_url: URL of the site, used for the page holding the single template copy
+            min_pages: Minimum number of pages a block must appear on to count as boilerplate
+            min_ratio: Minimum fraction of the pages seen so far a block must appear on
+            warmup_pages: Number of pages buffered to learn the template before any page is released
+        """
+        boilerplate_config = config.BOILERPLATE_CONFIG
+        self.site_url = site_url
+        self.min_pages = max(2, min_pages or boilerplate_config["min_pages"])
+        self.min_ratio = boilerplate_config["min_ratio"] if min_ratio is None else min_ratio
+        self.warmup_pages = boilerplate_config["warmup_pages"] if warmup_pages is None else warmup_pages
+
+        self._page_counts = {}  # block key -> number of pages containing it
+        self._pages_seen = 0
+        self._buffer = []
+        self._template = {}  # block key -> block text, in order of first removal
+        self._stats = {"pages": 0, "blocks": 0, "blocks_removed": 0, "chars_before": 0, "chars_after": 0}
+
+    def add(self, page):
+        """
+        Feed one extracted page ({"url", "content", "blocks"}).
+
+        Pages without "blocks" (PDF, DOCX, ...) pass through untouched.
+
+        Returns:
+            List of pages ready for indexing, with boilerplate removed from "content"
+        """
+        blocks = page.get("blocks")
+        if not blocks:
+            return [page]
+
+        self._pages_seen += 1
+        for key in {self._key(block) for block in blocks}:
+            self._page_counts[key] = self._page_counts.get(key, 0) + 1
+
+        if self._buffer is not None:
+            self._buffer.append(page)
+            if len(self._buffer) < self.warmup_pages:
+                return []
+            return self._release_buffer()
+        return [self._strip(page)]
+
+    def flush(self):
+        """
+        Release buffered pages at the end of a crawl.
+
+        Returns:
+            Remaining pages plus one page holding the removed template text (if any)
+        """
+        pages = self._release_buffer() if self._buffer else []
+        self._buffer = None
+        if self._template:
+            pages.append({"url": f"{self.site_url}{TEMPLATE_URL_SUFFIX}",
+                          "content": " ".join(self._template.values())})
+        if self._stats["blocks_removed"]:
+            logger.info(f"Removed {self._stats['blocks_removed']} boilerplate blocks from {self._stats['pages']} pages "
+                        f"({self._stats['chars_before'] - self._stats['chars_after']} characters, "
+                        f"{len(self._template)} distinct template blocks)")
+        return pages
+
+    def filter_pages(self, pages):
+        """Strip boilerplate from a complete list of pages"""
+        stripped = []
+        for page in pages:
+            stripped.extend(self.add(page))
+        stripped.extend(self.flush())
+        return stripped
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        stats["template_blocks"] = len(self._template)
+        return stats
+
+    def is_boilerplate(self, block):
+        count = self._page_counts.get(self._key(block), 0)
+        return count >= self.min_pages and count >= self.min_ratio * self._pages_seen
+
+    def _release_buffer(self):
+        pages = [self._strip(page) for page in self._buffer]
+        self._buffer = None
+        return pages
+
+    def _strip(self, page):
+        kept = []
+        for block in page["blocks"]:
+            if self.is_boilerplate(block):
+                self._template.setdefault(self._key(block), block)
+                self._stats["blocks_removed"] += 1
+            else:
+                kept.append(block)
+
+        content = " ".join(kept)
+        self._stats["pages"] += 1
+        self._stats["blocks"] += len(page["blocks"])
+        self._stats["chars_before"] += len(page["content"])
+        self._stats["chars_after"] += len(content)
+
+        stripped = {key: value for key, value in page.items() if key != "blocks"}
+        stripped["content"] = content
+        return stripped
+
+    @staticmethod
+    def _key(block):
+        return hashlib.blake2b(" ".join(block.lower().split()).encode("utf-8"), digest_size=8).digest()
@@ -0,0 +1,302 @@
+"""
+Pool of long-lived headless Chrome instances for JavaScript rendering.
+
+Each browser gets its own remote debugging port so several pages can be
+rendered at the same time. Browsers are checked out for one page at a time,
+health-checked before reuse and recycled after a number of pages or once their
+memory footprint grows past a limit, so crawls never pay Chrome startup for
+every page or every crawl.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+import config
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+# URL patterns blocked in smart render mode: images, fonts, media and common trackers
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav", "*.avi", "*.mov",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*facebook.net*", "*connect.facebook.com*",
+    "*hotjar.com*", "*clarity.ms*", "*segment.com*", "*mixpanel.com*",
+    "*newrelic.com*", "*nr-data.net*", "*adservice.google.com*", "*scorecardresearch.com*"
+]
+
+# Counts in-flight fetch/XHR requests so the scraper can wait for network idle
+NETWORK_TRACKER_SCRIPT = """
+(function() {
+    window.__pendingRequests = 0;
+    var done = function() { window.__pendingRequests = Math.max(0, window.__pendingRequests - 1); };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', done);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function() {
+            window.__pendingRequests++;
+            return originalFetch.apply(this, arguments).finally(done);
+        };
+    }
+})();
+"""
+
+
+def create_chrome_driver(debugging_port, page_load_timeout=30, smart_render=True):
+    """
+    Create a headless Chrome WebDriver listening on the given debugging port.
+
+    With ``smart_render`` the driver returns from ``get()`` as soon as the DOM
+    is parsed (eager page load strategy) and never downloads images, fonts,
+    media or third-party trackers.
+    """
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"--remote-debugging-port={debugging_port}")
+    options.add_argument("--disable-notifications")
+    options.add_argument("--disable-popup-blocking")
+
+    # Set user agent to mimic a real browser
+    options.add_argument(f"user-agent={USER_AGENT}")
+
+    if smart_render:
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2
+        })
+
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(page_load_timeout)
+
+    if smart_render:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER_SCRIPT})
+        except Exception as e:
+            logger.warning(f"Could not enable request blocking: {str(e)}")
+    return driver
+
+
+class PooledBrowser:
+    """A pooled WebDriver and its usage bookkeeping"""
+
+    def __init__(self, driver, port):
+        self.driver = driver
+        self.port = port
+        self.pages_rendered = 0
+        self.created_at = time.time()
+
+    def is_healthy(self):
+        """Check that the browser still responds to commands"""
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def memory_mb(self):
+        """Resident memory of chromedriver and its Chrome processes, or None if unknown"""
+        try:
+            import psutil
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except Exception:
+            return None
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """Thread-safe pool of headless Chrome browsers with checkout/return semantics"""
+
+    def __init__(self, size=None, base_port=None, max_pages_per_browser=None,
+                 max_memory_mb=None, page_load_timeout=30, smart_render=None):
+        """
+        Args:
+            size: Maximum number of browsers running at once
+            base_port: First remote debugging port, browser N uses base_port + N
+            max_pages_per_browser: Recycle a browser after rendering this many pages
+            max_memory_mb: Recycle a browser once its processes use more memory than this
+            page_load_timeout: Page load timeout in seconds for every browser
+            smart_render: Use eager loading, resource blocking and readiness detection
+                instead of fixed sleeps (defaults to BROWSER_POOL_CONFIG["smart_render"])
+        """
+        pool_config = config.BROWSER_POOL_CONFIG
+        self.size = max(1, size or pool_config["size"])
+        self.base_port = base_port or pool_config["base_port"]
+        self.max_pages_per_browser = max_pages_per_browser or pool_config["max_pages_per_browser"]
+        self.max_memory_mb = max_memory_mb or pool_config["max_memory_mb"]
+        self.page_load_timeout = page_load_timeout
+        self.smart_render = pool_config["smart_render"] if smart_render is None else smart_render
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._free_ports = [self.base_port + i for i in reversed(range(self.size))]
+        self._closed = False
+        self._stats = {"launched": 0, "recycled": 0, "unhealthy": 0, "checkouts": 0}
+
+    def acquire(self, timeout=None):
+        """
+        Check out a browser, launching one if the pool is not full yet.
+
+        Args:
+            timeout: Seconds to wait for a free browser (None waits forever)
+
+        Returns:
+            PooledBrowser or None if no browser could be obtained
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            browser = None
+            port = None
+            with self._cond:
+                if self._closed:
+                    return None
+                if self._idle:
+                    browser = self._idle.pop()
+                elif self._free_ports:
+                    port = self._free_ports.pop()
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        logger.warning("Timed out waiting for a pooled browser")
+                        return None
+                    self._cond.wait(remaining)
+                    continue
+
+            if browser is not None:
+                if browser.is_healthy():
+                    self._count("checkouts")
+                    return browser
+                logger.warning(f"Discarding unresponsive browser on port {browser.port}")
+                self._count("unhealthy")
+                self._discard(browser)
+                continue
+
+            browser = self._launch(port)
+            if browser is None:
+                with self._cond:
+                    self._free_ports.append(port)
+                    self._cond.notify()
+                return None
+            self._count("checkouts")
+            return browser
+
+    def release(self, browser, healthy=True):
+        """Return a browser to the pool, recycling it if it is worn out or broken"""
+        browser.pages_rendered += 1
+
+        recycle = not healthy
+        if healthy and browser.pages_rendered >= self.max_pages_per_browser:
+            logger.info(f"Recycling browser on port {browser.port} after {browser.pages_rendered} pages")
+            recycle = True
+        elif healthy and self.max_memory_mb:
+            memory_mb = browser.memory_mb()
+            if memory_mb is not None and memory_mb > self.max_memory_mb:
+                logger.info(f"Recycling browser on port {browser.port} using {memory_mb:.0f}MB")
+                recycle = True
+
+        if recycle:
+            self._count("recycled" if healthy else "unhealthy")
+            self._discard(browser)
+            return
+
+        with self._cond:
+            if not self._closed:
+                self._idle.append(browser)
+                self._cond.notify()
+                return
+        browser.quit()
+
+    def shutdown(self):
+        """Quit every idle browser and stop handing out new ones"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for browser in idle:
+            browser.quit()
+        if idle:
+            logger.info(f"Browser pool shut down ({len(idle)} browsers closed)")
+
+    def get_stats(self):
+        """Pool usage counters"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["idle"] = len(self._idle)
+            stats["running"] = self.size - len(self._free_ports)
+        return stats
+
+    def _launch(self, port):
+        try:
+            logger.info(f"Launching pooled Chrome browser on debugging port {port}")
+            driver = create_chrome_driver(port, page_load_timeout=self.page_load_timeout,
+                                          smart_render=self.smart_render)
+        except Exception as e:
+            logger.error(f"Error creating Selenium driver: {str(e)}")
+            return None
+        self._count("launched")
+        return PooledBrowser(driver, port)
+
+    def _discard(self, browser):
+        browser.quit()
+        with self._cond:
+            self._free_ports.append(browser.port)
+            self._cond.notify()
+
+    def _count(self, name):
+        with self._cond:
+            self._stats[name] += 1
+
+
+# Global browser pool shared by all crawls in this process
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_browser_pool():
+    """Get the process-wide browser pool, creating it if necessary"""
+    global _pool
+
+    if _pool is not None:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.shutdown)
+    return _pool
+
+def shutdown_browser_pool():
+    """Shut down the process-wide browser pool if it was created"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -1,5 +1,5 @@
 from langchain.chains import RetrievalQA
-from app.vector_store import load_vector_store, create_vector_store, get_latest_collection
+from app.vector_store import load_vector_store, create_vector_store, update_vector_store, open_page_index, get_latest_collection, hybrid_search, page_hash, page_source_key
 from langchain_community.document_loaders import (
     WebBaseLoader,
     PyPDFLoader,
@@ -17,10 +17,20 @@ import json
 import requests
 from bs4 import BeautifulSoup
 import logging
+import threading
 import urllib3
-import hashlib
-from urllib.parse import urlparse, urljoin
-from app.scraper import get_page_content, extract_links, extract_text, get_page_with_selenium, close_selenium_driver
+from app.scraper import fetch_page, render_fetch_result, extract_text_blocks
+from app.crawler import CrawlEngine
+from app.documents import DOCUMENT_TYPES, load_document
+from app.embedding_cache import CachedEmbeddings
+from app.ingest_pipeline import IngestPipeline
+from app.dedup import NearDuplicateFilter
+from app.boilerplate import BoilerplateFilter
+from app.checkpoint import CrawlCheckpoint
+from app.collection_registry import get_collection_registry
+from app.keyword_index import get_keyword_index
+from app.quantized_index import get_quantized_index
+from app.http_cache import get_http_cache
 from app.website_categorizer import WebsiteCategorizer
 
 # Set up logging
@@ -30,9 +40,6 @@ logger = logging.getLogger(__name__)
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-VECTOR_STORE_PATH = os.path.join(os.path.dirname(__file__), '..', 'chroma')
-MAPPING_FILE = os.path.join(VECTOR_STORE_PATH, 'vector_store_map.json')
-
 # Global session manager to maintain chatbot instances per chat
 class ChatSessionManager:
     """Manages chatbot instances for different chat sessions"""
@@ -50,7 +57,7 @@ class ChatSessionManager:
             if chatbot.website_url != website_url:
                 logger.info(f"🔄 Website changed from {chatbot.website_url} to {website_url}")
                 # Get collection name from URL and load vector store
-                collection_name = get_collection_name_from_url(website_url)
+                collection_name = get_collection_registry().collection_name(website_url)
                 vector_store = load_vector_store(collection_name)
                 if vector_store:
                     chatbot.vector_store = vector_store
@@ -65,7 +72,7 @@ class ChatSessionManager:
             chatbot = DynamicChatbot()
 
             # Get collection name from URL and load vector store
-            collection_name = get_collection_name_from_url(website_url)
+            collection_name = get_collection_registry().collection_name(website_url)
             vector_store = load_vector_store(collection_name)
             if vector_store:
                 chatbot.vector_store = vector_store
@@ -92,35 +99,6 @@ class ChatSessionManager:
 # Initialize global session manager
 session_manager = ChatSessionManager()
 
-def save_vector_store_mapping(website_url, collection_name):
-    # Ensure the directory exists
-    os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
-    # Load or create the mapping file
-    if os.path.exists(MAPPING_FILE):
-        with open(MAPPING_FILE, 'r') as f:
-            mapping = json.load(f)
-    else:
-        mapping = {}
-    mapping[website_url] = collection_name
-    with open(MAPPING_FILE, 'w') as f:
-        json.dump(mapping, f)
-
-def get_collection_name_from_url(website_url):
-    """Get collection name from website URL using mapping file"""
-    if os.path.exists(MAPPING_FILE):
-        with open(MAPPING_FILE, 'r') as f:
-            mapping = json.load(f)
-        collection_name = mapping.get(website_url)
-        if collection_name:
-            logger.info(f"📋 Found collection name for {website_url}: {collection_name}")
-            return collection_name
-
-    # If no mapping found, generate hash-based collection name
-    url_hash = hashlib.sha256(website_url.encode()).hexdigest()[:32]
-    collection_name = f"website_{url_hash}"
-    logger.warning(f"⚠️ No mapping found for {website_url}, using generated name: {collection_name}")
-    return collection_name
-
 class DynamicChatbot:
     def __init__(self):
         self.llm = None
@@ -194,8 +172,17 @@ class DynamicChatbot:
             logger.error(f"Error processing document: {str(e)}")
             return False, f"Error processing document: {str(e)}"
 
-    def process_website(self, url, socketio=None, sid=None, abort_checker=None):
-        """Process a website URL and create a new vector store"""
+    def process_website(self, url, socketio=None, sid=None, abort_checker=None, progress_callback=None):
+        """
+        Process a website URL and create a new vector store
+
+        Args:
+            progress_callback: Optional ``callback(pages_done=, pages_total=, chunks_embedded=, page=)``
+                called after every crawled page; ``page`` holds its url, depth, bytes and ms
+        """
+        pipeline = None
+        dedup = NearDuplicateFilter() if config.DEDUP_CONFIG["enabled"] else None
+        boilerplate = BoilerplateFilter(url) if config.BOILERPLATE_CONFIG["enabled"] else None
         try:
             # Validate URL
             if not url.startswith(('http://', 'https://')):
@@ -214,7 +201,8 @@ class DynamicChatbot:
 
             # Process main page with Selenium support
             logger.info(f"Processing main page: {url}")
-            main_content, main_error, main_type = get_page_content(url, headers, use_selenium=True)
+            main_page = fetch_page(url, headers, use_selenium=True)
+            main_content, main_error, main_type = main_page.as_tuple()
 
             if not main_content:
                 if (main_error):
@@ -223,7 +211,7 @@ class DynamicChatbot:
 
             # Website categorization to understand site structure
             if main_type == 'html':
-                self.website_categories = self.website_categorizer.analyze_content(main_content)
+                self.website_categories = self.website_categorizer.analyze_content(main_page.document)
                 logger.info(f"Website categorized as: {self.website_categories['primary_industry']} - {self.website_categories['website_type']}")
 
                 # Special handling for different website types
@@ -259,229 +247,185 @@ class DynamicChatbot:
                     is_js_heavy = True  # E-commerce sites often use heavy JS
 
             # Initialize storage for extracted text and URLs
-            all_texts = []
+            all_pages = []  # list of {"url", "content"}
             processed_urls = set()
             all_links = set()
 
             # Process the main page
             if (main_type == 'html'):
-                main_text = extract_text(main_content)
-                if main_text:
-                    all_texts.append(main_text)
-                    processed_urls.add(url)
+                if config.INGEST_PIPELINE_CONFIG["enabled"]:
+                    # Chunk, embed and upsert pages while the crawl is still running
+                    pipeline = self._start_ingest_pipeline(url, dedup, boilerplate)
 
-                # Extract links from main page
-                main_links = extract_links(main_content, url)
-
-                # If it's likely a JS-heavy site, get additional links with Selenium
-                if is_js_heavy or len(main_links) < 5:
+                # If it's likely a JS-heavy site, get additional links with Selenium (unless already rendered)
+                if is_js_heavy or len(main_page.links) < 5:
                     logger.info("Using Selenium to extract additional links from the main page")
-                    selenium_content = get_page_with_selenium(url)
-                    if selenium_content:
-                        selenium_links = extract_links(selenium_content, url)
-                        main_links.extend([link for link in selenium_links if link not in main_links])
-
-                # Remove duplicates and prioritize important links
-                main_links = list(dict.fromkeys(main_links))
-                if link_priority:
-                    prioritized = []
-                    remaining = []
-                    for link in main_links:
-                        if any(term in link.lower() for term in link_priority):
-                            prioritized.append(link)
-                        else:
-                            remaining.append(link)
-                    main_links = prioritized + remaining
+                    render_fetch_result(main_page)
+
+                main_blocks = extract_text_blocks(main_page.document)
+                if main_blocks:
+                    main_entry = {"url": url, "content": " ".join(main_blocks), "blocks": main_blocks}
+                    if pipeline:
+                        pipeline.submit(main_entry)
+                    else:
+                        all_pages.append(main_entry)
+                    processed_urls.add(url)
+
+                # Links are deduplicated, the crawl engine fetches priority links first
+                main_links = main_page.links
 
                 logger.info(f"Found {len(main_links)} unique links on the main page")
                 all_links.update(main_links)
 
-            elif main_type in ['pdf', 'docx']:
-                # Handle document files
-                try:
-                    if main_type == 'pdf':
-                        loader = PyPDFLoader(main_content)
-                    else:
-                        loader = Docx2txtLoader(main_content)
-                    docs = loader.load()
-                    for doc in docs:
-                        all_texts.append(doc.page_content)
-                    processed_urls.add(url)
+            elif main_type in DOCUMENT_TYPES:
+                # Handle document files, parsed in memory (large PDFs on the parsing process pool)
+                texts = load_document(main_content, main_type)
+                if not texts:
+                    return False, f"Error processing {main_type.upper()}: {url}"
+                all_pages.append({"url": url, "content": "\n".join(texts)})
+                processed_urls.add(url)
+
+                # For document files, we're done
+                return self._create_vector_store(url, all_pages, dedup, boilerplate, progress_callback)
+
+            def emit_progress(page_url, depth, pages_done, estimated_total, page_bytes, page_ms):
+                current = len(processed_urls) + pages_done
+                total = min(max_pages, len(processed_urls) + estimated_total)
+                if progress_callback:
+                    chunks_embedded = pipeline.chunks_embedded if pipeline else None
+                    progress_callback(
+                        pages_done=current, pages_total=total, chunks_embedded=chunks_embedded,
+                        page={"url": page_url, "depth": depth + 1, "bytes": page_bytes, "ms": round(page_ms, 1)}
+                    )
 
-                    # For document files, we're done
-                    return self._create_vector_store(url, all_texts)
-                except Exception as e:
-                    logger.warning(f"Failed to process {main_type.upper()}: {url} ({e})")
-                    return False, f"Error processing {main_type.upper()}: {e}"
-
-            # BFS crawling with multiple levels
-            to_process = main_links
-            next_level = []
-            current_depth = 0
-
-            # For progress estimation
-            total_estimated = len(to_process) + 50  # Initial estimate
-
-            # Create a list of pages we should process with Selenium (more important pages)
-            selenium_priority_urls = set()
-            if is_js_heavy:
-                # For JS-heavy sites, process more pages with Selenium
-                selenium_pages_limit = min(50, max_pages // 2)
-                for link in to_process[:selenium_pages_limit]:
-                    selenium_priority_urls.add(link)
-            else:
-                # For other sites, just use Selenium for key pages
-                for link in to_process:
-                    if any(term in link.lower() for term in link_priority):
-                        selenium_priority_urls.add(link)
-
-            while current_depth < max_depth and len(processed_urls) < max_pages:
-                if not to_process:
-                    # Move to next depth level if available
-                    if next_level:
-                        to_process = next_level
-                        next_level = []
-                        current_depth += 1
-                        logger.info(f"Moving to depth {current_depth} with {len(to_process)} links")
-                    else:
-                        break  # No more links to process
-
-                # Get next URL to process
-                if not to_process:
-                    break
-
-                current_url = to_process.pop(0)
-
-                # ABORT CHECK
-                if abort_checker and abort_checker():
-                    logger.info(f"Aborting website processing for sid {sid}")
-                    # Clean up Selenium resources
-                    close_selenium_driver()
-                    return False, "Processing aborted by user."
-
-                # Skip if already processed or points to the same page with a different fragment
-                if current_url in processed_urls:
-                    continue
-
-                parsed_url = urlparse(current_url)
-                base_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
-                if any(urlparse(p).netloc == parsed_url.netloc and urlparse(p).path == parsed_url.path for p in processed_urls):
-                    continue
-
-                # Decide whether to use Selenium for this URL
-                use_selenium_for_url = current_url in selenium_priority_urls or is_js_heavy
-
-                # Process the current URL
-                try:
-                    logger.info(f"Processing page: {current_url} (selenium: {use_selenium_for_url})")
-                    page_content, page_error, page_type = get_page_content(
-                        current_url,
-                        headers,
-                        use_selenium=use_selenium_for_url
+                # Emit progress to the frontend
+                if socketio and sid:
+                    socketio.emit(
+                        'scraping_progress',
+                        {
+                            'link': page_url,
+                            'current': current,
+                            'total': total,
+                            'depth': depth + 1,
+                            'max_depth': max_depth,
+                            'bytes': page_bytes,
+                            'ms': round(page_ms, 1)
+                        },
+                        room=sid
                     )
 
-                    if page_content and page_type == 'html':
-                        page_text = extract_text(page_content)
-                        if page_text:
-                            all_texts.append(page_text)
-                            processed_urls.add(current_url)
-
-                            # Extract links for next depth level
-                            if current_depth < max_depth - 1:
-                                new_links = extract_links(page_content, current_url)
-
-                                # For important pages, also try to get links with Selenium if we haven't already
-                                if not use_selenium_for_url and (
-                                    len(new_links) < 3 or
-                                    any(term in current_url.lower() for term in ['index', 'home', 'main', 'about'])
-                                ):
-                                    selenium_content = get_page_with_selenium(current_url)
-                                    if selenium_content:
-                                        selenium_links = extract_links(selenium_content, current_url)
-                                        new_links.extend([link for link in selenium_links if link not in new_links])
-
-                                for new_link in new_links:
-                                    parsed_new = urlparse(new_link)
-                                    base_new = f"{parsed_new.scheme}://{parsed_new.netloc}{parsed_new.path}"
-
-                                    # Skip already processed URLs
-                                    if (new_link not in processed_urls and
-                                        new_link not in to_process and
-                                        new_link not in next_level and
-                                        new_link not in all_links and
-                                        not any(urlparse(p).netloc == parsed_new.netloc and
-                                                urlparse(p).path == parsed_new.path for p in processed_urls)):
-                                        next_level.append(new_link)
-                                        all_links.add(new_link)
-
-                                        # Decide whether to mark this new URL for Selenium processing
-                                        if is_js_heavy or any(term in new_link.lower() for term in link_priority):
-                                            selenium_priority_urls.add(new_link)
-
-                        logger.info(f"Processed page: {current_url}")
-
-                        # Update progress estimate
-                        total_estimated = max(total_estimated, len(processed_urls) + len(to_process) + len(next_level))
-
-                        # Emit progress to the frontend
-                        if socketio and sid:
-                            socketio.emit(
-                                'scraping_progress',
-                                {
-                                    'link': current_url,
-                                    'current': len(processed_urls),
-                                    'total': min(max_pages, total_estimated),
-                                    'depth': current_depth + 1,
-                                    'max_depth': max_depth
-                                },
-                                room=sid
-                            )
-
-                    elif page_content and page_type in ['pdf', 'docx']:
-                        try:
-                            if page_type == 'pdf':
-                                loader = PyPDFLoader(page_content)
-                            else:
-                                loader = Docx2txtLoader(page_content)
-                            docs = loader.load()
-                            for doc in docs:
-                                all_texts.append(doc.page_content)
-                            processed_urls.add(current_url)
-                        except Exception as e:
-                            logger.warning(f"Failed to process {page_type.upper()}: {current_url} ({e})")
-
-                except Exception as e:
-                    logger.error(f"Error processing page {current_url}: {str(e)}")
-
-            # Clean up Selenium resources
-            close_selenium_driver()
-
-            # If we've processed too many pages, log it
-            if len(processed_urls) >= max_pages:
-                logger.info(f"Reached maximum page limit of {max_pages}")
+            def should_abort():
+                # Stop on user request, or when indexing failed and crawling further is pointless
+                return bool(abort_checker and abort_checker()) or bool(pipeline and pipeline.failed)
+
+            # Resumes an interrupted crawl of this URL, and saves progress for the next attempt
+            checkpoint = CrawlCheckpoint(url) if config.CHECKPOINT_CONFIG["enabled"] else None
+
+            # Concurrent BFS crawling with multiple levels
+            engine = CrawlEngine(
+                headers,
+                max_pages=max_pages - len(processed_urls),
+                max_depth=max_depth,
+                link_priority=link_priority,
+                is_js_heavy=is_js_heavy,
+                abort_checker=should_abort,
+                on_page=emit_progress,
+                page_sink=pipeline.submit if pipeline else None,
+                checkpoint=checkpoint
+            )
+            result = engine.crawl(main_links, exclude=processed_urls)
+
+            if result.aborted:
+                if pipeline:
+                    pipeline.abort()
+                    if pipeline.failed:
+                        return False, f"Failed to create vector store from website content: {pipeline.error}"
+                logger.info(f"Aborting website processing for sid {sid}")
+                return False, "Processing aborted by user."
+
+            all_pages.extend(result.pages)
+            processed_urls.update(result.processed_urls)
+            all_links.update(result.all_links)
 
             logger.info(f"Finished processing website. Pages processed: {len(processed_urls)}")
             logger.info(f"Total links found: {len(all_links)}")
+            http_cache = get_http_cache()
+            if http_cache is not None:
+                cache_stats = http_cache.get_stats()
+                logger.info(f"HTTP cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                            f"{cache_stats['bytes_saved'] / 1024:.0f}KB not re-downloaded")
+
+            if pipeline:
+                outcome = self._finish_ingest_pipeline(url, pipeline)
+            else:
+                # Create vector store from extracted texts
+                outcome = self._create_vector_store(url, all_pages, dedup, boilerplate, progress_callback)
 
-            # Create vector store from extracted texts
-            return self._create_vector_store(url, all_texts)
+            if outcome[0] and checkpoint is not None:
+                checkpoint.clear()
+            return outcome
 
         except Exception as e:
+            if pipeline:
+                pipeline.abort()
             logger.error(f"Error processing website: {str(e)}")
-            # Clean up Selenium resources
-            close_selenium_driver()
             return False, f"Error processing website: {str(e)}"
 
-    def _create_vector_store(self, url, all_texts):
-        """Helper method to create a vector store from extracted texts"""
-        if not all_texts:
+    def _start_ingest_pipeline(self, url, dedup=None, boilerplate=None):
+        """Open the website's collection and start indexing pages as they are submitted"""
+        collection_name = get_collection_registry().collection_name(url)
+        vector_store, stored_pages = open_page_index(
+            collection_name, "Website", rebuild=not config.INCREMENTAL_INDEXING
+        )
+        keyword_index = get_keyword_index(collection_name) if config.HYBRID_SEARCH_CONFIG["keyword_index"] else None
+        return IngestPipeline(vector_store, stored_pages, "Website", collection_name,
+                              dedup=dedup, boilerplate=boilerplate, keyword_index=keyword_index,
+                              vector_index=get_quantized_index(collection_name)).start()
+
+    def _finish_ingest_pipeline(self, url, pipeline):
+        """Wait for the last pages to be indexed and activate the website's vector store"""
+        index_stats = pipeline.finish(remove_missing=True)
+        if pipeline.failed:
+            return False, f"Failed to create vector store from website content: {index_stats['error']}"
+
+        page_count = index_stats["pages_received"] - index_stats["pages_empty"] - index_stats["pages_duplicate"]
+        if not page_count:
+            return False, "No text content could be extracted from the website."
+        logger.info(f"Embedded {index_stats['chunks_embedded']} chunks, "
+                    f"{index_stats['pages_unchanged']} of {page_count} pages unchanged")
+        return self._activate_website_store(url, pipeline.collection_name, pipeline.vector_store, page_count,
+                                            index_stats, index_stats["dedup"], index_stats["boilerplate"],
+                                            text_bytes=index_stats["text_bytes"])
+
+    def _create_vector_store(self, url, pages, dedup=None, boilerplate=None, progress_callback=None):
+        """Helper method to create (or incrementally update) a vector store from extracted pages"""
+        if not pages:
             return False, "No text content could be extracted from the website."
 
-        # Create documents from the extracted text
+        # Remove the site template (menus, footers, ...) from every page, keeping one copy
+        boilerplate_stats = None
+        if boilerplate is not None:
+            pages = boilerplate.filter_pages(pages)
+            boilerplate_stats = boilerplate.get_stats()
+
+        # Drop pages that repeat the content of another page under a longer URL
+        dedup_stats = None
+        if dedup is not None:
+            pages = dedup.filter_pages(pages, key=page_source_key)
+            dedup_stats = dedup.get_stats()
+            logger.info(f"Dropped {dedup_stats['duplicate_pages']} near-duplicate pages "
+                        f"({dedup_stats['bytes_saved'] / 1024:.0f}KB of text)")
+
+        # Create documents from the extracted text, tagged with their source page
         documents = []
-        for text in all_texts:
+        for page in pages:
+            text = page["content"]
             if text.strip():
-                documents.append(Document(page_content=text))
+                metadata = {"source_url": page_source_key(page), "page_hash": page_hash(text)}
+                fingerprint = dedup.fingerprint(metadata["source_url"]) if dedup is not None else None
+                if fingerprint is not None:
+                    metadata["page_fingerprint"] = format(fingerprint, "016x")
+                documents.append(Document(page_content=text, metadata=metadata))
 
         # Split the content into chunks
         text_splitter = RecursiveCharacterTextSplitter(
@@ -493,21 +437,61 @@ class DynamicChatbot:
         if not splits:
             return False, "No text content could be extracted from the website."
 
+        # Number chunks within their page so every chunk gets a stable id
+        chunk_counts = {}
+        for split in splits:
+            source_url = split.metadata["source_url"]
+            split.metadata["chunk_index"] = chunk_counts.get(source_url, 0)
+            chunk_counts[source_url] = split.metadata["chunk_index"] + 1
+
         logger.info(f"Created {len(splits)} chunks from {len(documents)} pages")
 
-        # Create a unique collection name for this website
-        url_hash = hashlib.md5(url.encode()).hexdigest()
-        collection_name = f"website_{url_hash}"
-        self.vector_store = create_vector_store(splits, "Website", collection_name=collection_name)
+        # Reuse the website's collection, or create one with a unique name
+        collection_name = get_collection_registry().collection_name(url)
+        index_progress = None
+        if progress_callback:
+            index_progress = lambda chunks_done, chunks_total: progress_callback(chunks_embedded=chunks_done)
+        index_stats = None
+        if config.INCREMENTAL_INDEXING:
+            # Only embed new or changed pages when the site was indexed before
+            vector_store, index_stats = update_vector_store(splits, "Website", collection_name,
+                                                            progress_callback=index_progress)
+            logger.info(f"Embedded {index_stats['chunks_embedded']} of {len(splits)} chunks "
+                        f"({index_stats['chunks_per_second']} chunks/s)")
+        else:
+            vector_store = create_vector_store(splits, "Website", collection_name=collection_name,
+                                               progress_callback=index_progress)
+        text_bytes = sum(len(doc.page_content.encode('utf-8')) for doc in documents)
+        return self._activate_website_store(url, collection_name, vector_store, len(documents),
+                                            index_stats, dedup_stats, boilerplate_stats, text_bytes=text_bytes)
+
+    def _activate_website_store(self, url, collection_name, vector_store, page_count, index_stats,
+                                dedup_stats=None, boilerplate_stats=None, text_bytes=None):
+        """Make a freshly indexed website the chatbot's active knowledge base"""
+        self.vector_store = vector_store
         self.collection_name = collection_name
+        if not self.vector_store:
+            return False, "Failed to create vector store from website content."
 
         self.is_initialized = True
         self.website_url = url
         self.content_type = 'Website'
-        save_vector_store_mapping(url, collection_name)
+        get_collection_registry().record(url, collection_name, source_type='Website',
+                                         chunk_count=vector_store._collection.count(), size_bytes=text_bytes,
+                                         categories=self.website_categories)
+
+        embedding_cache_stats = None
+        if isinstance(vector_store.embeddings, CachedEmbeddings):
+            embedding_cache_stats = vector_store.embeddings.get_stats()
+            logger.info(f"Embedding cache: {embedding_cache_stats['hits']} hits, {embedding_cache_stats['misses']} misses "
+                        f"({embedding_cache_stats['hit_rate']:.0%}), ~{embedding_cache_stats['seconds_saved']}s saved")
         return True, {
-            "message": f"Website processed successfully. Scraped {len(documents)} pages. You can now start chatting!",
-            "categories": self.website_categories
+            "message": f"Website processed successfully. Scraped {page_count} pages. You can now start chatting!",
+            "categories": self.website_categories,
+            "index_stats": index_stats,
+            "dedup_stats": dedup_stats,
+            "boilerplate_stats": boilerplate_stats,
+            "embedding_cache_stats": embedding_cache_stats
         }
 
     def get_response(self, user_query):
@@ -519,55 +503,8 @@ class DynamicChatbot:
             if not self.vector_store:
                 return "Error: Vector store not initialized. Please try processing the website or document again."
 
-            # Enhanced retrieval with more relevant documents and hybrid search
-            retriever = self.vector_store.as_retriever(
-                search_type="similarity",
-                search_kwargs={
-                    "k": 5,  # Increased from 2 to 5 for more context
-                    # Removed fetch_k parameter as it's not supported
-                    # Removed score_threshold parameter as it's not supported
-                }
-            )
-
-            # First attempt with original query
-            relevant_docs = retriever.get_relevant_documents(user_query)
-
-            # If we didn't get good results, try with query reformulation
-            if len(relevant_docs) < 2:
-                # Try with a simpler version of the query
-                simplified_query = re.sub(r'[^\w\s]', '', user_query).lower()
-                simple_docs = retriever.get_relevant_documents(simplified_query)
-
-                # Combine results, prioritizing original query results
-                seen_contents = set(doc.page_content for doc in relevant_docs)
-                for doc in simple_docs:
-                    if doc.page_content not in seen_contents:
-                        relevant_docs.append(doc)
-                        seen_contents.add(doc.page_content)
-
-                # If still not enough, try keyword extraction
-                if len(relevant_docs) < 3:
-                    # Extract keywords from query (simple approach)
-                    stop_words = {'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were',
-                                'in', 'on', 'at', 'to', 'for', 'with', 'by', 'about', 'as', 'of'}
-                    keywords = [word.lower() for word in user_query.split()
-                               if word.lower() not in stop_words and len(word) > 2]
-
-                    # Search for each keyword
-                    for keyword in keywords:
-                        if len(keyword) > 3:  # Only use substantial keywords
-                            keyword_docs = retriever.get_relevant_documents(keyword)
-                            for doc in keyword_docs:
-                                if doc.page_content not in seen_contents:
-                                    relevant_docs.append(doc)
-                                    seen_contents.add(doc.page_content)
-                                    if len(relevant_docs) >= 8:  # Cap at 8 docs
-                                        break
-                            if len(relevant_docs) >= 8:
-                                break
-
-            # Limit to top most relevant documents
-            relevant_docs = relevant_docs[:8]
+            # One retrieval call: vector similarity and BM25 keyword matches fused into one ranking
+            relevant_docs = hybrid_search(self.vector_store, user_query, k=config.HYBRID_SEARCH_CONFIG["k"])
 
             if not relevant_docs:
                 return "I couldn't find any relevant information in the provided content."
@@ -661,6 +598,8 @@ Please provide your answer based only on the website content above.
 
 # Create a global instance of the chatbot
 chatbot = DynamicChatbot()
+# Guards switching the global chatbot to a newly processed website
+_chatbot_lock = threading.Lock()
 
 def get_response(user_input, website_url=None, chat_id=None):
     """
@@ -695,7 +634,7 @@ def get_response(user_input, website_url=None, chat_id=None):
         logger.info(f"⚠️ No chat_id provided, using legacy mode for {website_url}")
 
         # Get collection name from URL
-        collection_name = get_collection_name_from_url(website_url)
+        collection_name = get_collection_registry().collection_name(website_url)
         vector_store = load_vector_store(collection_name)
         if vector_store is None:
             logger.error(f"❌ Vector store not found for {website_url}")
@@ -716,9 +655,26 @@ def get_response(user_input, website_url=None, chat_id=None):
         global chatbot
         return chatbot.handle_input(user_input)
 
-def process_website(url, socketio=None, sid=None, abort_checker=None):
-    """Global function to process a website"""
-    return chatbot.process_website(url, socketio=socketio, sid=sid, abort_checker=abort_checker)
+def process_website(url, socketio=None, sid=None, abort_checker=None, progress_callback=None):
+    """
+    Global function to process a website.
+
+    Every call crawls with its own DynamicChatbot, so websites processed at the
+    same time by different jobs do not share crawl state; the global chatbot
+    switches to the website once it has been indexed.
+    """
+    website_chatbot = DynamicChatbot()
+    success, result = website_chatbot.process_website(url, socketio=socketio, sid=sid, abort_checker=abort_checker,
+                                                      progress_callback=progress_callback)
+    if success:
+        with _chatbot_lock:
+            chatbot.vector_store = website_chatbot.vector_store
+            chatbot.collection_name = website_chatbot.collection_name
+            chatbot.website_url = website_chatbot.website_url
+            chatbot.website_categories = website_chatbot.website_categories
+            chatbot.content_type = website_chatbot.content_type
+            chatbot.is_initialized = True
+    return success, result
 
 def process_document(filepath):
     """Global function to process a document"""
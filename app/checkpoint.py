@@ -0,0 +1,254 @@
+"""
+On-disk checkpoints for long website crawls.
+
+While a crawl runs, CrawlCheckpoint appends every extracted page to a JSON
+lines log and periodically writes a small gzipped JSON snapshot of the crawl
+frontier, the seen URL keys and the processed URLs, together with the length
+of the page log at that moment. Snapshots therefore cost the same however many
+pages were crawled, and page texts are never held in memory for them. When a
+crawl of the same URL starts again after a restart or an abort, the engine
+restores that state: the pages logged up to the snapshot are read back one at
+a time and handed on again without being fetched, and crawling continues with
+the URLs that were still queued. The checkpoint is deleted once the website
+has been indexed successfully.
+
+The checkpoint directory is bounded: files older than ``max_age_hours`` and all
+but the ``max_checkpoints`` most recent checkpoints are deleted, and a crawl
+whose page log grows beyond ``max_size_mb`` stops checkpointing.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), "..", "crawl_checkpoints")
+PAGE_LOG_SUFFIX = ".pages.jsonl"
+CHECKPOINT_VERSION = 2
+
+
+class CrawlCheckpoint:
+    """Saves and restores the crawl state of one site"""
+
+    def __init__(self, site_url, checkpoint_dir=None, interval_pages=None, interval_seconds=None):
+        """
+        Args:
+            site_url: URL the crawl was started for, identifies the checkpoint
+            checkpoint_dir: Directory holding the checkpoint files
+            interval_pages: Save after this many new pages
+            interval_seconds: Save after this many seconds with at least one new page
+        """
+        checkpoint_config = config.CHECKPOINT_CONFIG
+        self.site_url = site_url
+        self.checkpoint_dir = checkpoint_dir or checkpoint_config["path"] or CHECKPOINT_DIR
+        self.interval_pages = interval_pages or checkpoint_config["interval_pages"]
+        self.interval_seconds = checkpoint_config["interval_seconds"] if interval_seconds is None else interval_seconds
+        self.max_age_seconds = checkpoint_config["max_age_hours"] * 3600
+        self.max_checkpoints = checkpoint_config["max_checkpoints"]
+        self.max_bytes = checkpoint_config["max_size_mb"] * 1024 * 1024
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+        url_hash = hashlib.md5(site_url.encode()).hexdigest()
+        self.path = os.path.join(self.checkpoint_dir, f"{url_hash}.json.gz")
+        self.log_path = os.path.join(self.checkpoint_dir, f"{url_hash}{PAGE_LOG_SUFFIX}")
+        self._log = None  # page log opened for appending, created by the first recorded page
+        self._resumed = False  # the page log holds the pages of a restored checkpoint
+        self._page_count = 0  # pages in the page log, restored ones included
+        self._disabled = False
+        self._unsaved_pages = 0
+        self._last_saved = time.time()
+        self._write_lock = threading.Lock()
+        self._written_at = 0.0
+
+    @property
+    def page_count(self):
+        return self._page_count
+
+    def load(self):
+        """
+        Read the saved state of an interrupted crawl of this site.
+
+        Returns:
+            Dict with "frontier", "page_count" and "pages", an iterator over the
+            extracted pages read from disk, or None if there is no usable checkpoint
+        """
+        self._prune()
+        if not os.path.exists(self.path):
+            self.clear()
+            return None
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") != CHECKPOINT_VERSION or state.get("site_url") != self.site_url:
+                self.clear()
+                return None
+            log_offset = state["log_offset"]
+            if log_offset and os.path.getsize(self.log_path) < log_offset:
+                raise ValueError("page log is shorter than the snapshot")
+            if log_offset:
+                # Pages logged after the snapshot are fetched again, their URLs are still queued
+                with open(self.log_path, "r+b") as f:
+                    f.truncate(log_offset)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable crawl checkpoint {self.path}: {str(e)}")
+            self.clear()
+            return None
+
+        self._resumed = True
+        self._page_count = state["page_count"]
+        state["pages"] = self._read_pages(log_offset)
+        logger.info(f"Found crawl checkpoint for {self.site_url}: {state['page_count']} pages extracted, "
+                    f"saved {time.time() - state['saved_at']:.0f}s ago")
+        return state
+
+    def record_page(self, page):
+        """Append an extracted page to the page log"""
+        if self._disabled:
+            return
+        try:
+            if self._log is None:
+                # A new crawl starts a new log, a resumed or reopened one continues after its pages
+                self._log = open(self.log_path, "ab" if self._resumed or self._page_count else "wb")
+            self._log.write(json.dumps(self._compact(page)).encode("utf-8") + b"\n")
+        except OSError as e:
+            logger.warning(f"Could not log crawled page for the checkpoint: {str(e)}")
+            self._disable()
+            return
+        self._page_count += 1
+        self._unsaved_pages += 1
+        if self._log.tell() > self.max_bytes:
+            logger.warning(f"Crawl checkpoint page log is above the {self.max_bytes // (1024 * 1024)}MB limit, "
+                           f"no longer checkpointing this crawl")
+            self._disable()
+
+    def due(self):
+        """Whether enough new pages or time accumulated to write a checkpoint"""
+        if not self._unsaved_pages or self._disabled:
+            return False
+        return (self._unsaved_pages >= self.interval_pages
+                or time.time() - self._last_saved >= self.interval_seconds)
+
+    def snapshot(self, frontier_state):
+        """
+        Capture the crawl state to save; cheap, call it where the crawl state is consistent.
+
+        Args:
+            frontier_state: Result of CrawlFrontier.snapshot()
+        """
+        self._unsaved_pages = 0
+        self._last_saved = time.time()
+        log_offset = 0
+        if self._log is not None:
+            # The snapshot covers the pages logged so far, they must reach the file before it does
+            self._log.flush()
+            log_offset = self._log.tell()
+        elif (self._resumed or self._page_count) and os.path.exists(self.log_path):
+            log_offset = os.path.getsize(self.log_path)
+        return {
+            "version": CHECKPOINT_VERSION,
+            "site_url": self.site_url,
+            "saved_at": self._last_saved,
+            "frontier": frontier_state,
+            "page_count": self._page_count,
+            "log_offset": log_offset
+        }
+
+    def write(self, state):
+        """Write a snapshot to disk (blocking, call it from a worker thread)"""
+        if self._disabled:
+            return False
+        data = gzip.compress(json.dumps(state).encode("utf-8"), compresslevel=5)
+        with self._write_lock:
+            if state["saved_at"] < self._written_at:
+                return False  # A newer snapshot was written meanwhile
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+                self._written_at = state["saved_at"]
+            except OSError as e:
+                logger.warning(f"Could not save crawl checkpoint: {str(e)}")
+                return False
+        logger.info(f"Saved crawl checkpoint: {state['page_count']} pages, "
+                    f"{sum(len(urls) for _, urls in state['frontier']['levels'])} queued URLs ({len(data) // 1024}KB)")
+        return True
+
+    def close(self):
+        """Release the page log file, keeping the checkpoint on disk for a later resume"""
+        self._close_log()
+
+    def clear(self):
+        """Delete the checkpoint, e.g. after the website was indexed"""
+        self._close_log()
+        for path in (self.path, self.log_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not delete crawl checkpoint {path}: {str(e)}")
+
+    def _read_pages(self, log_offset):
+        """Pages of the page log up to ``log_offset``, read one line at a time"""
+        if not log_offset:
+            return
+        with open(self.log_path, "rb") as f:
+            while f.tell() < log_offset:
+                line = f.readline()
+                if not line:
+                    return
+                yield self._expand(json.loads(line))
+
+    def _disable(self):
+        self._disabled = True
+        self.clear()
+
+    def _close_log(self):
+        if self._log is not None:
+            try:
+                self._log.close()
+            except OSError:
+                pass
+            self._log = None
+
+    def _prune(self):
+        """Delete expired checkpoints and all but the most recent ones"""
+        now = time.time()
+        checkpoints = []
+        for name in os.listdir(self.checkpoint_dir):
+            path = os.path.join(self.checkpoint_dir, name)
+            try:
+                modified = os.path.getmtime(path)
+                if now - modified > self.max_age_seconds:
+                    os.remove(path)
+                elif name.endswith(".json.gz"):
+                    checkpoints.append((modified, path))
+            except OSError:
+                continue
+        for _, path in sorted(checkpoints, reverse=True)[self.max_checkpoints:]:
+            for stale_path in (path, path[:-len(".json.gz")] + PAGE_LOG_SUFFIX):
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _compact(page):
+        """HTML pages keep only their blocks, the content is their concatenation"""
+        if page.get("blocks"):
+            return {key: value for key, value in page.items() if key != "content"}
+        return page
+
+    @staticmethod
+    def _expand(page):
+        if "content" not in page:
+            page["content"] = " ".join(page["blocks"])
+        return page
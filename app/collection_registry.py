@@ -0,0 +1,201 @@
+"""
+Registry of the vector store collections indexed for websites.
+
+Which collection holds a website used to be kept in chroma/vector_store_map.json,
+re-read on every new chat session and rewritten without locking from two
+places. The registry keeps it in a SQLite database instead, one row per
+website URL with its collection name, chunk count, indexed text size, creation
+and refresh times and the website's categories. All rows are loaded into
+memory when the registry opens, so lookups need no file I/O; writes go to
+SQLite (WAL mode, waiting on locks held by other processes) and then update
+the in-memory index. Lookups of unregistered URLs are answered from memory too:
+at most every ``refresh_seconds`` such a miss checks SQLite's data_version and
+reloads the index only when another process changed the database.
+
+Existing mappings from vector_store_map.json are imported when the database is
+created.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+CHROMA_DIR = os.path.join(os.path.dirname(__file__), "..", "chroma")
+REGISTRY_FILE = os.path.join(CHROMA_DIR, "collections.db")
+LEGACY_MAPPING_FILE = os.path.join(CHROMA_DIR, "vector_store_map.json")
+FIELDS = ("url", "collection_name", "source_type", "chunk_count", "size_bytes", "created_at", "refreshed_at", "categories")
+
+
+def website_collection_name(url):
+    """Collection name of a website that has not been registered under another name"""
+    return f"website_{hashlib.md5(url.encode()).hexdigest()}"
+
+
+class CollectionRegistry:
+    """URL -> collection records in SQLite, with an in-memory index for lookups"""
+
+    def __init__(self, db_path=None, legacy_mapping_file=LEGACY_MAPPING_FILE, refresh_seconds=None):
+        """
+        Args:
+            db_path: SQLite database file
+            legacy_mapping_file: vector_store_map.json to import when the database is new
+            refresh_seconds: Minimum time between checks for websites registered by other processes
+        """
+        registry_config = config.COLLECTION_REGISTRY_CONFIG
+        self.db_path = db_path or registry_config["path"] or REGISTRY_FILE
+        self.refresh_seconds = registry_config["refresh_seconds"] if refresh_seconds is None else refresh_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS collections (
+                    url TEXT PRIMARY KEY,
+                    collection_name TEXT NOT NULL,
+                    source_type TEXT,
+                    chunk_count INTEGER,
+                    size_bytes INTEGER,
+                    created_at REAL,
+                    refreshed_at REAL,
+                    categories TEXT
+                )
+            """)
+        self._records = {}
+        self._data_version = None
+        self._checked_at = 0.0
+        self._reload()
+        if not self._records and legacy_mapping_file:
+            self._import_legacy_mapping(legacy_mapping_file)
+
+    def collection_name(self, url):
+        """Name of the collection holding a website, registered or not"""
+        record = self.get(url)
+        return record["collection_name"] if record else website_collection_name(url)
+
+    def get(self, url):
+        """
+        Record of a website.
+
+        Returns:
+            Dict with the fields of the collections table, or None if the URL is not registered
+        """
+        record = self._records.get(url)
+        if record is None:
+            # Another process may have indexed the website since the registry was loaded
+            self._refresh()
+            record = self._records.get(url)
+            if record is None:
+                return None
+        return dict(record)
+
+    def record(self, url, collection_name, source_type="Website", chunk_count=None, size_bytes=None, categories=None):
+        """
+        Register a freshly (re-)indexed website.
+
+        The creation time of a website that was registered before is kept,
+        its other fields are replaced.
+        """
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute("""
+                    INSERT INTO collections (url, collection_name, source_type, chunk_count, size_bytes,
+                                             created_at, refreshed_at, categories)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        collection_name = excluded.collection_name,
+                        source_type = excluded.source_type,
+                        chunk_count = excluded.chunk_count,
+                        size_bytes = excluded.size_bytes,
+                        refreshed_at = excluded.refreshed_at,
+                        categories = excluded.categories
+                """, (url, collection_name, source_type, chunk_count, size_bytes, now, now,
+                      json.dumps(categories) if categories is not None else None))
+                row = self._conn.execute("SELECT * FROM collections WHERE url = ?", (url,)).fetchone()
+            self._records[url] = self._from_row(row)
+        logger.info(f"Registered collection '{collection_name}' for {url}")
+
+    def remove(self, url):
+        """Forget a website"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM collections WHERE url = ?", (url,))
+            self._records.pop(url, None)
+
+    def all(self):
+        """Records of all registered websites, most recently refreshed first"""
+        self._refresh()
+        with self._lock:
+            records = [dict(record) for record in self._records.values()]
+        return sorted(records, key=lambda record: record["refreshed_at"] or 0, reverse=True)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _refresh(self):
+        """Reload the records if another process changed the database, checking at most every refresh_seconds"""
+        if time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        with self._lock:
+            self._reload()
+
+    def _reload(self):
+        """Re-read all records when the database changed since the last read (caller holds the lock)"""
+        self._checked_at = time.monotonic()
+        # Changes whenever another connection commits, not on this connection's own writes
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        self._records = {row["url"]: self._from_row(row) for row in self._conn.execute("SELECT * FROM collections")}
+
+    @staticmethod
+    def _from_row(row):
+        record = {field: row[field] for field in FIELDS}
+        record["categories"] = json.loads(record["categories"]) if record["categories"] else None
+        return record
+
+    def _import_legacy_mapping(self, mapping_file):
+        try:
+            with open(mapping_file, "r") as f:
+                mapping = json.load(f)
+            mapped_at = os.path.getmtime(mapping_file)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO collections (url, collection_name, created_at, refreshed_at) VALUES (?, ?, ?, ?)",
+                    [(url, collection_name, mapped_at, mapped_at) for url, collection_name in mapping.items()]
+                )
+            self._records = {row["url"]: self._from_row(row) for row in self._conn.execute("SELECT * FROM collections")}
+        logger.info(f"Imported {len(mapping)} website collections from {mapping_file}")
+
+
+# Global collection registry shared by all requests in this process
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_collection_registry():
+    """Get the process-wide collection registry"""
+    global _registry
+
+    if _registry is not None:
+        return _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = CollectionRegistry()
+    return _registry
@@ -0,0 +1,439 @@
+"""
+Concurrent crawl engine used for website ingestion.
+
+Pages are fetched with the blocking helpers from app.scraper, but the fetches
+run on a thread pool driven by an asyncio event loop so that many pages can be
+in flight at once. A global concurrency limit and a per-host limit keep us from
+hammering a single site. Text and link extraction runs on the parsing process
+pool (app.process_pool), so parsing uses the other cores while pages are fetched.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlparse
+
+import config
+from app.scraper import fetch_page, render_fetch_result, extract_page
+from app.frontier import CrawlFrontier
+from app.sitemap import SiteDiscovery
+from app.rate_limiter import get_rate_controller, retry_delay
+from app.documents import DOCUMENT_TYPES, iter_document_pages
+from app.process_pool import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+# Pages whose URL contains one of these terms get an extra Selenium pass for link discovery
+IMPORTANT_PAGE_TERMS = ['index', 'home', 'main', 'about']
+
+
+class CrawlResult:
+    """Outcome of a crawl: extracted pages, every link seen and whether it was aborted"""
+
+    def __init__(self):
+        self.pages = []  # list of {"url", "content", "type", "depth", "blocks"}, empty when a page_sink is used
+        self.processed_urls = set()
+        self.all_links = set()
+        self.aborted = False
+        self.sitemap_urls = 0  # URLs seeded from sitemaps
+        self.robots_blocked = set()  # links skipped because robots.txt disallows them
+        self.failed_urls = set()  # pages that could not be fetched, retries included
+        self.retries = 0  # fetches repeated after a 429, 5xx or timeout
+
+    @property
+    def texts(self):
+        """Extracted text of every processed page, in completion order"""
+        return [page["content"] for page in self.pages]
+
+
+class CrawlEngine:
+    """
+    Breadth-first website crawler with bounded concurrency.
+
+    Links are processed level by level (depth 0 are the seed links), pages at a
+    shallower depth are always dequeued before deeper ones, and within a level
+    links matching ``link_priority`` are fetched first.
+    """
+
+    def __init__(self, headers, max_pages=200, max_depth=3, link_priority=None,
+                 is_js_heavy=False, concurrency=None, per_host_limit=None,
+                 abort_checker=None, on_page=None, link_filter=None, allow_selenium=True,
+                 page_sink=None, use_sitemaps=None, respect_robots=None, checkpoint=None,
+                 rate_controller=None, max_retries=None):
+        """
+        Args:
+            headers: HTTP headers used for every request
+            max_pages: Maximum number of pages to extract
+            max_depth: Number of link levels to follow below the seeds
+            link_priority: URL terms that mark important links (fetched first, rendered with Selenium)
+            is_js_heavy: Render every page with Selenium
+            concurrency: Maximum number of pages fetched at once
+            per_host_limit: Maximum number of concurrent requests against one host when adaptive
+                rate control is off (RATE_LIMIT_CONFIG["adaptive"]); otherwise the shared
+                HostRateController adapts it to the host's latency and errors
+            abort_checker: Callable returning True when the crawl should stop
+            on_page: Callback ``on_page(url, depth, pages_done, estimated_total, page_bytes, page_ms)``
+                after each page, with the page's content size and the time spent fetching and extracting it
+            link_filter: Optional predicate deciding whether a discovered link is followed
+            allow_selenium: Set to False to fetch every page with plain HTTP requests only
+            page_sink: Optional blocking callable receiving each extracted page dict as soon as it
+                is ready (e.g. IngestPipeline.submit). Pages handed to the sink are not kept in
+                CrawlResult.pages, so memory no longer grows with the size of the site.
+            use_sitemaps: Seed the frontier with the URLs from the seed hosts' sitemaps
+                (defaults to CRAWL_CONFIG["use_sitemaps"])
+            respect_robots: Never queue paths disallowed by robots.txt
+                (defaults to CRAWL_CONFIG["respect_robots"])
+            checkpoint: Optional CrawlCheckpoint; a saved state is resumed (its pages are
+                handed on again without fetching them) and the crawl state is saved
+                periodically and when the crawl is aborted
+            rate_controller: HostRateController pacing requests (defaults to the process-wide one)
+            max_retries: Times a page is retried after a 429, 5xx or timeout
+                (defaults to RATE_LIMIT_CONFIG["max_retries"]); retries wait without holding a worker
+        """
+        self.headers = headers
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.link_priority = link_priority or []
+        self.is_js_heavy = is_js_heavy
+        self.concurrency = max(1, concurrency or config.CRAWL_CONFIG["concurrency"])
+        self.per_host_limit = max(1, per_host_limit or config.CRAWL_CONFIG["per_host_limit"])
+        self.abort_checker = abort_checker
+        self.on_page = on_page
+        self.link_filter = link_filter
+        self.allow_selenium = allow_selenium
+        self.page_sink = page_sink
+        self.use_sitemaps = config.CRAWL_CONFIG["use_sitemaps"] if use_sitemaps is None else use_sitemaps
+        self.respect_robots = config.CRAWL_CONFIG["respect_robots"] if respect_robots is None else respect_robots
+        self.checkpoint = checkpoint
+        self.rate_controller = rate_controller or get_rate_controller()
+        self.max_retries = config.RATE_LIMIT_CONFIG["max_retries"] if max_retries is None else max_retries
+
+    def crawl(self, seed_urls, exclude=None):
+        """
+        Crawl starting from ``seed_urls`` and return a CrawlResult.
+
+        URLs in ``exclude`` (e.g. a main page the caller already processed) are
+        treated as seen and never fetched.
+        """
+        return asyncio.run(self._crawl(seed_urls, exclude or ()))
+
+    def use_selenium_for(self, url):
+        """Decide whether a URL should be rendered with Selenium"""
+        url = url.lower()
+        return self.allow_selenium and (self.is_js_heavy or any(term in url for term in self.link_priority))
+
+    async def _crawl(self, seed_urls, exclude):
+        self._result = CrawlResult()
+        self._frontier = CrawlFrontier(self.link_priority)
+        for url in exclude:
+            self._frontier.mark_seen(url)
+        self._in_flight = {}  # url -> depth of pages being processed
+        self._total_estimated = len(seed_urls) + 50  # Initial estimate
+        self._changed = asyncio.Condition()
+        self._host_active = defaultdict(int)  # host -> requests in progress
+        self._retry_waiting = {}  # url -> depth of pages waiting for their retry time
+        self._retry_ready = deque()  # (url, depth, attempt) ready to be fetched again
+        self._retry_tasks = set()
+        self._robots = {}  # netloc -> RobotsRules
+
+        loop = asyncio.get_running_loop()
+        resumed = self.checkpoint.load() if self.checkpoint is not None else None
+        if resumed:
+            # Restored before seeding, so seeds and sitemap URLs already handled are skipped
+            self._frontier.restore(resumed["frontier"])
+
+        sitemap_urls = []
+        if self.use_sitemaps or self.respect_robots:
+            sitemap_urls = await loop.run_in_executor(None, self._discover_sites, list(seed_urls) + list(exclude))
+
+        # Seeds first, then sitemap URLs (newest first) on the same level
+        self._enqueue(seed_urls, 0)
+        self._result.sitemap_urls = len(self._enqueue(sitemap_urls, 0))
+        self._total_estimated += self._result.sitemap_urls
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="crawl") as executor:
+                if resumed:
+                    await self._resume(loop, executor, resumed)
+                workers = [
+                    asyncio.ensure_future(self._worker(loop, executor))
+                    for _ in range(self.concurrency)
+                ]
+                await asyncio.gather(*workers)
+                for task in self._retry_tasks:
+                    task.cancel()
+                if self._result.aborted and self.checkpoint is not None:
+                    await self._save_checkpoint(loop, executor)
+        finally:
+            if self.checkpoint is not None:
+                # After the final snapshot; the files stay on disk for a resume
+                self.checkpoint.close()
+
+        if len(self._result.processed_urls) >= self.max_pages:
+            logger.info(f"Reached maximum page limit of {self.max_pages}")
+        if self._result.robots_blocked:
+            logger.info(f"Skipped {len(self._result.robots_blocked)} links disallowed by robots.txt")
+        if self._result.retries or self._result.failed_urls:
+            logger.info(f"Retried {self._result.retries} fetches, {len(self._result.failed_urls)} pages failed")
+        return self._result
+
+    def _discover_sites(self, seed_urls):
+        """Read robots.txt (and sitemaps) of every seed host, returning the sitemap URLs"""
+        urls = []
+        for netloc, seed_url in {urlparse(url).netloc: url for url in seed_urls}.items():
+            site = SiteDiscovery(seed_url, headers=self.headers)
+            try:
+                robots = site.load_robots()
+                if self.respect_robots:
+                    self._robots[netloc] = robots
+                if self.use_sitemaps:
+                    urls.extend(site.sitemap_urls(limit=self.max_pages))
+            except Exception as e:
+                logger.warning(f"Site discovery failed for {netloc}: {str(e)}")
+        return urls
+
+    def _should_follow(self, url):
+        if self.link_filter and not self.link_filter(url):
+            return False
+        robots = self._robots.get(urlparse(url).netloc)
+        if robots is not None and not robots.can_fetch(url):
+            self._result.robots_blocked.add(url)
+            return False
+        return True
+
+    def _enqueue(self, links, depth):
+        """Add unseen, allowed links to the given depth level, priority links first"""
+        added = self._frontier.add_many(links, depth, link_filter=self._should_follow)
+        self._result.all_links.update(added)
+        return added
+
+    def _aborted(self):
+        if self._result.aborted:
+            return True
+        if self.abort_checker and self.abort_checker():
+            logger.info("Aborting crawl on request")
+            self._result.aborted = True
+        return self._result.aborted
+
+    def _budget_left(self):
+        """Whether another page may be started; pages waiting for a retry already hold their place"""
+        pending = len(self._in_flight) + len(self._retry_waiting) + len(self._retry_ready)
+        return len(self._result.processed_urls) + pending < self.max_pages
+
+    async def _resume(self, loop, executor, state):
+        """Hand on the pages of a checkpoint instead of fetching them again"""
+        for page in state["pages"]:
+            await self._store_page(loop, executor, page, restored=True)
+        self._total_estimated = max(self._total_estimated, len(self._result.processed_urls) + len(self._frontier))
+        logger.info(f"Resuming crawl: {state['page_count']} pages restored, {len(self._frontier)} URLs queued")
+
+    async def _save_checkpoint(self, loop, executor):
+        # Pages still being fetched or waiting for a retry are saved as queued, unless they were already handed on
+        pending = dict(self._in_flight)
+        pending.update(self._retry_waiting)
+        pending.update((url, depth) for url, depth, _ in self._retry_ready)
+        in_flight = {url: depth for url, depth in pending.items() if url not in self._result.processed_urls}
+        state = self.checkpoint.snapshot(self._frontier.snapshot(in_flight))
+        await loop.run_in_executor(executor, self.checkpoint.write, state)
+
+    def _next_item(self):
+        """Next (url, depth, attempt) to fetch, retries that are due first, None when the budget is spent"""
+        if self._retry_ready:
+            return self._retry_ready.popleft()
+        if not self._budget_left():
+            return None
+        item = self._frontier.pop()
+        return item + (0,) if item else None
+
+    async def _worker(self, loop, executor):
+        while not self._aborted():
+            item = self._next_item()
+            if item is None:
+                # Wait for an in-flight page to finish (or a retry to become due) and possibly add new links
+                async with self._changed:
+                    if not self._in_flight and not self._retry_waiting:
+                        break
+                    await self._changed.wait()
+                continue
+
+            url, depth, attempt = item
+            self._in_flight[url] = depth
+            try:
+                await self._process(loop, executor, url, depth, attempt)
+            except Exception as e:
+                logger.error(f"Error processing page {url}: {str(e)}")
+            finally:
+                del self._in_flight[url]
+                async with self._changed:
+                    self._changed.notify_all()
+
+    def _host_limit(self, host):
+        if self.rate_controller.adaptive:
+            return self.rate_controller.limit(host)
+        return self.per_host_limit
+
+    async def _acquire_host(self, host):
+        """Wait for a free request slot on a host, then for the host's next allowed start time"""
+        async with self._changed:
+            while self._host_active[host] >= self._host_limit(host):
+                await self._changed.wait()
+            self._host_active[host] += 1
+        delay = self.rate_controller.reserve(host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _release_host(self, host):
+        async with self._changed:
+            self._host_active[host] -= 1
+            self._changed.notify_all()
+
+    def _schedule_retry(self, url, depth, attempt, delay):
+        """Fetch a page again after ``delay`` seconds without holding a worker meanwhile"""
+        self._retry_waiting[url] = depth
+        self._result.retries += 1
+        logger.info(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 1} of {self.max_retries + 1})")
+        task = asyncio.ensure_future(self._release_retry(url, depth, attempt, delay))
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+
+    async def _release_retry(self, url, depth, attempt, delay):
+        await asyncio.sleep(delay)
+        del self._retry_waiting[url]
+        self._retry_ready.append((url, depth, attempt))
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _process(self, loop, executor, url, depth, attempt=0):
+        start_time = time.time()
+        use_selenium = self.use_selenium_for(url)
+        host = urlparse(url).netloc
+        retry_later = attempt < self.max_retries
+
+        await self._acquire_host(host)
+        try:
+            logger.info(f"Processing page: {url} (selenium: {use_selenium})")
+            fetched = await loop.run_in_executor(executor, partial(
+                fetch_page, url, self.headers, retries=1, timeout=30, use_selenium=use_selenium,
+                retry_later=retry_later, rate_controller=self.rate_controller
+            ))
+        finally:
+            await self._release_host(host)
+
+        if not fetched.ok:
+            if fetched.retryable and retry_later:
+                self._schedule_retry(url, depth, attempt + 1, retry_delay(attempt + 1, fetched.retry_after))
+                return
+            self._result.failed_urls.add(url)
+            if fetched.error:
+                logger.warning(f"Failed to fetch {url}: {fetched.error}")
+            return
+
+        if fetched.content_type == 'html':
+            follow_links = depth < self.max_depth - 1
+            blocks = await self._extract_html(loop, executor, fetched)
+            if follow_links and self._needs_discovery_render(fetched, use_selenium):
+                await loop.run_in_executor(executor, render_fetch_result, fetched)
+                blocks = await self._extract_html(loop, executor, fetched)
+
+            if not blocks:
+                return
+            await self._add_page(loop, executor, url, " ".join(blocks), fetched.content_type, depth, blocks,
+                                 page_bytes=len(fetched.content), start_time=start_time)
+
+            if follow_links:
+                self._enqueue(fetched.links, depth + 1)
+
+            logger.info(f"Processed page: {url} ({fetched.render_mode})")
+
+        elif fetched.content_type in DOCUMENT_TYPES:
+            await self._add_document(loop, executor, url, fetched, depth, start_time)
+
+    async def _extract_html(self, loop, executor, fetched):
+        """
+        Extract the text blocks and links of an HTML page, on the parsing process pool
+        when there is one so that parsing does not hold the GIL of the fetching threads.
+
+        Returns:
+            The page's text blocks; its links are stored in ``fetched``
+        """
+        pool = get_process_pool()
+        if pool is None:
+            blocks, links = await loop.run_in_executor(executor, extract_page, fetched.document, fetched.final_url)
+        else:
+            blocks, links = await loop.run_in_executor(pool, extract_page, fetched.content, fetched.final_url)
+        fetched.use_extracted_links(links)
+        return blocks
+
+    def _needs_discovery_render(self, fetched, use_selenium):
+        """
+        Whether to render a page once with Selenium for more links: important pages and
+        pages whose static HTML has too few. Sites with a sitemap skip these discovery renders.
+        """
+        return self.allow_selenium and not use_selenium and not self._result.sitemap_urls and (
+            len(fetched.links) < 3 or
+            any(term in fetched.url.lower() for term in IMPORTANT_PAGE_TERMS)
+        )
+
+    async def _add_page(self, loop, executor, url, text, page_type, depth, blocks=None, page_bytes=0, start_time=None):
+        page = {"url": url, "content": text, "type": page_type, "depth": depth}
+        if blocks:
+            page["blocks"] = blocks
+        await self._store_page(loop, executor, page)
+        await self._page_added(loop, executor, url, depth, page_bytes, start_time)
+
+    async def _add_document(self, loop, executor, url, fetched, depth, start_time):
+        """
+        Hand on a PDF or DOCX file one range of pages at a time, while later ranges
+        are still being extracted. Every range becomes a page entry of the document's URL,
+        indexed under its own key (see page_source_key).
+        """
+        parts = iter_document_pages(fetched.content, fetched.content_type)
+        first_page = 1
+        stored = False
+        try:
+            while not self._aborted():
+                texts = await loop.run_in_executor(executor, next, parts, None)
+                if texts is None:
+                    break
+                text = "\n".join(text for text in texts if text.strip())
+                if text:
+                    await self._store_page(loop, executor, {
+                        "url": url, "content": text, "type": fetched.content_type, "depth": depth,
+                        "pages": [first_page, first_page + len(texts) - 1]
+                    })
+                    stored = True
+                first_page += len(texts)
+        except Exception as e:
+            logger.warning(f"Failed to process {fetched.content_type.upper()}: {url} ({e})")
+        finally:
+            parts.close()
+
+        if stored:
+            await self._page_added(loop, executor, url, depth, len(fetched.content), start_time)
+
+    async def _page_added(self, loop, executor, url, depth, page_bytes, start_time):
+        """Report progress and save a checkpoint when one is due"""
+        page_ms = (time.time() - start_time) * 1000 if start_time else 0.0
+        self._total_estimated = max(self._total_estimated, len(self._result.processed_urls) + len(self._frontier))
+        if self.on_page:
+            try:
+                self.on_page(url, depth, len(self._result.processed_urls), min(self.max_pages, self._total_estimated),
+                             page_bytes, page_ms)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {str(e)}")
+
+        if self.checkpoint is not None and self.checkpoint.due():
+            await self._save_checkpoint(loop, executor)
+
+    async def _store_page(self, loop, executor, page, restored=False):
+        if self.page_sink:
+            # Blocks this worker while the sink is full, throttling the crawl to the consumer
+            await loop.run_in_executor(executor, self.page_sink, page)
+        else:
+            self._result.pages.append(page)
+        self._result.processed_urls.add(page["url"])
+        if self.checkpoint is not None and not restored:
+            self.checkpoint.record_page(page)
@@ -0,0 +1,219 @@
+"""
+Near-duplicate page detection for website ingestion.
+
+Sites often serve the same content under several URLs (print views, paginated
+listings, locale mirrors, tracking parameters). Every extracted page gets a
+64-bit SimHash fingerprint of its word 3-gram shingles; of pages whose
+fingerprints are within a few bits of each other only the one with the shortest
+URL (the lexicographically smallest on ties) is chunked and embedded. The kept
+page does not depend on the order the crawl finished the pages in, so crawling
+an unchanged site again keeps the same pages. Fingerprints are split into bands
+so a lookup only compares against pages sharing at least one band, not against
+every page seen so far.
+"""
+
+import hashlib
+import logging
+import re
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def simhash(text, shingle_size=SHINGLE_SIZE):
+    """
+    64-bit SimHash fingerprint of a text, or None if it has no words.
+
+    Similar texts get fingerprints that differ in few bits.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    shingles = [' '.join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))]
+
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little') for shingle in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    # One row of 64 bits per shingle; a fingerprint bit is set where most shingles have it set
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    majority = bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)
+    return int(np.packbits(majority, bitorder='little').view('<u8')[0])
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def duplicate_rank(url):
+    """Sort key of near-duplicate pages, the first one is kept"""
+    return len(url), url
+
+
+class NearDuplicateFilter:
+    """Remembers the fingerprints of kept pages and recognises pages that are near-copies of them"""
+
+    def __init__(self, similarity_threshold=None):
+        """
+        Args:
+            similarity_threshold: Fraction of matching fingerprint bits from which a page
+                counts as a duplicate (1.0 only drops exact copies, defaults to
+                DEDUP_CONFIG["similarity_threshold"])
+        """
+        if similarity_threshold is None:
+            similarity_threshold = config.DEDUP_CONFIG["similarity_threshold"]
+        self.max_distance = max(0, min(FINGERPRINT_BITS - 1, int((1 - similarity_threshold) * FINGERPRINT_BITS)))
+
+        # Two fingerprints at most max_distance bits apart agree on at least one of
+        # max_distance + 1 bands, so only pages sharing a band have to be compared
+        bands = self.max_distance + 1
+        bounds = [round(i * FINGERPRINT_BITS / bands) for i in range(bands + 1)]
+        self._bands = [(start, (1 << (end - start)) - 1) for start, end in zip(bounds, bounds[1:])]
+        self._index = {}  # (band, band value) -> list of (fingerprint, url)
+        self._kept = {}  # url -> (fingerprint, text bytes) of every kept page
+        self._remembered = {}  # url of a page kept by an earlier crawl -> pages held back as its duplicates
+        self._released = []  # held back pages to check again, as (url, text, item)
+        self._stats = {"pages_checked": 0, "duplicate_pages": 0, "bytes_saved": 0}
+
+    def remember(self, url, fingerprint):
+        """
+        Seed the filter with a page kept by an earlier crawl of the site.
+
+        Until the page is crawled again, pages that duplicate it are held back
+        rather than kept or dropped: they are released (see take_released) if
+        the page turns out to have changed or to be gone.
+        """
+        self._insert(url, fingerprint, 0)
+        self._remembered[url] = []
+
+    def is_remembered(self, url):
+        """Whether a page seeded by remember() has not been crawled again yet"""
+        return url in self._remembered
+
+    def fingerprint(self, url):
+        """Fingerprint of a kept page, or None"""
+        kept = self._kept.get(url)
+        return kept[0] if kept else None
+
+    def check(self, url, text):
+        """
+        Check a page and remember it if it is kept.
+
+        Returns:
+            URL of the kept page this one duplicates, or None if it is kept
+        """
+        return self.add(url, text)[0]
+
+    def add(self, url, text, item=None):
+        """
+        Check a page and remember it if it is kept.
+
+        Of near-duplicate pages the one that sorts first by duplicate_rank is
+        kept, whatever order they are checked in; kept pages that a new page
+        outranks are forgotten.
+
+        Args:
+            url: Identity of the page
+            text: Text of the page
+            item: Handed back by take_released() if the page is held back as a
+                duplicate of a remembered page; without it such a page is dropped
+
+        Returns:
+            Tuple of the URL of the kept page this one duplicates (None if it is
+            kept) and the URLs of the kept pages it replaces
+        """
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            self._stats["pages_checked"] += 1
+            return None, []
+        if url in self._remembered:
+            # Crawled again: its held back duplicates are checked once more against its current text
+            self._released.extend(self._remembered.pop(url))
+            self._forget(url)
+
+        matches = [other_url for other_url in self._matches(fingerprint) if other_url != url]
+        best = min(matches, key=duplicate_rank, default=None)
+        if best is not None and duplicate_rank(best) < duplicate_rank(url):
+            if best in self._remembered and item is not None:
+                self._remembered[best].append((url, text, item))
+                return best, []
+            self._stats["pages_checked"] += 1
+            self._stats["duplicate_pages"] += 1
+            self._stats["bytes_saved"] += len(text.encode('utf-8'))
+            logger.info(f"Skipping {url}: near-duplicate of {best}")
+            return best, []
+
+        self._stats["pages_checked"] += 1
+        for other_url in matches:
+            if other_url in self._remembered:
+                self._released.extend(self._remembered.pop(other_url))
+            else:
+                self._stats["duplicate_pages"] += 1
+                self._stats["bytes_saved"] += self._kept[other_url][1]
+            self._forget(other_url)
+            logger.info(f"Replacing {other_url} with its near-duplicate {url}")
+        self._insert(url, fingerprint, len(text.encode('utf-8')))
+        return None, matches
+
+    def release_unconfirmed(self):
+        """Forget remembered pages that were not crawled again, releasing the pages held back for them"""
+        for url in list(self._remembered):
+            self._released.extend(self._remembered.pop(url))
+            self._forget(url)
+
+    def take_released(self):
+        """Items of the held back pages to check again, best ranked first"""
+        released, self._released = self._released, []
+        return [item for _, _, item in sorted(released, key=lambda entry: duplicate_rank(entry[0]))]
+
+    def filter_pages(self, pages, key=None):
+        """
+        Return the pages ({"url", "content"}) that are not near-duplicates of another one.
+
+        Args:
+            pages: Pages in any order, the kept ones are returned in that order
+            key: Callable returning the identity of a page, defaults to its URL
+        """
+        key = key or (lambda page: page["url"])
+        # Checking the best ranked pages first means kept pages are never replaced
+        kept = {id(page) for page in sorted(pages, key=lambda page: duplicate_rank(key(page)))
+                if self.check(key(page), page["content"]) is None}
+        return [page for page in pages if id(page) in kept]
+
+    def get_stats(self):
+        return dict(self._stats)
+
+    def _band_keys(self, fingerprint):
+        return [(band, (fingerprint >> start) & mask) for band, (start, mask) in enumerate(self._bands)]
+
+    def _matches(self, fingerprint):
+        """URLs of the kept pages within max_distance bits of a fingerprint"""
+        matches = []
+        for key in self._band_keys(fingerprint):
+            for other_fingerprint, other_url in self._index.get(key, ()):
+                if other_url not in matches and hamming_distance(fingerprint, other_fingerprint) <= self.max_distance:
+                    matches.append(other_url)
+        return matches
+
+    def _insert(self, url, fingerprint, size):
+        if url in self._kept:
+            self._forget(url)
+        self._kept[url] = (fingerprint, size)
+        for key in self._band_keys(fingerprint):
+            self._index.setdefault(key, []).append((fingerprint, url))
+
+    def _forget(self, url):
+        fingerprint, _ = self._kept.pop(url)
+        for key in self._band_keys(fingerprint):
+            entries = self._index[key]
+            entries.remove((fingerprint, url))
+            if not entries:
+                del self._index[key]
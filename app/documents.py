@@ -0,0 +1,108 @@
+"""
+In-memory text extraction for PDF and DOCX files found while crawling.
+
+Downloaded documents are parsed straight from their bytes, nothing is written
+to disk. PDFs are read in ranges of pages; large PDFs have their ranges
+extracted in parallel on the parsing process pool (text extraction is pure
+Python and CPU bound). Every worker gets one contiguous span of ranges, so the
+document bytes are sent to and parsed by each worker once, and the ranges are
+yielded in document order as soon as their span is ready, so the crawler can
+hand the first pages on to chunking while the rest are still being extracted.
+Documents above ``max_size_mb`` are skipped and only the first ``max_pages``
+pages of a PDF are read.
+"""
+
+import io
+import logging
+
+import config
+from app.process_pool import get_process_pool, pool_workers
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_TYPES = ('pdf', 'docx')
+
+
+def _extract_pdf_ranges(data, ranges):
+    """Page texts of (start, stop) ranges of a PDF, one list per range (runs in a worker process)"""
+    from PyPDF2 import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    return [[_page_text(reader.pages[index]) for index in range(start, stop)] for start, stop in ranges]
+
+
+def _page_text(page):
+    try:
+        return page.extract_text() or ""
+    except Exception as e:
+        logger.warning(f"Could not extract the text of a PDF page: {str(e)}")
+        return ""
+
+
+def _extract_docx_text(data):
+    import docx2txt
+    return docx2txt.process(io.BytesIO(data)) or ""
+
+
+def iter_document_pages(data, file_type, max_pages=None, pages_per_task=None):
+    """
+    Extract the text of a PDF or DOCX document held in memory.
+
+    Args:
+        data: Bytes of the document
+        file_type: 'pdf' or 'docx'
+        max_pages: Read at most this many PDF pages (defaults to DOCUMENT_CONFIG["max_pages"])
+        pages_per_task: PDF pages extracted per yielded range
+
+    Yields:
+        Lists of page texts in document order; a DOCX file is a single page
+    """
+    document_config = config.DOCUMENT_CONFIG
+    if file_type == 'docx':
+        yield [_extract_docx_text(data)]
+        return
+
+    from PyPDF2 import PdfReader
+    max_pages = max_pages or document_config["max_pages"]
+    pages_per_task = max(1, pages_per_task or document_config["pages_per_task"])
+    reader = PdfReader(io.BytesIO(data))
+    total_pages = len(reader.pages)
+    page_count = min(total_pages, max_pages)
+    if page_count < total_pages:
+        logger.info(f"Reading the first {page_count} of {total_pages} PDF pages")
+    ranges = [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+
+    pool = get_process_pool() if page_count >= document_config["parallel_min_pages"] else None
+    if pool is None:
+        for start, stop in ranges:
+            yield [_page_text(reader.pages[index]) for index in range(start, stop)]
+        return
+
+    # One span of consecutive ranges per worker, each worker receives and parses the bytes once
+    span_count = max(1, min(pool_workers(), len(ranges)))
+    bounds = [round(i * len(ranges) / span_count) for i in range(span_count + 1)]
+    futures = [pool.submit(_extract_pdf_ranges, data, ranges[start:stop]) for start, stop in zip(bounds, bounds[1:])]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        # The consumer stopped early (abort, error): drop the ranges not started yet
+        for future in futures:
+            future.cancel()
+
+
+def load_document(data, file_type):
+    """
+    Extract all page texts of a PDF or DOCX document held in memory.
+
+    Returns:
+        List of page texts, empty if the document could not be read
+    """
+    texts = []
+    try:
+        for page_texts in iter_document_pages(data, file_type):
+            texts.extend(page_texts)
+    except Exception as e:
+        logger.warning(f"Failed to process {file_type.upper()} document: {str(e)}")
+        return []
+    return [text for text in texts if text.strip()]
+
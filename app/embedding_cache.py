@@ -0,0 +1,323 @@
+"""
+Persistent, content-addressed cache of chunk embeddings.
+
+Re-processing a site or document used to embed every chunk again, even text
+that was embedded before (unchanged pages, boilerplate shared between sites).
+Embeddings are now stored on disk keyed by the embedding model and the sha256
+of the chunk text, and CachedEmbeddings only computes the vectors that are not
+cached yet.
+
+Every model has its own directory holding three memory-mapped files with one
+row per slot: the float32 vectors, the 32 byte sha256 keys and the time each
+slot was last used (0 for free slots). Rows are written in place, so storing a
+vector never rewrites an index, and the index is rebuilt from the key file on
+startup. The files grow as needed up to ``max_size_mb`` per model, after which
+the least recently used tenth of the slots is evicted.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+import config
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "embedding_cache")
+KEY_BYTES = 32
+INITIAL_SLOTS = 1024
+EVICT_FRACTION = 0.1
+
+
+def text_key(text):
+    """sha256 digest identifying a chunk text"""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class _ModelStore:
+    """Memory-mapped vectors of one embedding model"""
+
+    def __init__(self, path, dim, max_bytes):
+        self.path = path
+        self.dim = dim
+        self.max_slots = max(INITIAL_SLOTS, max_bytes // (dim * 4 + KEY_BYTES + 8))
+        os.makedirs(path, exist_ok=True)
+
+        meta = self._read_meta()
+        if meta.get("dim") not in (None, dim):
+            logger.warning(f"Embedding cache {path} holds {meta['dim']}-dimensional vectors, clearing it")
+            for name in ("vectors.f32", "keys.bin", "used.f64"):
+                if os.path.exists(os.path.join(path, name)):
+                    os.remove(os.path.join(path, name))
+            meta = {}
+        self.seconds_per_vector = meta.get("seconds_per_vector")  # average time to compute one vector
+
+        capacity = INITIAL_SLOTS
+        keys_path = os.path.join(path, "keys.bin")
+        if os.path.exists(keys_path):
+            capacity = max(capacity, os.path.getsize(keys_path) // KEY_BYTES)
+        self._open(capacity)
+
+        self._index = {}
+        self._free = []
+        for slot in range(self.capacity):
+            if self._used[slot]:
+                self._index[bytes(self._keys[slot])] = slot
+            else:
+                self._free.append(slot)
+        self._free.reverse()  # fill low slots first
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def size_bytes(self):
+        return self.capacity * (self.dim * 4 + KEY_BYTES + 8)
+
+    def get(self, key, now):
+        slot = self._index.get(key)
+        if slot is None:
+            return None
+        self._used[slot] = now
+        return self._vectors[slot].tolist()
+
+    def put(self, key, vector, now):
+        """Store a vector, returns the number of evicted entries"""
+        evicted = 0
+        slot = self._index.get(key)
+        if slot is None:
+            if not self._free:
+                if self.capacity < self.max_slots:
+                    self._grow(min(self.max_slots, self.capacity * 2))
+                else:
+                    evicted = self._evict()
+            slot = self._free.pop()
+            self._index[key] = slot
+        # The key and use time go in after the vector, a slot is only valid once both are written
+        self._vectors[slot] = vector
+        self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+        self._used[slot] = now
+        return evicted
+
+    def flush(self):
+        for array in (self._vectors, self._keys, self._used):
+            array.flush()
+        self._write_meta()
+
+    def _evict(self):
+        """Free the least recently used slots"""
+        count = max(1, int(self.capacity * EVICT_FRACTION))
+        oldest = np.argpartition(self._used, count - 1)[:count]
+        for slot in oldest:
+            slot = int(slot)
+            del self._index[bytes(self._keys[slot])]
+            self._used[slot] = 0
+            self._free.append(slot)
+        return count
+
+    def _grow(self, capacity):
+        old_capacity = self.capacity
+        self.flush()
+        self._open(capacity)
+        self._free.extend(reversed(range(old_capacity, capacity)))
+
+    def _open(self, capacity):
+        """Map the three slot files, extending them to ``capacity`` rows"""
+        self.capacity = capacity
+
+        def mapped(name, dtype, row_shape):
+            file_path = os.path.join(self.path, name)
+            row_bytes = np.dtype(dtype).itemsize * int(np.prod(row_shape))
+            with open(file_path, "ab") as f:
+                if f.tell() < capacity * row_bytes:
+                    f.truncate(capacity * row_bytes)
+            return np.memmap(file_path, dtype=dtype, mode="r+", shape=(capacity,) + row_shape)
+
+        self._vectors = mapped("vectors.f32", np.float32, (self.dim,))
+        self._keys = mapped("keys.bin", np.uint8, (KEY_BYTES,))
+        self._used = mapped("used.f64", np.float64, ())
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, "meta.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump({"dim": self.dim, "seconds_per_vector": self.seconds_per_vector}, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+
+class EmbeddingCache:
+    """Size-bounded on-disk cache of embedding vectors, keyed by model and chunk text"""
+
+    def __init__(self, cache_dir=None, max_size_mb=None):
+        """
+        Args:
+            cache_dir: Directory holding one subdirectory per embedding model
+            max_size_mb: Maximum size of the cached vectors of one model in megabytes
+        """
+        cache_config = config.EMBEDDING_CACHE_CONFIG
+        self.cache_dir = cache_dir or cache_config["path"] or EMBEDDING_CACHE_DIR
+        self.max_bytes = int((max_size_mb or cache_config["max_size_mb"]) * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._stores = {}  # model name -> _ModelStore
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def lookup(self, model_name, keys):
+        """
+        Cached vectors for a list of text keys.
+
+        Returns:
+            List with a vector (list of floats) or None for every key
+        """
+        with self._lock:
+            store = self._store(model_name)
+            if store is None:
+                self._stats["misses"] += len(keys)
+                return [None] * len(keys)
+            now = time.time()
+            vectors = [store.get(key, now) for key in keys]
+            hits = sum(1 for vector in vectors if vector is not None)
+            self._stats["hits"] += hits
+            self._stats["misses"] += len(keys) - hits
+            return vectors
+
+    def store(self, model_name, keys, vectors, seconds=None):
+        """
+        Cache freshly computed vectors.
+
+        Args:
+            model_name: Embedding model that computed the vectors
+            keys: Text keys of the vectors
+            vectors: The vectors
+            seconds: Time it took to compute them, used to estimate the time cache hits save
+        """
+        if not vectors:
+            return
+        with self._lock:
+            store = self._store(model_name, dim=len(vectors[0]))
+            now = time.time()
+            for key, vector in zip(keys, vectors):
+                self._stats["evictions"] += store.put(key, vector, now)
+            self._stats["stores"] += len(vectors)
+            if seconds is not None:
+                per_vector = seconds / len(vectors)
+                store.seconds_per_vector = per_vector if store.seconds_per_vector is None else (
+                    0.8 * store.seconds_per_vector + 0.2 * per_vector)
+            store.flush()
+
+    def seconds_per_vector(self, model_name):
+        """Average time the model needs for one vector, None if unknown"""
+        with self._lock:
+            store = self._store(model_name)
+            return store.seconds_per_vector if store is not None else None
+
+    def get_stats(self):
+        """Hit/miss counters and the number and size of cached vectors"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = sum(len(store) for store in self._stores.values())
+            stats["size_mb"] = round(sum(store.size_bytes for store in self._stores.values()) / (1024 * 1024), 1)
+        return stats
+
+    def _store(self, model_name, dim=None):
+        """Open the store of a model (caller holds the lock); None if nothing was cached for it yet"""
+        store = self._stores.get(model_name)
+        if store is not None:
+            return store
+        path = os.path.join(self.cache_dir, hashlib.md5(model_name.encode()).hexdigest())
+        if dim is None:
+            try:
+                with open(os.path.join(path, "meta.json"), "r") as f:
+                    dim = json.load(f).get("dim")
+            except (OSError, ValueError):
+                return None
+            if not dim:
+                return None
+        store = self._stores[model_name] = _ModelStore(path, dim, self.max_bytes)
+        return store
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only computes the document vectors missing from the cache"""
+
+    def __init__(self, embeddings, model_name, cache=None):
+        """
+        Args:
+            embeddings: Embeddings to compute missing vectors with
+            model_name: Name of the embedding model, part of the cache key
+            cache: EmbeddingCache to use (defaults to the process-wide one)
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache or get_embedding_cache()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "seconds_embedding": 0.0}
+
+    def embed_documents(self, texts):
+        keys = [text_key(text) for text in texts]
+        vectors = self.cache.lookup(self.model_name, keys)
+
+        # Texts repeated within the batch are embedded once
+        missing = {}
+        for index, (key, vector) in enumerate(zip(keys, vectors)):
+            if vector is None:
+                missing.setdefault(key, []).append(index)
+        seconds = 0.0
+        if missing:
+            start_time = time.time()
+            computed = self.embeddings.embed_documents([texts[indexes[0]] for indexes in missing.values()])
+            seconds = time.time() - start_time
+            self.cache.store(self.model_name, list(missing), computed, seconds)
+            for indexes, vector in zip(missing.values(), computed):
+                for index in indexes:
+                    vectors[index] = list(vector)
+
+        with self._lock:
+            self._stats["hits"] += len(texts) - len(missing)
+            self._stats["misses"] += len(missing)
+            self._stats["seconds_embedding"] += seconds
+        return vectors
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
+
+    def get_stats(self):
+        """Hits, misses, hit rate and estimated seconds saved by the documents embedded through this wrapper"""
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats["hits"] + stats["misses"]
+        seconds_per_vector = self.cache.seconds_per_vector(self.model_name) or 0.0
+        stats["hit_rate"] = round(stats["hits"] / total, 3) if total else 0.0
+        stats["seconds_saved"] = round(stats["hits"] * seconds_per_vector, 2)
+        stats["seconds_embedding"] = round(stats["seconds_embedding"], 2)
+        return stats
+
+
+# Global embedding cache shared by all ingests in this process
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_embedding_cache():
+    """Get the process-wide embedding cache"""
+    global _cache
+
+    if _cache is not None:
+        return _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+    return _cache
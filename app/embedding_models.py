@@ -0,0 +1,242 @@
+"""
+Process-wide registry of loaded embedding models.
+
+Loading a sentence-transformers model reads its weights from disk and moves
+them to the GPU, which takes seconds. The registry loads every model once per
+process and hands the same instance to every caller (creating, updating and
+loading vector stores, chat sessions switching websites). With
+``EMBEDDING_MODEL_CONFIG["preload"]`` the default model is loaded in the
+background when the server starts and warmed up with one inference, so the
+first request does not pay for it. Load and warm-up times are kept as metrics.
+
+Bulk indexing encodes through BatchedEmbeddings, which sets the encode batch
+size and can spread large collections over a sentence-transformers
+multi-process pool (one process per entry of ``BULK_INDEX_CONFIG["encode_devices"]``).
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from langchain_core.embeddings import Embeddings
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def _embedding_device():
+    device = config.EMBEDDING_MODEL_CONFIG["device"]
+    if device:
+        return device
+    try:
+        import torch
+        return 'cuda' if torch.cuda.is_available() else 'cpu'
+    except ImportError:
+        return 'cpu'
+
+
+class EmbeddingModelRegistry:
+    """Loads each embedding model once and shares it between all callers"""
+
+    def __init__(self, loader=None):
+        """
+        Args:
+            loader: Callable ``loader(model_name, device)`` returning an Embeddings
+                instance (defaults to SentenceTransformerEmbeddings)
+        """
+        self.loader = loader or self._load_sentence_transformer
+        self._lock = threading.Lock()
+        self._models = {}  # model name -> Embeddings
+        self._loading = {}  # model name -> Lock held while the model loads
+        self._stats = {}  # model name -> load metrics
+        self._encode_pools = {}  # model name -> sentence-transformers multi-process pool
+
+    def get(self, model_name=None):
+        """
+        Get a loaded embedding model, loading it on first use.
+
+        If the configured model cannot be loaded, the fallback model is loaded instead
+        and returned for the configured name from then on.
+
+        Args:
+            model_name: Model to get (defaults to EMBEDDING_MODEL_CONFIG["model_name"])
+
+        Returns:
+            Shared Embeddings instance
+        """
+        model_name = model_name or config.EMBEDDING_MODEL_CONFIG["model_name"]
+        embeddings = self._models.get(model_name)
+        if embeddings is not None:
+            self._count_request(model_name)
+            return embeddings
+
+        with self._lock:
+            load_lock = self._loading.setdefault(model_name, threading.Lock())
+        # Only one thread loads a model, the others wait for it instead of loading it again
+        with load_lock:
+            embeddings = self._models.get(model_name)
+            if embeddings is None:
+                embeddings = self._load(model_name)
+        self._count_request(model_name)
+        return embeddings
+
+    def warm_up(self, model_name=None):
+        """Load a model and run one inference so its first real use is fast"""
+        model_name = model_name or config.EMBEDDING_MODEL_CONFIG["model_name"]
+        try:
+            embeddings = self.get(model_name)
+            start_time = time.time()
+            embeddings.embed_query("warm-up")
+            warmup_seconds = time.time() - start_time
+        except Exception as e:
+            logger.error(f"Warming up embedding model {model_name} failed: {str(e)}")
+            return False
+        with self._lock:
+            self._stats[model_name]["warmup_seconds"] = round(warmup_seconds, 3)
+        logger.info(f"Embedding model {model_name} warmed up in {warmup_seconds:.2f}s")
+        return True
+
+    def encode_pool(self, model_name=None):
+        """
+        Multi-process encode pool of a model, started on first use.
+
+        Returns:
+            The pool, or None if no encode devices are configured or the model is
+            not a sentence-transformers model
+        """
+        devices = [device.strip() for device in config.BULK_INDEX_CONFIG["encode_devices"].split(",") if device.strip()]
+        if not devices:
+            return None
+        model_name = model_name or config.EMBEDDING_MODEL_CONFIG["model_name"]
+        client = getattr(self.get(model_name), "client", None)
+        if client is None or not hasattr(client, "start_multi_process_pool"):
+            return None
+        with self._lock:
+            pool = self._encode_pools.get(model_name)
+            if pool is None:
+                if not self._encode_pools:
+                    atexit.register(self.shutdown)
+                start_time = time.time()
+                pool = self._encode_pools[model_name] = client.start_multi_process_pool(target_devices=devices)
+                logger.info(f"Started encode pool for {model_name} on {', '.join(devices)} "
+                            f"in {time.time() - start_time:.2f}s")
+        return pool
+
+    def shutdown(self):
+        """Stop the multi-process encode pools"""
+        with self._lock:
+            pools, self._encode_pools = self._encode_pools, {}
+        for pool in pools.values():
+            try:
+                from sentence_transformers import SentenceTransformer
+                SentenceTransformer.stop_multi_process_pool(pool)
+            except Exception as e:
+                logger.warning(f"Could not stop encode pool: {str(e)}")
+
+    def loaded_models(self):
+        """Names of the models loaded so far"""
+        with self._lock:
+            return list(self._models)
+
+    def get_stats(self):
+        """Per-model load time, warm-up time, device and number of requests served"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def _load(self, model_name):
+        model_config = config.EMBEDDING_MODEL_CONFIG
+        device = _embedding_device()
+        start_time = time.time()
+        loaded_name = model_name
+        try:
+            embeddings = self.loader(model_name, device)
+        except Exception as e:
+            fallback = model_config["fallback_model"]
+            if not fallback or fallback == model_name:
+                raise
+            logger.error(f"Error loading embedding model {model_name}: {str(e)}, falling back to {fallback}")
+            embeddings = self.get(fallback)
+            loaded_name = fallback
+        load_seconds = time.time() - start_time
+
+        with self._lock:
+            self._models[model_name] = embeddings
+            self._stats[model_name] = {
+                "loaded_model": loaded_name,
+                "device": device,
+                "load_seconds": round(load_seconds, 3),
+                "warmup_seconds": None,
+                "loaded_at": time.time(),
+                "requests": 0
+            }
+        logger.info(f"✅ Loaded embedding model {loaded_name} on {device} in {load_seconds:.2f}s")
+        return embeddings
+
+    def _count_request(self, model_name):
+        with self._lock:
+            self._stats[model_name]["requests"] += 1
+
+    @staticmethod
+    def _load_sentence_transformer(model_name, device):
+        from langchain_community.embeddings import SentenceTransformerEmbeddings
+        return SentenceTransformerEmbeddings(model_name=model_name, model_kwargs={'device': device})
+
+
+class BatchedEmbeddings(Embeddings):
+    """Encodes documents with an explicit batch size, on a multi-process encode pool when one is given"""
+
+    def __init__(self, embeddings, batch_size, pool=None):
+        """
+        Args:
+            embeddings: Shared embeddings from the registry
+            batch_size: Texts per forward pass
+            pool: Optional pool from EmbeddingModelRegistry.encode_pool
+        """
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.pool = pool
+        self.model_name = getattr(embeddings, "model_name", None)
+
+    def embed_documents(self, texts):
+        client = getattr(self.embeddings, "client", None)
+        if client is None:
+            return self.embeddings.embed_documents(texts)
+        # Same preprocessing as SentenceTransformerEmbeddings.embed_documents
+        texts = [text.replace("\n", " ") for text in texts]
+        if self.pool is not None:
+            vectors = client.encode_multi_process(texts, self.pool, batch_size=self.batch_size)
+        else:
+            encode_kwargs = dict(getattr(self.embeddings, "encode_kwargs", None) or {})
+            encode_kwargs["batch_size"] = self.batch_size
+            vectors = client.encode(texts, **encode_kwargs)
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
+
+
+# Global model registry shared by all requests in this process
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_embedding_registry():
+    """Get the process-wide embedding model registry"""
+    global _registry
+
+    if _registry is not None:
+        return _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = EmbeddingModelRegistry()
+    return _registry
+
+def preload_embedding_model():
+    """Load and warm up the default embedding model in a background thread, if preloading is enabled"""
+    if not config.EMBEDDING_MODEL_CONFIG["preload"]:
+        return None
+    thread = threading.Thread(target=get_embedding_registry().warm_up, name="embedding-warmup", daemon=True)
+    thread.start()
+    return thread
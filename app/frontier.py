@@ -0,0 +1,137 @@
+"""
+Crawl frontier with constant time duplicate detection.
+
+URLs are queued in one deque per crawl depth and every URL that has ever been
+queued or processed is remembered by its canonical key (lower-cased host plus
+path without trailing slash), so scheme, query, fragment and trailing slash
+variants of a page are only crawled once.
+"""
+
+from collections import defaultdict, deque
+from urllib.parse import urlparse
+
+
+def canonical_key(url):
+    """Return the (netloc, path) key used to detect duplicate pages"""
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/') or '/'
+    return parsed.netloc.lower(), path
+
+
+class CrawlFrontier:
+    """
+    Breadth-first queue of URLs to crawl.
+
+    ``pop`` always returns a URL from the shallowest depth that still has
+    pending work. Within a depth, URLs containing one of ``priority_terms``
+    are queued ahead of the rest of the batch they were discovered in.
+    """
+
+    def __init__(self, priority_terms=None):
+        self.priority_terms = [term.lower() for term in (priority_terms or [])]
+        self._levels = defaultdict(deque)
+        self._seen = set()
+        self._pending = 0
+
+    def __len__(self):
+        """Number of URLs waiting to be crawled"""
+        return self._pending
+
+    def __contains__(self, url):
+        """Whether a URL (or a variant of it) was already queued or processed"""
+        return canonical_key(url) in self._seen
+
+    @property
+    def seen_count(self):
+        """Number of distinct pages queued or processed so far"""
+        return len(self._seen)
+
+    def is_priority(self, url):
+        """Whether a URL contains one of the priority terms"""
+        url = url.lower()
+        return any(term in url for term in self.priority_terms)
+
+    def mark_seen(self, url):
+        """Record a URL as processed without queueing it"""
+        self._seen.add(canonical_key(url))
+
+    def add(self, url, depth):
+        """Queue a URL at the given depth, returns False if it was already seen"""
+        key = canonical_key(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self._levels[depth].append(url)
+        self._pending += 1
+        return True
+
+    def add_many(self, urls, depth, link_filter=None):
+        """
+        Queue a batch of discovered URLs, priority URLs first.
+
+        Args:
+            urls: URLs discovered on a page
+            depth: Depth to queue them at
+            link_filter: Optional predicate deciding whether a URL is followed
+
+        Returns:
+            List of URLs that were newly queued
+        """
+        prioritized = []
+        remaining = []
+        for url in urls:
+            key = canonical_key(url)
+            if key in self._seen:
+                continue
+            if link_filter and not link_filter(url):
+                continue
+            self._seen.add(key)
+            if self.is_priority(url):
+                prioritized.append(url)
+            else:
+                remaining.append(url)
+
+        added = prioritized + remaining
+        self._levels[depth].extend(added)
+        self._pending += len(added)
+        return added
+
+    def pop(self):
+        """Return the next (url, depth) pair to crawl, or None if the frontier is empty"""
+        if not self._pending:
+            return None
+        for depth in sorted(self._levels):
+            level = self._levels[depth]
+            if level:
+                self._pending -= 1
+                url = level.popleft()
+                if not level:
+                    del self._levels[depth]
+                return url, depth
+        return None
+
+    def pending_at(self, depth):
+        """Number of URLs waiting at the given depth"""
+        return len(self._levels.get(depth, ()))
+
+    def snapshot(self, in_flight=None):
+        """
+        JSON serializable state of the frontier, for crawl checkpoints.
+
+        Args:
+            in_flight: Optional {url: depth} of pages being fetched, saved as still pending
+        """
+        levels = {depth: list(urls) for depth, urls in self._levels.items()}
+        for url, depth in (in_flight or {}).items():
+            levels.setdefault(depth, []).insert(0, url)
+        return {
+            "levels": [[depth, urls] for depth, urls in sorted(levels.items())],
+            "seen": [list(key) for key in self._seen]
+        }
+
+    def restore(self, state):
+        """Merge a state returned by ``snapshot`` into this frontier"""
+        self._seen.update(tuple(key) for key in state["seen"])
+        for depth, urls in state["levels"]:
+            self._levels[depth].extend(urls)
+            self._pending += len(urls)
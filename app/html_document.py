@@ -0,0 +1,147 @@
+"""
+Parsed HTML document shared by text extraction, link discovery and website
+categorization.
+
+Every consumer used to run its own ``BeautifulSoup(html, 'html.parser')`` over
+the same page. A ParsedPage parses the HTML once with the lxml-backed builder
+(falling back to ``html.parser`` if lxml is missing) and hands the same tree to
+everyone, so the parsing cost is paid once per page. Consumers must treat the
+tree as read-only.
+"""
+
+import logging
+
+from bs4 import BeautifulSoup, CData, FeatureNotFound, NavigableString, Tag
+
+logger = logging.getLogger(__name__)
+
+# Subtrees that never contain visible page text
+NON_TEXT_TAGS = frozenset(['script', 'style', 'noscript', 'iframe', 'head', 'meta'])
+
+# Elements that start a new text block (a paragraph, menu item, table cell, ...)
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'body', 'dd', 'details', 'dialog', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'html', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'table', 'td', 'th', 'tr', 'ul'
+])
+
+# Marks the start and end of a block element during the tree walk
+_BLOCK_BOUNDARY = object()
+
+_TEXT_STRING_TYPES = (NavigableString, CData)
+
+_parser = None
+
+
+def decode_html(html_content):
+    """Decode raw HTML bytes, trying UTF-8 first and falling back to latin-1"""
+    if not isinstance(html_content, bytes):
+        return html_content
+    try:
+        return html_content.decode('utf-8')
+    except UnicodeDecodeError:
+        # latin-1 maps every byte, so this never fails
+        return html_content.decode('latin-1')
+
+
+def _make_soup(html, parser=None):
+    global _parser
+
+    if parser:
+        return BeautifulSoup(html, parser)
+    if _parser is None:
+        try:
+            BeautifulSoup("", 'lxml')
+            _parser = 'lxml'
+        except FeatureNotFound:
+            logger.warning("lxml is not installed, falling back to the slower html.parser")
+            _parser = 'html.parser'
+    return BeautifulSoup(html, _parser)
+
+
+class ParsedPage:
+    """One HTML page, parsed once and shared read-only by every consumer"""
+
+    def __init__(self, html_content, url=None, parser=None):
+        """
+        Args:
+            html_content: HTML content as string or bytes
+            url: URL the page was loaded from (used as the base for relative links)
+            parser: BeautifulSoup tree builder to use instead of lxml
+        """
+        self.url = url
+        self.html = decode_html(html_content) or ""
+        self.soup = _make_soup(self.html, parser)
+        self._full_text = None
+        self._text_blocks = None
+
+    @property
+    def full_text(self):
+        """All document text including the head, as ``soup.get_text()`` returns it"""
+        if self._full_text is None:
+            self._full_text = self.soup.get_text()
+        return self._full_text
+
+    def visible_strings(self):
+        """
+        Stripped, non-empty text strings outside script/style/head-like subtrees,
+        in document order.
+        """
+        return [text for block in self.text_blocks() for text in block]
+
+    def text_blocks(self):
+        """
+        Visible strings grouped into blocks: strings between the start or end of
+        two block elements (paragraphs, list items, cells, ...) form one block.
+        Walks the tree without modifying it.
+
+        Returns:
+            List of non-empty lists of stripped strings, in document order
+        """
+        if self._text_blocks is None:
+            blocks = []
+            current = []
+            stack = [self.soup]
+            while stack:
+                node = stack.pop()
+                if node is _BLOCK_BOUNDARY:
+                    if current:
+                        blocks.append(current)
+                        current = []
+                elif isinstance(node, Tag):
+                    if node.name in NON_TEXT_TAGS:
+                        continue
+                    if node.name in BLOCK_TAGS:
+                        stack.append(_BLOCK_BOUNDARY)
+                        stack.extend(reversed(node.contents))
+                        stack.append(_BLOCK_BOUNDARY)
+                    else:
+                        stack.extend(reversed(node.contents))
+                elif type(node) in _TEXT_STRING_TYPES:
+                    text = node.strip()
+                    if text:
+                        current.append(text)
+            if current:
+                blocks.append(current)
+            self._text_blocks = blocks
+        return self._text_blocks
+
+    def meta_content(self, name):
+        """Content of ``<meta name=...>``, or an empty string"""
+        tag = self.soup.find('meta', {'name': name})
+        if tag is None:
+            return ''
+        return tag.get('content') or ''
+
+    @property
+    def title(self):
+        if self.soup.title is None or self.soup.title.string is None:
+            return ''
+        return str(self.soup.title.string)
+
+
+def parse_html(html_content, url=None):
+    """Return ``html_content`` as a ParsedPage, parsing it only if it is not one already"""
+    if isinstance(html_content, ParsedPage):
+        return html_content
+    return ParsedPage(html_content, url=url)
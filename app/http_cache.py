@@ -0,0 +1,257 @@
+"""
+On-disk HTTP cache with conditional revalidation for the website scraper.
+
+Responses that carry an ``ETag`` or ``Last-Modified`` validator are stored on
+disk. When the same URL is fetched again, the request is sent with
+``If-None-Match``/``If-Modified-Since`` and a ``304 Not Modified`` answer is
+served from the cache instead of downloading the body again. The cache is
+bounded in size and evicts the least recently used entries first.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+import config
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "http_cache")
+
+
+class CachedResponse:
+    """Minimal stand-in for ``requests.Response`` built from a cache entry"""
+
+    def __init__(self, url, content, headers, encoding):
+        self.url = url
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding
+        self.status_code = 200
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def raise_for_status(self):
+        pass
+
+
+class HttpCache:
+    """Size-bounded on-disk cache of validated HTTP responses"""
+
+    def __init__(self, cache_dir=None, max_size_mb=None):
+        """
+        Args:
+            cache_dir: Directory to store cache entries in
+            max_size_mb: Maximum total size of cached bodies in megabytes
+        """
+        self.cache_dir = cache_dir or config.HTTP_CACHE_CONFIG["path"] or HTTP_CACHE_DIR
+        self.max_bytes = int((max_size_mb or config.HTTP_CACHE_CONFIG["max_size_mb"]) * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> body size, least recently used first
+        self._total_bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0,
+                       "bytes_downloaded": 0, "bytes_saved": 0}
+        self._load_index()
+
+    def conditional_headers(self, url):
+        """Validator headers to send for a URL, empty if it is not cached"""
+        meta = self._read_meta(self._key(url))
+        if not meta:
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def get(self, url, requests_kwargs):
+        """
+        Fetch a URL through the cache.
+
+        Args:
+            url: URL to fetch
+            requests_kwargs: Keyword arguments for ``requests.get`` (headers, timeout, ...)
+
+        Returns:
+            ``requests.Response`` for fresh downloads or CachedResponse for 304 hits
+        """
+        kwargs = dict(requests_kwargs)
+        kwargs["headers"] = dict(kwargs.get("headers") or {})
+        kwargs["headers"].update(self.conditional_headers(url))
+
+        response = requests.get(url, **kwargs)
+        if response.status_code == 304:
+            cached = self.load(url)
+            if cached is not None:
+                self._count("hits")
+                self._count("bytes_saved", len(cached.content))
+                return cached
+            # Entry vanished between the request and now, download it in full
+            response = requests.get(url, **requests_kwargs)
+
+        self._count("misses")
+        self._count("bytes_downloaded", len(response.content))
+        if response.status_code == 200:
+            self.store(url, response)
+        return response
+
+    def load(self, url):
+        """Load a cached response, or None if the URL is not cached"""
+        key = self._key(url)
+        meta = self._read_meta(key)
+        if not meta:
+            return None
+        try:
+            with open(self._path(key, "body"), "rb") as f:
+                content = f.read()
+        except OSError:
+            self._remove(key)
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        headers = {"content-type": meta.get("content_type", "")}
+        return CachedResponse(meta.get("final_url") or url, content, headers, meta.get("encoding"))
+
+    def store(self, url, response):
+        """Store a response if it carries an ETag or Last-Modified validator"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return False
+
+        content = response.content
+        if len(content) > self.max_bytes:
+            return False
+
+        key = self._key(url)
+        meta = {
+            "url": url,
+            "final_url": response.url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": response.headers.get("content-type", ""),
+            "encoding": response.encoding,
+            "stored_at": time.time(),
+            "size": len(content)
+        }
+        try:
+            self._write_atomic(self._path(key, "body"), content)
+            self._write_atomic(self._path(key, "json"), json.dumps(meta).encode("utf-8"))
+        except OSError as e:
+            logger.warning(f"Could not write HTTP cache entry for {url}: {str(e)}")
+            return False
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(content)
+            self._total_bytes += len(content)
+            self._stats["stores"] += 1
+        self._evict()
+        return True
+
+    def get_stats(self):
+        """Hit/miss counters and transfer totals"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["size_bytes"] = self._total_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Remove every cache entry"""
+        with self._lock:
+            keys = list(self._entries)
+        for key in keys:
+            self._remove(key)
+
+    def _evict(self):
+        while True:
+            with self._lock:
+                if self._total_bytes <= self.max_bytes or not self._entries:
+                    return
+                key = next(iter(self._entries))
+            self._remove(key)
+            self._count("evictions")
+
+    def _remove(self, key):
+        for suffix in ("body", "json"):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                pass
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+
+    def _load_index(self):
+        """Rebuild the in-memory LRU index from the files on disk, oldest first"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            key = name[:-len(".json")]
+            meta = self._read_meta(key)
+            if meta and os.path.exists(self._path(key, "body")):
+                entries.append((os.path.getmtime(self._path(key, "body")), key, meta.get("size", 0)))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _read_meta(self, key):
+        try:
+            with open(self._path(key, "json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, f"{key}.{suffix}")
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+# Global HTTP cache shared by all crawls in this process
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_http_cache():
+    """Get the process-wide HTTP cache, or None if caching is disabled"""
+    global _cache
+
+    if not config.HTTP_CACHE_CONFIG["enabled"]:
+        return None
+    if _cache is not None:
+        return _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+    return _cache
@@ -0,0 +1,445 @@
+"""
+Streaming website ingestion: crawl -> chunk -> embed -> upsert.
+
+Instead of collecting every page of a crawl and embedding them all at the end,
+pages are handed to an IngestPipeline as soon as their text is extracted. Each
+stage runs on its own thread and the stages are connected by bounded queues:
+
+    submit(page) -> [page queue] -> chunk -> [chunk queue] -> embed (batched) -> [batch queue] -> upsert
+
+Embedding therefore overlaps the network-bound crawl, and when embedding falls
+behind the full queues block ``submit`` so the crawl slows down instead of
+buffering the whole site in memory.
+
+Pages whose content hash matches what the collection already stores are
+skipped, changed pages replace their old chunks, and ``finish`` deletes pages
+that the crawl no longer found. Near-duplicate pages are resolved the same way
+whatever order the crawl delivers them in: the fingerprints of the stored pages
+seed the filter, and a page that outranks one indexed earlier in the crawl
+replaces it once the queues are drained. An optional keyword index of the collection is
+kept in sync with every upsert and delete and saved with the collection.
+"""
+
+import logging
+import queue
+import threading
+import time
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+import config
+from app.embedding_cache import CachedEmbeddings
+from app.quantized_index import placeholder_embeddings
+from app.vector_store import chunk_document_id, page_hash, page_source_key
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream in every queue
+_DONE = object()
+
+
+class StageCounter:
+    """Throughput bookkeeping of one pipeline stage"""
+
+    def __init__(self):
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0  # time spent waiting for room in the next queue
+
+    def as_dict(self):
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "items_per_second": round(self.items / self.busy_seconds, 1) if self.busy_seconds else None
+        }
+
+
+class IngestPipeline:
+    """Bounded, threaded pipeline that indexes crawled pages while the crawl is running"""
+
+    def __init__(self, vector_store, stored_pages, source_type, collection_name,
+                 page_queue_size=None, chunk_queue_size=None, batch_size=None,
+                 flush_interval=None, chunk_size=1000, chunk_overlap=200, dedup=None, boilerplate=None,
+                 keyword_index=None, vector_index=None):
+        """
+        Args:
+            vector_store: Chroma vector store the chunks are upserted into
+            stored_pages: Source URL -> {"hash", "ids", "fingerprint"} of the pages already in the collection
+            source_type: Type of the source (Website, PDF Document, etc.)
+            collection_name: Name of the collection, stored in chunk metadata
+            page_queue_size: Pages buffered between the crawl and the chunker
+            chunk_queue_size: Chunks buffered between the chunker and the embedder
+            batch_size: Number of chunks embedded and upserted together
+            flush_interval: Seconds without new chunks after which a partial batch is embedded
+            chunk_size: Characters per chunk
+            chunk_overlap: Characters shared by neighbouring chunks
+            dedup: Optional NearDuplicateFilter; near-duplicate pages are dropped before chunking
+            boilerplate: Optional BoilerplateFilter; site template text is stripped before deduplication
+            keyword_index: Optional KeywordIndex of the collection, updated with the upserted chunks
+            vector_index: Optional QuantizedVectorIndex that stores the chunk vectors instead of Chroma
+        """
+        pipeline_config = config.INGEST_PIPELINE_CONFIG
+        self.vector_store = vector_store
+        self.stored_pages = stored_pages
+        self.source_type = source_type
+        self.collection_name = collection_name
+        self.batch_size = max(1, batch_size or pipeline_config["embed_batch_size"])
+        self.flush_interval = flush_interval or pipeline_config["flush_interval"]
+        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self.dedup = dedup
+        self.boilerplate = boilerplate
+        self.keyword_index = keyword_index
+        self.vector_index = vector_index
+
+        self._pages = queue.Queue(maxsize=page_queue_size or pipeline_config["page_queue_size"])
+        self._chunks = queue.Queue(maxsize=chunk_queue_size or pipeline_config["chunk_queue_size"])
+        self._batches = queue.Queue(maxsize=2)
+
+        self._lock = threading.Lock()
+        self._seen_urls = set()
+        self._stale_ids = []  # chunk ids of changed pages, deleted by the upsert stage
+        self._page_ids = {}  # source key -> ids of the chunks created for the page during this crawl
+        self._replaced_ids = []  # chunks of pages replaced by a near-duplicate, deleted once the queues are drained
+        self._stats = {"pages_received": 0, "pages_empty": 0, "pages_duplicate": 0, "pages_unchanged": 0,
+                       "pages_changed": 0, "pages_added": 0, "pages_removed": 0, "chunks_created": 0,
+                       "chunks_embedded": 0, "chunks_deleted": 0, "batches": 0, "text_bytes": 0}
+        self._stages = {"submit": StageCounter(), "chunk": StageCounter(),
+                        "embed": StageCounter(), "upsert": StageCounter()}
+        self.error = None
+        self._started_at = None
+        self._threads = []
+        self._closed = False
+        self._aborted = False
+        if dedup is not None:
+            for url, stored in stored_pages.items():
+                if stored.get("fingerprint"):
+                    dedup.remember(url, int(stored["fingerprint"], 16))
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+    @property
+    def chunks_embedded(self):
+        """Chunks embedded so far, cheap enough to read after every page"""
+        return self._stats["chunks_embedded"]
+
+    @property
+    def _halted(self):
+        return self.error is not None or self._aborted
+
+    def start(self):
+        """Start the stage threads"""
+        self._started_at = time.time()
+        for name, target in [("chunk", self._chunk_stage), ("embed", self._embed_stage), ("upsert", self._upsert_stage)]:
+            thread = threading.Thread(target=target, name=f"ingest-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, page):
+        """
+        Queue one extracted page ({"url", "content"}) for indexing.
+
+        Blocks while the page queue is full, which throttles the crawl to the
+        speed of the embedder.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot submit pages to a finished ingest pipeline")
+        blocked_seconds = self._put(self._pages, page)
+        with self._lock:
+            self._stats["pages_received"] += 1
+            self._stages["submit"].items += 1
+            self._stages["submit"].blocked_seconds += blocked_seconds
+
+    def finish(self, remove_missing=True):
+        """
+        Drain the queues, wait for the last upsert and persist the collection.
+
+        Args:
+            remove_missing: Delete stored pages that were not submitted during this crawl
+
+        Returns:
+            Pipeline statistics (see get_stats)
+        """
+        self._close()
+        if not self.failed:
+            try:
+                self._delete_replaced_pages()
+                if remove_missing:
+                    self._remove_missing_pages()
+                self.vector_store.persist()
+                if self.keyword_index is not None:
+                    self.keyword_index.save()
+                if self.vector_index is not None:
+                    self.vector_index.save()
+            except Exception as e:
+                self._fail("finish", e)
+        stats = self.get_stats()
+        logger.info(f"Ingest pipeline finished for '{self.collection_name}': {stats['pages_received']} pages, "
+                    f"{stats['chunks_embedded']} chunks embedded in {stats['elapsed_seconds']}s")
+        return stats
+
+    def abort(self):
+        """Stop indexing, dropping queued pages but keeping what was upserted so far"""
+        if self._closed:
+            return
+        self._aborted = True
+        self._close()
+        try:
+            self._delete_replaced_pages()
+            self.vector_store.persist()
+            if self.keyword_index is not None:
+                self.keyword_index.save()
+            if self.vector_index is not None:
+                self.vector_index.save()
+        except Exception as e:
+            logger.warning(f"Could not persist aborted ingest: {str(e)}")
+
+    def get_stats(self):
+        """Page and chunk counters plus per-stage throughput"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["stages"] = {name: counter.as_dict() for name, counter in self._stages.items()}
+        stats["dedup"] = self.dedup.get_stats() if self.dedup is not None else None
+        stats["boilerplate"] = self.boilerplate.get_stats() if self.boilerplate is not None else None
+        embeddings = getattr(self.vector_store, "embeddings", None)
+        stats["embedding_cache"] = embeddings.get_stats() if isinstance(embeddings, CachedEmbeddings) else None
+        stats["elapsed_seconds"] = round(time.time() - self._started_at, 3) if self._started_at else 0
+        stats["error"] = str(self.error) if self.error else None
+        return stats
+
+    def _close(self):
+        self._closed = True
+        self._pages.put(_DONE)
+        for thread in self._threads:
+            thread.join()
+
+    def _chunk_stage(self):
+        counter = self._stages["chunk"]
+        while True:
+            page = self._pages.get()
+            done = page is _DONE
+            if self._halted:
+                if done:
+                    self._put(self._chunks, _DONE, counter)
+                    return
+                continue
+
+            start_time = time.time()
+            try:
+                if self.boilerplate is None:
+                    ready_pages = [] if done else [page]
+                else:
+                    # Buffers the first pages of the crawl, the rest come back right away
+                    ready_pages = self.boilerplate.flush() if done else self.boilerplate.add(page)
+                chunks = []
+                for ready_page in ready_pages:
+                    chunks.extend(self._chunk_page(ready_page))
+                if done and self.dedup is not None:
+                    self.dedup.release_unconfirmed()
+                chunks.extend(self._chunk_released_pages())
+            except Exception as e:
+                self._fail("chunk", e)
+                chunks = []
+            counter.busy_seconds += time.time() - start_time
+            counter.items += 0 if done else 1
+
+            for chunk in chunks:
+                self._put(self._chunks, chunk, counter)
+            if done:
+                self._put(self._chunks, _DONE, counter)
+                return
+
+    def _chunk_page(self, page):
+        """Split a page into chunks, or return nothing if the stored copy is current"""
+        text = page["content"]
+        if not text or not text.strip():
+            self._count("pages_empty")
+            return []
+
+        url = page_source_key(page)
+        fingerprint = None
+        if self.dedup is not None:
+            duplicate_of, replaced = self.dedup.add(url, text, item=page)
+            if duplicate_of is not None:
+                # Held back pages are counted once their page from the earlier crawl is resolved
+                if not self.dedup.is_remembered(duplicate_of):
+                    self._count("pages_duplicate")
+                return []
+            for replaced_url in replaced:
+                self._drop_replaced_page(replaced_url)
+            fingerprint = self.dedup.fingerprint(url)
+
+        content_hash = page_hash(text)
+        stored = self.stored_pages.get(url)
+        with self._lock:
+            self._seen_urls.add(url)
+            self._stats["text_bytes"] += len(text.encode("utf-8"))
+            # Pages stored before fingerprints were kept are chunked once more to store theirs
+            if stored and stored["hash"] == content_hash and (fingerprint is None or stored.get("fingerprint")):
+                self._stats["pages_unchanged"] += 1
+                return []
+            if stored:
+                self._stats["pages_changed"] += 1
+                self._stale_ids.extend(stored["ids"])
+            else:
+                self._stats["pages_added"] += 1
+
+        metadata = {"source_url": url, "page_hash": content_hash}
+        if fingerprint is not None:
+            metadata["page_fingerprint"] = format(fingerprint, "016x")
+        chunks = self.text_splitter.split_documents([Document(page_content=text, metadata=metadata)])
+        for index, chunk in enumerate(chunks):
+            chunk.metadata["chunk_index"] = index
+            chunk.metadata["source"] = self.source_type
+            chunk.metadata["collection"] = self.collection_name
+            chunk.metadata["chunk_id"] = chunk_document_id(chunk)
+        with self._lock:
+            self._page_ids[url] = [chunk.metadata["chunk_id"] for chunk in chunks]
+        self._count("chunks_created", len(chunks))
+        return chunks
+
+    def _chunk_released_pages(self):
+        """Chunk the pages held back for stored near-duplicates that turned out changed or gone"""
+        chunks = []
+        released = self.dedup.take_released() if self.dedup is not None else []
+        while released:
+            for page in released:
+                chunks.extend(self._chunk_page(page))
+            released = self.dedup.take_released()
+        return chunks
+
+    def _drop_replaced_page(self, url):
+        """Un-index a page of this crawl that a better ranked near-duplicate replaces"""
+        with self._lock:
+            if url not in self._seen_urls:
+                return  # a stored page not crawled again, removed with the missing pages
+            self._seen_urls.discard(url)
+            self._replaced_ids.extend(self._page_ids.pop(url, []))
+            self._stats["pages_duplicate"] += 1
+
+    def _delete_replaced_pages(self):
+        """Delete the chunks of replaced pages, all of them are upserted once the queues are drained"""
+        with self._lock:
+            self._stale_ids.extend(self._replaced_ids)
+            self._replaced_ids = []
+        self._delete_stale_chunks()
+
+    def _embed_stage(self):
+        counter = self._stages["embed"]
+        batch = []
+        while True:
+            try:
+                # Wait for more chunks only while a partial batch is pending
+                chunk = self._chunks.get(timeout=self.flush_interval if batch else None)
+            except queue.Empty:
+                chunk = None
+
+            if chunk is not None and chunk is not _DONE:
+                batch.append(chunk)
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch and not self._halted:
+                start_time = time.time()
+                try:
+                    vectors = self.vector_store.embeddings.embed_documents([doc.page_content for doc in batch])
+                    counter.busy_seconds += time.time() - start_time
+                    counter.items += len(batch)
+                    self._put(self._batches, (batch, vectors), counter)
+                except Exception as e:
+                    self._fail("embed", e)
+            batch = []
+
+            if chunk is _DONE:
+                self._put(self._batches, _DONE, counter)
+                return
+
+    def _upsert_stage(self):
+        counter = self._stages["upsert"]
+        while True:
+            item = self._batches.get()
+            if item is _DONE:
+                if not self._halted:
+                    try:
+                        self._delete_stale_chunks()
+                    except Exception as e:
+                        self._fail("upsert", e)
+                return
+            if self._halted:
+                continue
+
+            batch, vectors = item
+            start_time = time.time()
+            try:
+                self._delete_stale_chunks()
+                batch_ids = [doc.metadata["chunk_id"] for doc in batch]
+                if self.vector_index is not None:
+                    self.vector_index.add(batch_ids, vectors)
+                    vectors = placeholder_embeddings(batch_ids)
+                self.vector_store._collection.upsert(
+                    ids=batch_ids,
+                    embeddings=vectors,
+                    documents=[doc.page_content for doc in batch],
+                    metadatas=[doc.metadata for doc in batch]
+                )
+                if self.keyword_index is not None:
+                    self.keyword_index.add(batch_ids, [doc.page_content for doc in batch])
+            except Exception as e:
+                self._fail("upsert", e)
+                continue
+            counter.busy_seconds += time.time() - start_time
+            counter.items += len(batch)
+            self._count("chunks_embedded", len(batch))
+            self._count("batches")
+
+    def _delete_stale_chunks(self):
+        with self._lock:
+            stale_ids, self._stale_ids = self._stale_ids, []
+        if stale_ids:
+            self.vector_store.delete(ids=stale_ids)
+            if self.keyword_index is not None:
+                self.keyword_index.delete(stale_ids)
+            if self.vector_index is not None:
+                self.vector_index.delete(stale_ids)
+            self._count("chunks_deleted", len(stale_ids))
+
+    def _remove_missing_pages(self):
+        missing_ids = []
+        for url, stored in self.stored_pages.items():
+            if url not in self._seen_urls:
+                missing_ids.extend(stored["ids"])
+                self._count("pages_removed")
+        if missing_ids:
+            self.vector_store.delete(ids=missing_ids)
+            if self.keyword_index is not None:
+                self.keyword_index.delete(missing_ids)
+            if self.vector_index is not None:
+                self.vector_index.delete(missing_ids)
+            self._count("chunks_deleted", len(missing_ids))
+
+    @staticmethod
+    def _put(target, item, counter=None):
+        """Put into a bounded queue and return how long backpressure blocked the caller"""
+        try:
+            target.put_nowait(item)
+            return 0.0
+        except queue.Full:
+            start_time = time.time()
+            target.put(item)
+            blocked_seconds = time.time() - start_time
+        if counter is not None:
+            counter.blocked_seconds += blocked_seconds
+        return blocked_seconds
+
+    def _fail(self, stage, error):
+        logger.error(f"Ingest pipeline {stage} stage failed: {str(error)}")
+        if self.error is None:
+            self.error = error
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
@@ -0,0 +1,316 @@
+"""
+Background jobs for long-running website processing.
+
+Crawling and embedding a website takes minutes, far longer than an HTTP request
+should be held open. JobManager runs each submitted job on a bounded thread
+pool and tracks its state, progress, ETA and result. Every job is written to a
+JSON file in the jobs directory so its status survives a server restart; jobs
+that were still queued or running when the server stopped are reported as
+interrupted.
+
+Clients follow a job with JobManager.follow(), which backs the Server-Sent
+Events endpoint. Followers always receive the latest status; updates that
+arrive while a slow client is still busy are coalesced into one.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = os.path.join(os.path.dirname(__file__), "..", "jobs")
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+ABORTED = "aborted"
+INTERRUPTED = "interrupted"
+FINAL_STATES = (COMPLETED, FAILED, ABORTED, INTERRUPTED)
+
+
+class JobManager:
+    """Runs jobs on a bounded thread pool and persists their status"""
+
+    def __init__(self, jobs_dir=None, max_workers=None, retention_hours=None, persist_interval=None):
+        """
+        Args:
+            jobs_dir: Directory holding one JSON status file per job
+            max_workers: Maximum number of jobs running at the same time
+            retention_hours: Finished jobs older than this are deleted on startup and whenever a job finishes
+            persist_interval: Minimum seconds between progress writes of one job
+        """
+        jobs_config = config.JOBS_CONFIG
+        self.jobs_dir = jobs_dir or jobs_config["path"] or JOBS_DIR
+        self.max_workers = max_workers or jobs_config["max_workers"]
+        retention_hours = jobs_config["retention_hours"] if retention_hours is None else retention_hours
+        self.retention_seconds = retention_hours * 3600
+        self.persist_interval = jobs_config["persist_interval"] if persist_interval is None else persist_interval
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._jobs = {}  # job id -> status dict
+        self._versions = {}  # job id -> number of status changes, for followers
+        self._abort_events = {}  # job id -> threading.Event, for jobs not finished yet
+        self._futures = {}
+        self._last_persisted = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._load_jobs()
+
+    def submit(self, kind, target, runner, owner=None):
+        """
+        Queue a job.
+
+        Args:
+            kind: Type of the job, e.g. "website"
+            target: What the job works on, e.g. the website URL
+            runner: Callable ``runner(report_progress, should_abort)`` returning a
+                (success, result) tuple; ``result`` must be JSON serializable and is an
+                error message when ``success`` is False
+            owner: Session or user id the job belongs to
+
+        Returns:
+            Copy of the new job's status
+        """
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "target": target,
+            "owner": owner,
+            "state": QUEUED,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "pages_done": 0,
+            "pages_total": None,
+            "chunks_embedded": 0,
+            "eta_seconds": None,
+            "last_page": None,
+            "error": None,
+            "result": None
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._versions[job["id"]] = 0
+            self._abort_events[job["id"]] = threading.Event()
+            self._persist(job)
+            self._futures[job["id"]] = self._executor.submit(self._run, job["id"], runner)
+            return dict(job)
+
+    def get(self, job_id):
+        """Copy of a job's status, or None if the job is unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self, owner=None, active_only=False):
+        """Jobs of an owner (or all jobs), newest first"""
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values()
+                    if (owner is None or job["owner"] == owner)
+                    and not (active_only and job["state"] in FINAL_STATES)]
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+    def follow(self, job_id, heartbeat=15.0):
+        """
+        Yield the status of a job whenever it changes, until the job is finished.
+
+        A consumer slower than the updates only sees the latest status; the number
+        of updates merged into it is reported as ``coalesced``.
+
+        Args:
+            job_id: Job to follow
+            heartbeat: Yield None after this many seconds without a change
+
+        Yields:
+            Copy of the job's status with an extra ``coalesced`` count, or None
+        """
+        seen = None
+        while True:
+            with self._changed:
+                if job_id not in self._jobs:
+                    return
+                if self._versions.get(job_id, 0) == seen:
+                    self._changed.wait(heartbeat)
+                version = self._versions.get(job_id, 0)
+                job = None
+                if version != seen:
+                    job = dict(self._jobs[job_id])
+                    job["coalesced"] = version - seen - 1 if seen is not None else 0
+                    seen = version
+            yield job
+            if job is not None and job["state"] in FINAL_STATES:
+                return
+
+    def abort(self, job_id):
+        """
+        Cancel a job: queued jobs never start, running jobs stop at their next abort check.
+
+        Returns:
+            True if the job exists and was not finished yet
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["state"] in FINAL_STATES:
+                return False
+            self._abort_events[job_id].set()
+            future = self._futures.get(job_id)
+            if future is not None and future.cancel():
+                self._finish(job, ABORTED, error="Processing aborted by user.")
+        logger.info(f"Abort requested for job {job_id}")
+        return True
+
+    def shutdown(self, wait=False):
+        """Stop accepting jobs; running jobs are asked to abort unless ``wait`` is set"""
+        if not wait:
+            with self._lock:
+                for event in self._abort_events.values():
+                    event.set()
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job_id, runner):
+        with self._lock:
+            job = self._jobs[job_id]
+            abort_event = self._abort_events[job_id]
+            job["state"] = RUNNING
+            job["started_at"] = time.time()
+            self._persist(job)
+            self._notify(job_id)
+
+        def report_progress(pages_done=None, pages_total=None, chunks_embedded=None, page=None):
+            self._update_progress(job_id, pages_done, pages_total, chunks_embedded, page)
+
+        try:
+            success, result = runner(report_progress, abort_event.is_set)
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            success, result = False, f"Error processing {job['target']}: {str(e)}"
+
+        with self._lock:
+            if success:
+                self._finish(job, COMPLETED, result=result)
+            elif abort_event.is_set():
+                self._finish(job, ABORTED, error=result)
+            else:
+                self._finish(job, FAILED, error=result)
+
+    def _update_progress(self, job_id, pages_done, pages_total, chunks_embedded, page):
+        with self._lock:
+            job = self._jobs[job_id]
+            if pages_done is not None:
+                job["pages_done"] = pages_done
+            if pages_total is not None:
+                job["pages_total"] = pages_total
+            if chunks_embedded is not None:
+                job["chunks_embedded"] = chunks_embedded
+            if page is not None:
+                job["last_page"] = page
+
+            # Remaining pages at the average rate so far
+            elapsed = time.time() - job["started_at"]
+            if job["pages_done"] and job["pages_total"]:
+                remaining = max(0, job["pages_total"] - job["pages_done"])
+                job["eta_seconds"] = round(elapsed / job["pages_done"] * remaining, 1)
+
+            if time.time() - self._last_persisted.get(job_id, 0) >= self.persist_interval:
+                self._persist(job)
+            self._notify(job_id)
+
+    def _finish(self, job, state, result=None, error=None):
+        """Record the final state of a job (caller holds the lock)"""
+        job["state"] = state
+        job["finished_at"] = time.time()
+        job["eta_seconds"] = 0 if state == COMPLETED else None
+        job["result"] = result
+        job["error"] = error
+        self._abort_events.pop(job["id"], None)
+        self._futures.pop(job["id"], None)
+        self._last_persisted.pop(job["id"], None)
+        self._persist(job)
+        self._notify(job["id"])
+        logger.info(f"Job {job['id']} ({job['kind']} {job['target']}) {state}")
+        self._prune_expired()
+
+    def _prune_expired(self):
+        """Forget finished jobs older than the retention period and delete their files (caller holds the lock)"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job["state"] in FINAL_STATES and (job.get("finished_at") or job["created_at"]) < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._versions.pop(job_id, None)
+            try:
+                os.remove(os.path.join(self.jobs_dir, f"{job_id}.json"))
+            except OSError:
+                pass
+        if expired:
+            logger.info(f"Deleted {len(expired)} expired jobs")
+
+    def _notify(self, job_id):
+        """Wake followers after a status change (caller holds the lock)"""
+        self._versions[job_id] = self._versions.get(job_id, 0) + 1
+        self._changed.notify_all()
+
+    def _persist(self, job):
+        path = os.path.join(self.jobs_dir, f"{job['id']}.json")
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(job, f)
+            os.replace(tmp_path, path)
+            self._last_persisted[job["id"]] = time.time()
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not save status of job {job['id']}: {str(e)}")
+
+    def _load_jobs(self):
+        """Restore persisted jobs, marking the ones a restart cut short as interrupted"""
+        now = time.time()
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.jobs_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                logger.warning(f"Ignoring unreadable job file {name}")
+                continue
+
+            if job["state"] in FINAL_STATES:
+                if now - (job.get("finished_at") or job["created_at"]) > self.retention_seconds:
+                    os.remove(path)
+                    continue
+                self._jobs[job["id"]] = job
+            else:
+                with self._lock:
+                    self._jobs[job["id"]] = job
+                    self._finish(job, INTERRUPTED, error="The server restarted before the job finished.")
+
+        if self._jobs:
+            logger.info(f"Loaded {len(self._jobs)} jobs from {self.jobs_dir}")
+
+
+# Global job manager shared by all requests in this process
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_job_manager():
+    """Get the process-wide job manager"""
+    global _manager
+
+    if _manager is not None:
+        return _manager
+
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+    return _manager
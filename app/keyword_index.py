@@ -0,0 +1,188 @@
+"""
+BM25 keyword index of a vector store collection.
+
+Vector search misses chunks that only match a query on exact terms: product
+codes, names, abbreviations. Every collection gets an inverted index that is
+updated wherever its chunks are upserted or deleted and saved next to the
+Chroma data when the collection is persisted. Hybrid search ranks the chunks
+of a query by BM25 and by vector similarity and fuses both rankings with
+reciprocal rank fusion.
+
+Only the term counts of every chunk are saved (gzipped JSON), the postings
+lists are rebuilt when an index is loaded. Collections indexed before keyword
+indexes existed get theirs built from the stored chunk texts on first search.
+"""
+
+import gzip
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+import config
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_INDEX_DIR = os.path.join(os.path.dirname(__file__), "..", "vector_store", "keyword_index")
+STOP_WORDS = frozenset("""
+a an the and or but is are was were be been it its this that these those in on at to for with by about
+as of from into over under what which who whom how when where why do does did can could will would
+should i you he she we they me my your our their not no yes if then than so just there here all any
+""".split())
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Lowercased word tokens of a text without stop words and single characters"""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if len(token) > 1 and token not in STOP_WORDS]
+
+
+class KeywordIndex:
+    """In-memory BM25 inverted index of one collection"""
+
+    def __init__(self, path=None, k1=None, b=None):
+        """
+        Args:
+            path: File the index is saved to and loaded from, None to keep it in memory only
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        search_config = config.HYBRID_SEARCH_CONFIG
+        self.path = path
+        self.k1 = k1 if k1 is not None else search_config["bm25_k1"]
+        self.b = b if b is not None else search_config["bm25_b"]
+
+        self._lock = threading.Lock()
+        self._docs = {}  # chunk id -> {term: count}
+        self._lengths = {}  # chunk id -> number of terms
+        self._postings = {}  # term -> {chunk id: count}
+        self._total_length = 0
+        self.loaded = False  # True once the index holds the collection's chunks (saved or rebuilt)
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, ids, texts):
+        """Index chunks, replacing chunks that were indexed under the same ids"""
+        with self._lock:
+            for chunk_id, text in zip(ids, texts):
+                chunk_id = str(chunk_id)
+                self._remove(chunk_id)
+                self._insert(chunk_id, Counter(tokenize(text)))
+
+    def delete(self, ids):
+        with self._lock:
+            for chunk_id in ids:
+                self._remove(str(chunk_id))
+
+    def clear(self):
+        with self._lock:
+            self._docs, self._lengths, self._postings = {}, {}, {}
+            self._total_length = 0
+
+    def search(self, query, k):
+        """
+        Chunks ranked by BM25 score for a query.
+
+        Returns:
+            List of (chunk id, score), best first, at most k entries
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self._docs)
+            if not terms or not count:
+                return []
+            average_length = self._total_length / count
+            scores = Counter()
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / average_length)
+                    scores[chunk_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores.most_common(k)
+
+    def save(self):
+        """Write the index to its file (atomically)"""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({"docs": self._docs}).encode("utf-8")
+            self.loaded = True
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with gzip.open(f"{self.path}.tmp", "wb", compresslevel=3) as f:
+            f.write(data)
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def _insert(self, chunk_id, counts):
+        self._docs[chunk_id] = dict(counts)
+        length = sum(counts.values())
+        self._lengths[chunk_id] = length
+        self._total_length += length
+        for term, frequency in counts.items():
+            self._postings.setdefault(term, {})[chunk_id] = frequency
+
+    def _remove(self, chunk_id):
+        counts = self._docs.pop(chunk_id, None)
+        if counts is None:
+            return
+        self._total_length -= self._lengths.pop(chunk_id)
+        for term in counts:
+            postings = self._postings[term]
+            del postings[chunk_id]
+            if not postings:
+                del self._postings[term]
+
+    def _load(self):
+        try:
+            with gzip.open(self.path, "rb") as f:
+                docs = json.loads(f.read().decode("utf-8"))["docs"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load keyword index {self.path}, it will be rebuilt: {str(e)}")
+            return
+        for chunk_id, counts in docs.items():
+            self._insert(chunk_id, counts)
+        self.loaded = True
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Fuse several rankings of ids.
+
+    Args:
+        rankings: Lists of ids, best first
+        k: Dampens the weight of the top ranks
+
+    Returns:
+        All ids ordered by the sum of 1 / (k + rank) over the rankings
+    """
+    scores = Counter()
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] += 1.0 / (k + rank)
+    return [item_id for item_id, _ in scores.most_common()]
+
+
+# Keyword indexes loaded in this process, one per collection
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_keyword_index(collection_name):
+    """Get the keyword index of a collection, loading it from disk on first use"""
+    index = _indexes.get(collection_name)
+    if index is not None:
+        return index
+
+    with _indexes_lock:
+        index = _indexes.get(collection_name)
+        if index is None:
+            index_dir = config.HYBRID_SEARCH_CONFIG["index_dir"] or KEYWORD_INDEX_DIR
+            index = _indexes[collection_name] = KeywordIndex(os.path.join(index_dir, f"{collection_name}.json.gz"))
+    return index
@@ -0,0 +1,66 @@
+"""
+Process pool for CPU-bound parsing during crawls.
+
+Parsing HTML with BeautifulSoup and extracting PDF text are pure Python and
+hold the GIL, so on the crawler's thread pool they run on one core no matter
+how many pages are in flight. Work submitted to this pool runs in separate
+worker processes: the crawler sends raw HTML or document bytes and gets
+compact results (text blocks, links, page texts) back, so fetching and parsing
+overlap and a crawl can use every core. One pool is shared by all crawls of
+the process.
+
+The pool is opt-in (``PROCESS_POOL_CONFIG["workers"]`` >= 0). Its workers are
+started with the ``spawn`` method, never forked: the web process runs threads
+(and eventlet's monkeypatching under gunicorn), which a forked child would
+inherit in an inconsistent state.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def pool_workers():
+    """Number of worker processes to use, 0 if work should stay in the calling process"""
+    workers = config.PROCESS_POOL_CONFIG["workers"]
+    if workers < 0:
+        return 0
+    # 0: every core but one, which stays free for fetching and the event loop
+    return workers or (os.cpu_count() or 1) - 1
+
+
+# Global process pool shared by all crawls in this process
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_process_pool():
+    """Get the process-wide parsing pool, None if it is disabled (workers < 0, the default, or a single core)"""
+    global _pool
+
+    if _pool is not None:
+        return _pool
+
+    workers = pool_workers()
+    if workers < 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            logger.info(f"Starting parsing process pool with {workers} workers")
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(shutdown_process_pool)
+    return _pool
+
+def shutdown_process_pool():
+    """Shut down the process-wide parsing pool if it was created"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,261 @@
+"""
+Quantized vector storage for large collections.
+
+Chroma keeps every chunk vector as float32, on disk and, once a collection is
+queried, in its in-memory HNSW index. With ``QUANTIZATION_CONFIG["mode"]`` set
+to ``float16`` or ``int8``, new collections created through VectorStoreManager
+keep their vectors in a QuantizedVectorIndex instead: float16 halves their
+size, int8 with one float32 scale per vector quarters it. Chroma then only
+stores the chunk texts and metadata, with a one-dimensional placeholder vector
+per chunk.
+
+Searches score every vector of the collection on the quantized codes. With
+``rescore`` enabled, the best ``rescore_factor * k`` candidates are re-ranked
+with their exact float32 vectors, which are kept in a memory-mapped file and
+therefore read from disk only for those candidates.
+
+Collections created before, or while quantization is off, keep using Chroma's
+float32 vectors.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import zlib
+from bisect import bisect_right
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+QUANTIZED_INDEX_DIR = os.path.join(os.path.dirname(__file__), "..", "vector_store", "quantized")
+MODES = ("float16", "int8")
+SEARCH_BLOCK_ROWS = 8192  # rows converted to float32 at a time while scoring
+
+
+def placeholder_embeddings(ids):
+    """One-dimensional vectors stored in Chroma for chunks whose real vectors are quantized"""
+    return [[zlib.crc32(str(chunk_id).encode("utf-8")) / 2 ** 32] for chunk_id in ids]
+
+
+def _normalized(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class QuantizedVectorIndex:
+    """Cosine similarity search over float16 or int8 vectors of one collection"""
+
+    def __init__(self, path, mode=None, rescore=None):
+        """
+        Args:
+            path: Directory the index is saved to
+            mode: "float16" or "int8" for a new index; a saved index keeps its own mode
+            rescore: Keep float32 vectors on disk and re-rank the best candidates with them
+        """
+        quantization_config = config.QUANTIZATION_CONFIG
+        self.path = path
+        self.mode = mode or quantization_config["mode"]
+        self.rescore = rescore if rescore is not None else quantization_config["rescore"]
+        self.rescore_factor = quantization_config["rescore_factor"]
+        self.dim = None
+
+        self._lock = threading.Lock()
+        self._ids = []  # row -> chunk id
+        self._positions = {}  # chunk id -> row of its live vector
+        self._alive = np.zeros(0, dtype=bool)
+        self._codes = None  # rows x dim, int8 or float16
+        self._scales = None  # rows, float32 (int8 only)
+        self._full_blocks = []  # float32 rows for rescoring: the saved memmap, then added batches
+        self._block_starts = []
+        if os.path.exists(os.path.join(path, "meta.json")):
+            self._load()
+        elif self.mode not in MODES:
+            raise ValueError(f"Unknown quantization mode: {self.mode}")
+
+    def __len__(self):
+        return len(self._positions)
+
+    def add(self, ids, vectors):
+        """Add chunk vectors, replacing vectors added before under the same ids"""
+        if not len(ids):
+            return
+        vectors = _normalized(vectors)
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._codes = np.zeros((0, self.dim), dtype=np.int8 if self.mode == "int8" else np.float16)
+                self._scales = np.zeros(0, dtype=np.float32)
+            for chunk_id in ids:
+                self._kill(str(chunk_id))
+            first_row = len(self._ids)
+            codes, scales = self._quantize(vectors)
+            self._codes = np.concatenate([self._codes, codes])
+            if scales is not None:
+                self._scales = np.concatenate([self._scales, scales])
+            self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+            for offset, chunk_id in enumerate(ids):
+                self._ids.append(str(chunk_id))
+                self._positions[str(chunk_id)] = first_row + offset
+            if self.rescore:
+                self._block_starts.append(first_row)
+                self._full_blocks.append(vectors)
+
+    def delete(self, ids):
+        with self._lock:
+            for chunk_id in ids:
+                self._kill(str(chunk_id))
+
+    def search(self, query_vector, k):
+        """
+        Chunks most similar to a query vector.
+
+        Returns:
+            List of (chunk id, cosine similarity), best first, at most k entries
+        """
+        query = _normalized(query_vector)
+        with self._lock:
+            live = len(self._positions)
+            if not live or k <= 0:
+                return []
+            scores = np.empty(len(self._ids), dtype=np.float32)
+            for start in range(0, len(self._ids), SEARCH_BLOCK_ROWS):
+                stop = start + SEARCH_BLOCK_ROWS
+                scores[start:stop] = self._codes[start:stop].astype(np.float32) @ query
+            if self.mode == "int8":
+                scores *= self._scales
+            scores[~self._alive] = -np.inf
+
+            candidates = min(live, k * self.rescore_factor if self.rescore else k)
+            rows = np.argpartition(-scores, candidates - 1)[:candidates]
+            if self.rescore:
+                scores = {int(row): float(self._full_row(int(row)) @ query) for row in rows}
+            else:
+                scores = {int(row): float(scores[row]) for row in rows}
+            best = sorted(scores, key=scores.get, reverse=True)[:k]
+            return [(self._ids[row], scores[row]) for row in best]
+
+    def memory_bytes(self):
+        """Bytes of the quantized codes and scales held in memory"""
+        with self._lock:
+            if self._codes is None:
+                return 0
+            return self._codes.nbytes + self._scales.nbytes
+
+    def save(self):
+        """Write the live vectors to the index directory, dropping deleted rows"""
+        with self._lock:
+            if self.dim is None:
+                return
+            os.makedirs(self.path, exist_ok=True)
+            rows = np.flatnonzero(self._alive)
+            ids = [self._ids[row] for row in rows]
+            self._write_array("codes.npy", self._codes[rows])
+            if self.mode == "int8":
+                self._write_array("scales.npy", self._scales[rows])
+            if self.rescore and not len(rows):
+                self._write_array("full.npy", np.zeros((0, self.dim), dtype=np.float32))
+            elif self.rescore:
+                # Streamed block by block into a new file, the old one may still be mapped
+                tmp_path = os.path.join(self.path, "full.npy.tmp")
+                full = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(len(rows), self.dim))
+                for start in range(0, len(rows), SEARCH_BLOCK_ROWS):
+                    block_rows = rows[start:start + SEARCH_BLOCK_ROWS]
+                    full[start:start + len(block_rows)] = [self._full_row(int(row)) for row in block_rows]
+                full.flush()
+                del full
+                os.replace(tmp_path, os.path.join(self.path, "full.npy"))
+            meta_path = os.path.join(self.path, "meta.json")
+            with open(f"{meta_path}.tmp", "w") as f:
+                json.dump({"mode": self.mode, "dim": self.dim, "rescore": self.rescore, "ids": ids}, f)
+            os.replace(f"{meta_path}.tmp", meta_path)
+            # Continue from the compacted files
+            self._load()
+
+    def disk_bytes(self):
+        if not os.path.isdir(self.path):
+            return 0
+        return sum(os.path.getsize(os.path.join(self.path, name)) for name in os.listdir(self.path))
+
+    def _quantize(self, vectors):
+        if self.mode == "float16":
+            return vectors.astype(np.float16), None
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def _kill(self, chunk_id):
+        row = self._positions.pop(chunk_id, None)
+        if row is not None:
+            self._alive[row] = False
+
+    def _full_row(self, row):
+        block = bisect_right(self._block_starts, row) - 1
+        return self._full_blocks[block][row - self._block_starts[block]]
+
+    def _write_array(self, name, array):
+        file_path = os.path.join(self.path, name)
+        with open(f"{file_path}.tmp", "wb") as f:
+            np.save(f, array)
+        os.replace(f"{file_path}.tmp", file_path)
+
+    def _load(self):
+        """Read the saved index (caller holds the lock or is the constructor)"""
+        with open(os.path.join(self.path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        self.mode, self.dim, self.rescore = meta["mode"], meta["dim"], meta["rescore"]
+        self._ids = meta["ids"]
+        self._positions = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._alive = np.ones(len(self._ids), dtype=bool)
+        self._codes = np.load(os.path.join(self.path, "codes.npy"))
+        self._scales = (np.load(os.path.join(self.path, "scales.npy")) if self.mode == "int8"
+                        else np.zeros(0, dtype=np.float32))
+        self._full_blocks, self._block_starts = [], []
+        if self.rescore:
+            # Empty arrays cannot be memory-mapped
+            self._full_blocks.append(np.load(os.path.join(self.path, "full.npy"), mmap_mode="r" if self._ids else None))
+            self._block_starts.append(0)
+
+
+# Quantized indexes opened in this process, one per collection
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def _index_path(collection_name):
+    return os.path.join(config.QUANTIZATION_CONFIG["index_dir"] or QUANTIZED_INDEX_DIR, collection_name)
+
+def get_quantized_index(collection_name, create=False):
+    """
+    Get the quantized index of a collection.
+
+    Args:
+        collection_name: Name of the collection
+        create: Start a new index if the collection has none and quantization is enabled
+
+    Returns:
+        QuantizedVectorIndex, or None if the collection stores float32 vectors in Chroma
+    """
+    index = _indexes.get(collection_name)
+    if index is not None:
+        return index
+
+    with _indexes_lock:
+        index = _indexes.get(collection_name)
+        if index is None:
+            path = _index_path(collection_name)
+            if os.path.exists(os.path.join(path, "meta.json")) or (
+                    create and config.QUANTIZATION_CONFIG["mode"] in MODES):
+                index = _indexes[collection_name] = QuantizedVectorIndex(path)
+    return index
+
+def drop_quantized_index(collection_name):
+    """Forget and delete the quantized index of a deleted collection"""
+    with _indexes_lock:
+        _indexes.pop(collection_name, None)
+        shutil.rmtree(_index_path(collection_name), ignore_errors=True)
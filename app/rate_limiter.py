@@ -0,0 +1,222 @@
+"""
+Adaptive per-host request rate control for the website scraper.
+
+Every response (its latency and status code) is recorded per host. Hosts that
+answer quickly get more concurrent requests, one more at a time; slow responses
+and 5xx errors shrink the allowed concurrency, and ``429 Too Many Requests`` or
+``503 Service Unavailable`` halve it, space out request starts and block the
+host until its ``Retry-After`` time has passed. The crawler asks the controller
+how long to wait before starting a request and waits asynchronously, so a
+throttling host never stalls requests to other hosts.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import config
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUS = (429, 503)
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+# Weight of the newest sample in the per-host latency average
+LATENCY_SMOOTHING = 0.3
+# Seconds of successful responses used to measure the rate a host accepted before it throttled
+RATE_WINDOW = 3.0
+
+
+def parse_retry_after(value, now=None):
+    """
+    Seconds to wait according to a ``Retry-After`` header (delay seconds or HTTP date).
+
+    Returns:
+        Non-negative number of seconds, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, retry_at - (now or time.time()))
+
+
+def retry_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number ``attempt`` (1-based), preferring the server's Retry-After"""
+    rate_config = config.RATE_LIMIT_CONFIG
+    if retry_after is not None:
+        return min(retry_after, rate_config["max_retry_after"])
+    return rate_config["backoff_base"] * (2 ** (attempt - 1))
+
+
+class _HostState:
+    def __init__(self, limit):
+        self.limit = float(limit)
+        self.rate = None  # requests per second allowed, None until the host throttles
+        self.ceiling = None  # rate at which the host last throttled
+        self.limit_ceiling = None  # concurrency at which the host last throttled
+        self.successes = deque(maxlen=512)  # recent times of successful responses
+        self.next_start = 0.0
+        self.blocked_until = 0.0
+        self.last_backoff = 0.0
+        self.latency = None
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+
+class HostRateController:
+    """Thread-safe per-host concurrency and pacing shared by all crawls of the process"""
+
+    def __init__(self, initial_per_host=None, max_per_host=None, target_latency=None, max_interval=None,
+                 adaptive=None):
+        """
+        Args:
+            initial_per_host: Concurrent requests allowed against a host before anything is known
+            max_per_host: Upper bound for the concurrency of a fast host
+            target_latency: Responses slower than this many seconds reduce the concurrency
+            max_interval: Upper bound for the spacing between request starts
+            adaptive: Set to False to keep the initial concurrency and only honour Retry-After
+        """
+        rate_config = config.RATE_LIMIT_CONFIG
+        self.initial_per_host = max(1, initial_per_host or config.CRAWL_CONFIG["per_host_limit"])
+        self.max_per_host = max(self.initial_per_host, max_per_host or rate_config["max_per_host"])
+        self.target_latency = target_latency or rate_config["target_latency"]
+        self.max_interval = max_interval or rate_config["max_interval"]
+        self.adaptive = rate_config["adaptive"] if adaptive is None else adaptive
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def limit(self, host):
+        """Number of concurrent requests currently allowed against a host"""
+        with self._lock:
+            return max(1, int(self._state(host).limit))
+
+    def reserve(self, host):
+        """
+        Reserve the next request start against a host.
+
+        Returns:
+            Seconds the caller has to wait before sending the request
+        """
+        with self._lock:
+            state = self._state(host)
+            now = time.time()
+            start = max(now, state.blocked_until, state.next_start)
+            state.next_start = start + (1 / state.rate if state.rate else 0.0)
+            return start - now
+
+    def record(self, host, seconds=None, status_code=None, retry_after=None, failed=False):
+        """
+        Record the outcome of a request.
+
+        Args:
+            host: Host the request went to
+            seconds: Response time
+            status_code: HTTP status code, None if no response arrived
+            retry_after: Seconds from a Retry-After header
+            failed: True for timeouts and connection errors
+        """
+        with self._lock:
+            state = self._state(host)
+            state.requests += 1
+            if seconds is not None:
+                state.latency = seconds if state.latency is None else (
+                    LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * state.latency)
+
+            if status_code in THROTTLE_STATUS:
+                state.throttled += 1
+                now = time.time()
+                wait = retry_delay(1, retry_after) if retry_after is not None else 1.0
+                # Requests sent before the last back-off are rejected for the old rate, back off once for them
+                if self.adaptive and now - (seconds or 0.0) >= state.last_backoff:
+                    state.last_backoff = now
+                    state.limit_ceiling = state.limit
+                    state.limit = max(1.0, state.limit / 2)
+                    # Pace requests below the rate the host just refused
+                    accepted = self._recent_rate(state, now)
+                    if accepted is not None:
+                        state.ceiling = min(accepted, state.rate) if state.rate else accepted
+                        state.rate = max(1 / self.max_interval, state.ceiling * 0.75)
+                    rate = f"{state.rate:.1f} requests/s" if state.rate else "unpaced"
+                    logger.info(f"{host} is throttling ({status_code}), limit {int(state.limit)}, "
+                                f"{rate}, paused for {wait:.1f}s")
+                state.blocked_until = max(state.blocked_until, now + wait)
+            elif failed or (status_code is not None and status_code >= 500):
+                state.errors += 1
+                if self.adaptive:
+                    state.limit = max(1.0, state.limit * 0.75)
+            elif self.adaptive:
+                state.successes.append(time.time())
+                if state.latency is not None and state.latency > self.target_latency:
+                    state.limit = max(1.0, state.limit * 0.9)
+                else:
+                    # Additive increase: roughly one more slot per window of successful requests,
+                    # ten times slower once the concurrency the host throttled at is near
+                    step = 1 / state.limit
+                    if state.limit_ceiling and state.limit + 1 >= state.limit_ceiling:
+                        step /= 10
+                    state.limit = min(self.max_per_host, state.limit + step)
+                    if state.rate:
+                        # Recover quickly to just below the rate that caused throttling, then probe slowly
+                        if state.rate < state.ceiling * 0.9:
+                            state.rate = min(state.ceiling * 0.9, state.rate * 1.05)
+                        else:
+                            state.rate *= 1.005
+
+    def get_stats(self):
+        """Per-host concurrency, pacing and response counters"""
+        with self._lock:
+            return {
+                host: {
+                    "limit": int(state.limit),
+                    "rate": round(state.rate, 2) if state.rate else None,
+                    "latency": round(state.latency, 3) if state.latency is not None else None,
+                    "requests": state.requests,
+                    "throttled": state.throttled,
+                    "errors": state.errors
+                }
+                for host, state in self._hosts.items()
+            }
+
+    @staticmethod
+    def _recent_rate(state, now):
+        """
+        Successful responses per second over the last RATE_WINDOW seconds, leaving out the
+        last pause (blocked_until still holds its end), or None if there are too few
+        """
+        since = max(now - RATE_WINDOW, min(state.blocked_until, now))
+        recent = [moment for moment in state.successes if moment >= since]
+        if len(recent) < 5:
+            return None
+        return len(recent) / max(now - min(since, recent[0]), 0.1)
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.initial_per_host)
+        return state
+
+
+# Global rate controller shared by all crawls in this process
+_controller = None
+_controller_lock = threading.Lock()
+
+def get_rate_controller():
+    """Get the process-wide host rate controller"""
+    global _controller
+
+    if _controller is not None:
+        return _controller
+
+    with _controller_lock:
+        if _controller is None:
+            _controller = HostRateController()
+    return _controller
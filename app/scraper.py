@@ -1,75 +1,27 @@
 from langchain_community.document_loaders import WebBaseLoader
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import hashlib
 import logging
 import time
 import re
-import tempfile
-import os
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
+import config
+from app.browser_pool import get_browser_pool, shutdown_browser_pool
+from app.http_cache import get_http_cache
+from app.html_document import parse_html
+from app.rate_limiter import get_rate_controller, parse_retry_after, retry_delay, RETRYABLE_STATUS, THROTTLE_STATUS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create a global Selenium driver that can be reused
-_driver = None
-
-def get_selenium_driver():
-    """Get or create a Selenium WebDriver instance with appropriate settings."""
-    global _driver
-
-    if _driver is not None:
-        try:
-            # Check if existing driver is still working
-            _driver.current_url
-            return _driver
-        except:
-            # If driver is not responsive, close and create a new one
-            try:
-                _driver.quit()
-            except:
-                pass
-            _driver = None
-
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--remote-debugging-port=9222")
-    options.add_argument("--disable-notifications")
-    options.add_argument("--disable-popup-blocking")
-
-    # Set user agent to mimic a real browser
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-
-    try:
-        _driver = webdriver.Chrome(options=options)
-        _driver.set_page_load_timeout(30)
-        return _driver
-    except Exception as e:
-        logger.error(f"Error creating Selenium driver: {str(e)}")
-        return None
-
 def close_selenium_driver():
-    """Close the Selenium WebDriver if it exists."""
-    global _driver
-    if _driver is not None:
-        try:
-            _driver.quit()
-        except:
-            pass
-        _driver = None
+    """Shut down the pooled Selenium browsers (call on process exit, not after every crawl)."""
+    shutdown_browser_pool()
 
 def extract_data(url, max_pages=100, same_domain=True):
     """Extract data from a given URL. For websites, crawl up to max_pages."""
@@ -87,40 +39,108 @@ def extract_data(url, max_pages=100, same_domain=True):
 
 def extract_data_multi_page(start_url, max_pages=100, same_domain=True):
     """Extract data from a start URL and crawl internal links up to max_pages, only following links containing the original path."""
-    visited = set()
-    to_visit = [start_url]
-    all_documents = []
+    from app.crawler import CrawlEngine
 
     domain = urlparse(start_url).netloc
     original_path = urlparse(start_url).path
 
-    while to_visit and len(visited) < max_pages:
-        url = to_visit.pop(0)
-        if url in visited:
-            continue
-        try:
-            resp = requests.get(url)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-            # Extract main content (customize as needed)
-            main_content = soup.get_text()
-            all_documents.append({"url": url, "content": main_content})
-
-            # Find all internal links
-            for a in soup.find_all("a", href=True):
-                link = urljoin(url, a["href"])
-                link_parsed = urlparse(link)
-                # Only follow links that are on the same domain and contain the original path
-                if same_domain and link_parsed.netloc != domain:
-                    continue
-                if original_path not in link_parsed.path:
-                    continue
-                if link not in visited and link not in to_visit and link.startswith("http"):
-                    to_visit.append(link)
-        except Exception as e:
-            logger.error(f"Error extracting {url}: {str(e)}")
-        visited.add(url)
-    return all_documents
+    def follow_link(link):
+        link_parsed = urlparse(link)
+        # Only follow links that are on the same domain and contain the original path
+        if same_domain and link_parsed.netloc != domain:
+            return False
+        return original_path in link_parsed.path
+
+    engine = CrawlEngine(
+        headers={},
+        max_pages=max_pages,
+        max_depth=max_pages,  # No depth limit, the page budget bounds the crawl
+        link_filter=follow_link,
+        allow_selenium=False
+    )
+    result = engine.crawl([start_url])
+    return [{"url": page["url"], "content": page["content"]} for page in result.pages]
+
+class FetchResult:
+    """
+    Everything learned from fetching one URL.
+
+    A page is downloaded once and rendered with Selenium at most once. Both text
+    extraction and link discovery read from the same result, so nobody has to
+    load the URL again.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.final_url = url
+        self.content = None  # HTML/text string, or the bytes of a pdf/docx file
+        self.content_type = None  # 'html', 'text', 'pdf', 'docx' or None on failure
+        self.render_mode = None  # 'http' or 'selenium'
+        self.error = None
+        self.timings = {}  # seconds spent per step: 'fetch', 'render'
+        self.render_attempted = False
+        self.from_cache = False  # True when a 304 was served from the HTTP cache
+        self.status_code = None  # HTTP status of the last response, None if none arrived
+        self.retry_after = None  # Seconds from the last response's Retry-After header
+        self.retryable = False  # True when the last failure is worth retrying later (429, 5xx, timeout)
+        self._dom_links = []
+        self._links = None
+        self._document = None
+
+    @property
+    def ok(self):
+        return self.content is not None
+
+    @property
+    def rendered(self):
+        return self.render_mode == 'selenium'
+
+    @property
+    def document(self):
+        """Parsed HTML shared by text extraction and link discovery, None for non-HTML content"""
+        if self._document is None and self.content_type == 'html' and self.content:
+            self._document = parse_html(self.content, url=self.final_url)
+        return self._document
+
+    @property
+    def links(self):
+        """Same-domain links found in the page (parsed once, then cached)"""
+        if self._links is None:
+            links = list(self._dom_links)
+            if self.document is not None:
+                links.extend(extract_links(self.document, self.final_url))
+            self._links = list(dict.fromkeys(links))
+        return self._links
+
+    def use_extracted_links(self, links):
+        """Take the page's links from extract_page (e.g. run in a worker process) instead of parsing here"""
+        self._links = list(dict.fromkeys(list(self._dom_links) + list(links)))
+
+    def set_content(self, content, content_type, render_mode='http'):
+        self.content = content
+        self.content_type = content_type
+        self.render_mode = render_mode
+        self._links = None
+        self._document = None
+
+    def apply_render(self, rendered):
+        """Merge a Selenium render into this result, keeping the larger HTML"""
+        page_source, dom_links, final_url, seconds = rendered
+        self.timings['render'] = seconds
+        self._dom_links = dom_links
+        self._links = None
+        self.render_mode = 'selenium'
+        if page_source and (not self.content or len(page_source) > len(self.content)):
+            if self.content:
+                logger.info(f"Using Selenium-rendered content for {self.url} (static: {len(self.content)} bytes, dynamic: {len(page_source)} bytes)")
+            self.content = page_source
+            self.content_type = 'html'
+            self.final_url = final_url or self.final_url
+            self._document = None
+
+    def as_tuple(self):
+        """Legacy (content, error message, content type) tuple"""
+        return self.content, self.error, self.content_type
 
 def get_page_content(page_url, headers, retries=3, timeout=30, use_selenium=True):
     """
@@ -136,26 +156,60 @@ def get_page_content(page_url, headers, retries=3, timeout=30, use_selenium=True
     Returns:
         Tuple of (content, error message, content type)
     """
+    return fetch_page(page_url, headers, retries=retries, timeout=timeout, use_selenium=use_selenium).as_tuple()
+
+def fetch_page(page_url, headers, retries=3, timeout=30, use_selenium=True, retry_later=False, rate_controller=None):
+    """
+    Fetch a URL once and return a FetchResult with its content and links.
+
+    Retries wait (blocking) for the server's Retry-After or an exponential backoff,
+    errors that retrying cannot fix (404, 403, ...) are not retried. The crawler
+    fetches with ``retries=1, retry_later=True`` and schedules retries itself.
+
+    Args:
+        page_url: The URL to fetch
+        headers: HTTP headers to use with requests
+        retries: Number of retry attempts
+        timeout: Request timeout in seconds
+        use_selenium: Whether to attempt JavaScript rendering with Selenium
+        retry_later: The caller retries retryable failures itself, so they skip the Selenium fallback
+        rate_controller: HostRateController to report responses to (defaults to the process-wide one)
+
+    Returns:
+        FetchResult (check ``result.ok`` / ``result.error``)
+    """
+    # Normalize URL
+    page_url = normalize_url(page_url)
+    result = FetchResult(page_url)
+    host = urlparse(page_url).netloc
+    rate_controller = rate_controller or get_rate_controller()
+
     # First try with regular requests for better performance
     for attempt in range(retries):
+        start_time = None
         try:
-            # Add random delay between attempts to avoid triggering rate limits
+            # Back off before retrying, as long as the server asked for (Retry-After)
             if attempt > 0:
-                delay = 2 + attempt * 2  # Increasing backoff
-                time.sleep(delay)
-
-            # Normalize URL
-            page_url = normalize_url(page_url)
-
-            # Try standard requests first
-            response = requests.get(
-                page_url,
-                headers=headers,
-                timeout=timeout,
-                verify=False,
-                allow_redirects=True
-            )
+                time.sleep(retry_delay(attempt, result.retry_after))
+            result.status_code = result.retry_after = None
+            result.retryable = False
+
+            # Try standard requests first, revalidating cached copies when we have them
+            start_time = time.time()
+            request_kwargs = dict(headers=headers, timeout=timeout, verify=False, allow_redirects=True)
+            cache = get_http_cache()
+            if cache is not None:
+                response = cache.get(page_url, request_kwargs)
+            else:
+                response = requests.get(page_url, **request_kwargs)
+            result.status_code = response.status_code
+            if response.status_code >= 400:
+                result.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            rate_controller.record(host, time.time() - start_time, response.status_code, result.retry_after)
             response.raise_for_status()
+            result.timings['fetch'] = time.time() - start_time
+            result.from_cache = getattr(response, 'from_cache', False)
+            result.final_url = response.url or page_url
 
             # Check if the content is actually HTML (some servers report wrong content-type)
             content_type = response.headers.get('content-type', '').lower()
@@ -169,48 +223,54 @@ def get_page_content(page_url, headers, retries=3, timeout=30, use_selenium=True
                     html_content = content.decode(encoding)
                 except UnicodeDecodeError:
                     html_content = content.decode('utf-8', errors='replace')
+                result.set_content(html_content, 'html')
 
                 # If the page seems to be very small or might be JavaScript-heavy, try with Selenium
                 if len(html_content.strip()) < 5000 and use_selenium:
-                    selenium_content = get_page_with_selenium(page_url)
-                    if selenium_content and len(selenium_content) > len(html_content):
-                        logger.info(f"Using Selenium-rendered content for {page_url} (static: {len(html_content)} bytes, dynamic: {len(selenium_content)} bytes)")
-                        return selenium_content, None, 'html'
+                    render_fetch_result(result)
 
-                return html_content, None, 'html'
+                return result
 
             # Handle different file types
+            # PDF and DOCX files are kept in memory and parsed from their bytes
             elif 'application/pdf' in content_type or page_url.lower().endswith('.pdf'):
-                return handle_binary_file(content, page_url, 'pdf')
+                return set_document_content(result, content, 'pdf')
 
             elif ('application/msword' in content_type or
                   'application/vnd.openxmlformats-officedocument.wordprocessingml.document' in content_type or
                   page_url.lower().endswith(('.doc', '.docx'))):
-                return handle_binary_file(content, page_url, 'docx')
+                return set_document_content(result, content, 'docx')
 
             elif 'text/plain' in content_type or page_url.lower().endswith(('.txt', '.csv')):
                 # For plain text files
-                return content.decode('utf-8', errors='replace'), None, 'text'
+                result.set_content(content.decode('utf-8', errors='replace'), 'text')
+                return result
 
             else:
                 # For unrecognized content types, try with Selenium if it's likely HTML
-                if use_selenium:
-                    selenium_content = get_page_with_selenium(page_url)
-                    if selenium_content:
-                        return selenium_content, None, 'html'
+                if use_selenium and render_fetch_result(result).ok:
+                    return result
 
                 # As a fallback, try to process as HTML anyway
                 try:
                     html_content = content.decode('utf-8', errors='replace')
                     if "<html" in html_content or "<body" in html_content:
-                        return html_content, None, 'html'
+                        result.set_content(html_content, 'html')
                     else:
-                        return None, f"Unsupported content type: {content_type}", None
+                        result.error = f"Unsupported content type: {content_type}"
                 except:
-                    return None, f"Unsupported content type: {content_type}", None
+                    result.error = f"Unsupported content type: {content_type}"
+                return result
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching {page_url} with requests (attempt {attempt+1}/{retries}): {str(e)}")
+            if isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+                result.retryable = True
+                if start_time is not None:
+                    rate_controller.record(host, time.time() - start_time, failed=True)
+            elif result.status_code in RETRYABLE_STATUS:
+                result.retryable = True
+            final_attempt = attempt >= retries - 1 or not result.retryable
 
             # Special handling for common errors
             if isinstance(e, requests.exceptions.SSLError):
@@ -224,31 +284,54 @@ def get_page_content(page_url, headers, retries=3, timeout=30, use_selenium=True
                         allow_redirects=True
                     )
                     response.raise_for_status()
-                    return response.text, None, 'html'
+                    result.set_content(response.text, 'html')
+                    return result
                 except:
                     pass
 
             # If regular request fails and we haven't tried Selenium yet, try with Selenium
-            if use_selenium and attempt == retries - 1:
+            # (not for rate limiting, a browser would be throttled just the same)
+            if (use_selenium and final_attempt and result.status_code not in THROTTLE_STATUS
+                    and not (retry_later and result.retryable)):
                 logger.info(f"Trying {page_url} with Selenium after requests failure")
-                selenium_content = get_page_with_selenium(page_url)
-                if selenium_content:
-                    return selenium_content, None, 'html'
+                if render_fetch_result(result).ok:
+                    return result
 
-            if attempt >= retries - 1:
-                return None, str(e), None
+            if final_attempt:
+                result.error = str(e)
+                return result
 
         except Exception as e:
             logger.error(f"Unknown error fetching {page_url}: {str(e)}")
 
             # Try Selenium as a last resort
             if use_selenium and attempt == retries - 1:
-                selenium_content = get_page_with_selenium(page_url)
-                if selenium_content:
-                    return selenium_content, None, 'html'
+                if render_fetch_result(result).ok:
+                    return result
 
             if attempt >= retries - 1:
-                return None, str(e), None
+                result.error = str(e)
+                return result
+
+    return result
+
+def render_fetch_result(result, wait_time=10):
+    """
+    Render a fetched URL with Selenium unless a render was already attempted.
+
+    The rendered HTML replaces the static HTML when it is larger and the links
+    found in the live DOM are merged into ``result.links``.
+
+    Returns:
+        The same FetchResult
+    """
+    if result.render_attempted:
+        return result
+    result.render_attempted = True
+    rendered = render_with_selenium(result.final_url, wait_time=wait_time)
+    if rendered is not None:
+        result.apply_render(rendered)
+    return result
 
 def get_page_with_selenium(url, wait_time=10):
     """
@@ -261,13 +344,32 @@ def get_page_with_selenium(url, wait_time=10):
     Returns:
         HTML content as string or None if failed
     """
-    try:
-        driver = get_selenium_driver()
-        if not driver:
-            return None
+    rendered = render_with_selenium(url, wait_time=wait_time)
+    return rendered[0] if rendered else None
+
+def render_with_selenium(url, wait_time=10, pool=None):
+    """
+    Render a page with a pooled Selenium browser.
+
+    Args:
+        url: The URL to render
+        wait_time: Time to wait for page to load in seconds
+        pool: BrowserPool to use (defaults to the process-wide pool)
+
+    Returns:
+        Tuple of (page source, links found in the DOM, final URL, seconds spent) or None if failed
+    """
+    pool = pool or get_browser_pool()
+    browser = pool.acquire(timeout=config.BROWSER_POOL_CONFIG["checkout_timeout"])
+    if browser is None:
+        return None
 
+    driver = browser.driver
+    healthy = True
+    start_time = time.time()
+    try:
         # Load the page
-        logger.info(f"Loading {url} with Selenium WebDriver")
+        logger.info(f"Loading {url} with Selenium WebDriver (port {browser.port})")
         driver.get(url)
 
         # Wait for the page to load (body to be present)
@@ -275,41 +377,113 @@ def get_page_with_selenium(url, wait_time=10):
             EC.presence_of_element_located((By.TAG_NAME, "body"))
         )
 
-        # Additional wait for potential AJAX content
-        time.sleep(3)
-
-        # Click on any "Accept Cookies" or similar buttons to get to the content
-        try:
-            cookie_buttons = driver.find_elements(By.XPATH,
-                "//button[contains(text(), 'Accept') or contains(text(), 'accept') or contains(text(), 'Cookie') or contains(text(), 'cookie') or contains(@id, 'cookie') or contains(@class, 'cookie')]"
-            )
-            for button in cookie_buttons:
-                button.click()
-                time.sleep(1)
-        except:
-            pass
+        if pool.smart_render:
+            # Wait for the DOM and network to go quiet instead of sleeping
+            render_config = config.BROWSER_POOL_CONFIG
+            wait_for_page_ready(driver, render_config["ready_quiet_period"], render_config["ready_max_wait"])
+            if dismiss_cookie_banners(driver):
+                wait_for_page_ready(driver, render_config["ready_quiet_period"], render_config["ready_max_wait"])
+        else:
+            # Additional wait for potential AJAX content
+            time.sleep(3)
+
+            # Click on any "Accept Cookies" or similar buttons to get to the content
+            try:
+                cookie_buttons = driver.find_elements(By.XPATH,
+                    "//button[contains(text(), 'Accept') or contains(text(), 'accept') or contains(text(), 'Cookie') or contains(text(), 'cookie') or contains(@id, 'cookie') or contains(@class, 'cookie')]"
+                )
+                for button in cookie_buttons:
+                    button.click()
+                    time.sleep(1)
+            except:
+                pass
 
         # Extract all links while we have the browser open
         links = extract_selenium_links(driver, url)
 
         # Get page source after JavaScript execution
-        page_source = driver.page_source
-
-        return page_source
+        return driver.page_source, links, driver.current_url, time.time() - start_time
 
     except TimeoutException:
         logger.warning(f"Timeout while loading {url} with Selenium")
         # Even if timeout occurs, try to get whatever content was loaded
         try:
-            return driver.page_source
+            return driver.page_source, [], url, time.time() - start_time
         except:
+            healthy = False
             return None
     except WebDriverException as e:
         logger.error(f"Selenium WebDriver error for {url}: {str(e)}")
+        healthy = False
         return None
     except Exception as e:
         logger.error(f"Error with Selenium for {url}: {str(e)}")
         return None
+    finally:
+        pool.release(browser, healthy=healthy)
+
+# Snapshot of the signals used to decide that a rendered page has settled
+PAGE_STATE_SCRIPT = """
+return [
+    document.readyState,
+    document.getElementsByTagName('*').length,
+    document.body ? document.body.innerText.length : 0,
+    performance.getEntriesByType('resource').length,
+    window.__pendingRequests || 0
+];
+"""
+
+# Clicks every cookie consent button in one round trip
+DISMISS_COOKIES_SCRIPT = """
+var clicked = 0;
+var buttons = document.getElementsByTagName('button');
+for (var i = 0; i < buttons.length; i++) {
+    var button = buttons[i];
+    if (/accept|cookie/i.test(button.textContent || '') ||
+        /cookie/.test(button.id || '') ||
+        /cookie/.test(String(button.className || ''))) {
+        try { button.click(); clicked++; } catch (e) {}
+    }
+}
+return clicked;
+"""
+
+def wait_for_page_ready(driver, quiet_period=0.5, max_wait=5.0, poll_interval=0.1):
+    """
+    Wait until a rendered page stops changing.
+
+    The page counts as ready once the document is parsed, no fetch/XHR request
+    is pending and the element count, text length and number of loaded
+    resources have been unchanged for ``quiet_period`` seconds. Never waits
+    longer than ``max_wait`` seconds.
+
+    Returns:
+        True if the page settled, False if the cap was reached
+    """
+    deadline = time.time() + max_wait
+    last_state = None
+    stable_since = time.time()
+    while time.time() < deadline:
+        try:
+            state = driver.execute_script(PAGE_STATE_SCRIPT)
+        except WebDriverException:
+            return False
+        ready_state, pending = state[0], state[4]
+        if state != last_state:
+            last_state = state
+            stable_since = time.time()
+        elif ready_state != 'loading' and not pending and time.time() - stable_since >= quiet_period:
+            return True
+        time.sleep(poll_interval)
+    logger.info(f"Page did not settle within {max_wait}s, using current DOM")
+    return False
+
+def dismiss_cookie_banners(driver):
+    """Click cookie consent buttons without per-click sleeps, returns the number clicked"""
+    try:
+        return driver.execute_script(DISMISS_COOKIES_SCRIPT) or 0
+    except WebDriverException:
+        return 0
 
 def extract_selenium_links(driver, base_url):
     """
@@ -385,24 +559,23 @@ def normalize_url(url):
         normalized += f"?{parsed.query}"
     return normalized
 
-def handle_binary_file(content, url, file_type):
-    """Handle binary file content like PDF or DOCX by saving to temp file."""
-    # Create a temporary file with the right extension
-    fd, tmp_path = tempfile.mkstemp(suffix=f".{file_type}")
-    os.close(fd)
-
-    # Write the content to the temporary file
-    with open(tmp_path, 'wb') as f:
-        f.write(content)
-
-    return tmp_path, None, file_type
+def set_document_content(result, content, file_type):
+    """Keep the bytes of a PDF or DOCX file in the result, unless the file is too large"""
+    max_bytes = config.DOCUMENT_CONFIG["max_size_mb"] * 1024 * 1024
+    if len(content) > max_bytes:
+        result.error = (f"{file_type.upper()} document of {len(content) / (1024 * 1024):.1f}MB is above "
+                        f"the {config.DOCUMENT_CONFIG['max_size_mb']}MB limit")
+        logger.warning(f"Skipping {result.url}: {result.error}")
+        return result
+    result.set_content(content, file_type)
+    return result
 
 def extract_links(html_content, base_url):
     """
     Extract all links from an HTML page.
 
     Args:
-        html_content: HTML content as string
+        html_content: HTML content as string, or an already parsed ParsedPage
         base_url: Base URL for resolving relative links
 
     Returns:
@@ -411,13 +584,23 @@ def extract_links(html_content, base_url):
     if not html_content:
         return []
 
-    soup = BeautifulSoup(html_content, 'html.parser')
-    links = []
+    soup = parse_html(html_content, url=base_url).soup
+    links = set()
     parsed_base = urlparse(base_url)
     base_domain = parsed_base.netloc
     base_url_no_fragment = f"{parsed_base.scheme}://{base_domain}{parsed_base.path}"
 
-    # Look for links in href attributes of a tags
+    def add_same_domain(url):
+        # Only include links from the same domain, without fragments as they point to the same page content
+        parsed_url = urlparse(url)
+        if parsed_url.netloc == base_domain:
+            clean_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
+            if parsed_url.query:
+                clean_url += f"?{parsed_url.query}"
+            links.add(clean_url)
+
+    # Look for links in href attributes of a tags. This also covers the links in
+    # nav menus and dropdowns, which are common in banking sites.
     for a in soup.find_all('a', href=True):
         href = a['href']
 
@@ -428,8 +611,7 @@ def extract_links(html_content, base_url):
         # Skip fragment-only links that point to the same page (e.g., #section1)
         # But keep track of the base URL so we don't miss content
         if href.startswith('#'):
-            if base_url_no_fragment not in links:
-                links.append(base_url_no_fragment)
+            links.add(base_url_no_fragment)
             continue
 
         # Handle relative URLs
@@ -439,44 +621,7 @@ def extract_links(html_content, base_url):
             # Handle URLs without leading slash
             href = urljoin(base_url, href)
 
-        # Only include links from the same domain
-        parsed_href = urlparse(href)
-        if parsed_href.netloc == base_domain:
-            # Remove fragments as they point to the same page content
-            clean_href = f"{parsed_href.scheme}://{parsed_href.netloc}{parsed_href.path}"
-            if parsed_href.query:
-                clean_href += f"?{parsed_href.query}"
-
-            # Don't add duplicate URLs
-            if clean_href not in links:
-                links.append(clean_href)
-
-    # Also extract links from dropdown menus which are common in banking sites
-    # Look for nav, menu, dropdown elements
-    for nav_element in soup.find_all(['nav', 'ul', 'div'], class_=lambda c: c and any(x in str(c).lower() for x in ['menu', 'nav', 'dropdown', 'header-links', 'footer-links'])):
-        for a in nav_element.find_all('a', href=True):
-            href = a['href']
-            if href.startswith('javascript:') or href == "#" or not href:
-                continue
-
-            if href.startswith('#'):
-                if base_url_no_fragment not in links:
-                    links.append(base_url_no_fragment)
-                continue
-
-            if href.startswith('/'):
-                href = f"{parsed_base.scheme}://{base_domain}{href}"
-            elif not href.startswith(('http://', 'https://')):
-                href = urljoin(base_url, href)
-
-            parsed_href = urlparse(href)
-            if parsed_href.netloc == base_domain:
-                clean_href = f"{parsed_href.scheme}://{parsed_href.netloc}{parsed_href.path}"
-                if parsed_href.query:
-                    clean_href += f"?{parsed_href.query}"
-
-                if clean_href not in links:
-                    links.append(clean_href)
+        add_same_domain(href)
 
     # Find links in onclick attributes that might contain URLs
     for element in soup.find_all(attrs={"onclick": True}):
@@ -488,15 +633,7 @@ def extract_links(html_content, base_url):
                 if url and not url.startswith('javascript:'):
                     if not url.startswith(('http://', 'https://')):
                         url = urljoin(base_url, url)
-
-                    parsed_url = urlparse(url)
-                    if parsed_url.netloc == base_domain:
-                        clean_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
-                        if parsed_url.query:
-                            clean_url += f"?{parsed_url.query}"
-
-                        if clean_url not in links:
-                            links.append(clean_url)
+                    add_same_domain(url)
 
     # Look for forms that might lead to important pages
     for form in soup.find_all('form', action=True):
@@ -506,24 +643,16 @@ def extract_links(html_content, base_url):
 
         if not action.startswith(('http://', 'https://')):
             action = urljoin(base_url, action)
+        add_same_domain(action)
 
-        parsed_action = urlparse(action)
-        if parsed_action.netloc == base_domain:
-            clean_action = f"{parsed_action.scheme}://{parsed_action.netloc}{parsed_action.path}"
-            if parsed_action.query:
-                clean_action += f"?{parsed_action.query}"
-
-            if clean_action not in links:
-                links.append(clean_action)
-
-    return list(set(links))
+    return list(links)
 
 def extract_text(html_content):
     """
     Extract clean text from HTML content with improved formatting and encoding handling.
 
     Args:
-        html_content: HTML content as string or bytes
+        html_content: HTML content as string or bytes, or an already parsed ParsedPage
 
     Returns:
         Extracted text as string
@@ -531,55 +660,68 @@ def extract_text(html_content):
     if not html_content:
         return ""
     try:
-        # If html_content is bytes, decode it properly
-        if isinstance(html_content, bytes):
-            try:
-                html_content = html_content.decode('utf-8')
-            except UnicodeDecodeError:
-                try:
-                    html_content = html_content.decode('latin-1')
-                except UnicodeDecodeError:
-                    try:
-                        html_content = html_content.decode('iso-8859-1')
-                    except:
-                        html_content = html_content.decode('utf-8', errors='ignore')
-
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        # Remove unwanted elements that don't contain useful text
-        for element in soup(['script', 'style', 'noscript', 'iframe', 'head', 'meta']):
-            element.decompose()
-
-        # Handle common text containers better
-        for div in soup.find_all(['div', 'section', 'article']):
-            # Add spacing after containers for better text separation
-            if len(div.get_text(strip=True)) > 0:
-                div.append(soup.new_string('\n\n'))
-
-        # Add spacing after headings, paragraphs and list items
-        for elem in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'li']):
-            elem.append(soup.new_string('\n'))
-
-        # Extract text with proper spacing
-        text = soup.get_text(separator=' ', strip=True)
-
-        # Clean up the text: normalize spaces, remove non-printable characters
-        import re
-        # Replace multiple spaces with a single space
-        text = re.sub(r'\s+', ' ', text)
-        # Remove non-printable characters that could cause garbled output
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', '', text)
-        # Replace problematic Unicode characters with their ASCII equivalents
-        text = text.replace('—', '-').replace('–', '-').replace(''', "'").replace(''', "'")
-        text = text.replace('"', '"').replace('"', '"').replace('…', '...').replace('•', '*')
-
-        # Split into lines and remove empty ones
-        lines = []
-        for line in text.splitlines():
-            if line.strip():
-                lines.append(line.strip())
-
-        return '\n'.join(lines)
+        page = parse_html(html_content)
+
+        # Visible strings skip script/style/head-like elements, separated by spaces
+        return clean_text(' '.join(page.visible_strings()))
     except Exception as e:
         logger.error(f"Error extracting text: {str(e)}")
         return ""
+
+def extract_text_blocks(html_content):
+    """
+    Extract the visible text of an HTML page as a list of cleaned text blocks
+    (paragraphs, menu items, table cells, ...). Joining the blocks with spaces
+    gives the same text as extract_text.
+
+    Args:
+        html_content: HTML content as string or bytes, or an already parsed ParsedPage
+
+    Returns:
+        List of non-empty text blocks
+    """
+    if not html_content:
+        return []
+    try:
+        page = parse_html(html_content)
+        blocks = (clean_text(' '.join(block)) for block in page.text_blocks())
+        return [block for block in blocks if block]
+    except Exception as e:
+        logger.error(f"Error extracting text: {str(e)}")
+        return []
+
+def extract_page(html_content, base_url):
+    """
+    Parse an HTML page once and extract everything the crawler needs from it.
+    Takes and returns plain data only, so it can run in a worker process.
+
+    Args:
+        html_content: HTML content as string or bytes, or an already parsed ParsedPage
+        base_url: Base URL for resolving relative links
+
+    Returns:
+        Tuple of (text blocks as returned by extract_text_blocks, links as returned by extract_links)
+    """
+    if not html_content:
+        return [], []
+    page = parse_html(html_content, url=base_url)
+    return extract_text_blocks(page), extract_links(page, base_url)
+
+def clean_text(text):
+    """Normalize whitespace and replace characters that garble extracted text"""
+    # Clean up the text: normalize spaces, remove non-printable characters
+    # Replace multiple spaces with a single space
+    text = re.sub(r'\s+', ' ', text)
+    # Remove non-printable characters that could cause garbled output
+    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]', '', text)
+    # Replace problematic Unicode characters with their ASCII equivalents
+    text = text.replace('—', '-').replace('–', '-').replace(''', "'").replace(''', "'")
+    text = text.replace('"', '"').replace('"', '"').replace('…', '...').replace('•', '*')
+
+    # Split into lines and remove empty ones
+    lines = []
+    for line in text.splitlines():
+        if line.strip():
+            lines.append(line.strip())
+
+    return '\n'.join(lines)
@@ -0,0 +1,199 @@
+"""
+robots.txt and sitemap based URL discovery for the website crawler.
+
+Before following links page by page, the crawler reads a site's ``robots.txt``
+and its XML sitemaps (``Sitemap:`` entries from robots.txt, falling back to
+``/sitemap.xml``). Sitemap indexes are followed and gzipped sitemaps are
+decompressed. The listed URLs seed the crawl frontier, most recently modified
+first, so large sites are covered with plain HTTP fetches instead of browser
+renders done only to discover links. Paths disallowed by robots.txt are never
+queued.
+"""
+
+import logging
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+from xml.etree import ElementTree
+
+import requests
+
+import config
+from app.http_cache import get_http_cache
+
+logger = logging.getLogger(__name__)
+
+# Decompressed sitemaps are limited to 50MB, the maximum the sitemap protocol allows
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+
+class RobotsRules:
+    """Parsed robots.txt of one host; a missing or unreadable file allows everything"""
+
+    def __init__(self, robots_txt=None, user_agent=None):
+        """
+        Args:
+            robots_txt: Content of robots.txt, or None if the site has none
+            user_agent: Product token whose rules apply (defaults to CRAWL_CONFIG["robots_user_agent"])
+        """
+        self.user_agent = user_agent or config.CRAWL_CONFIG["robots_user_agent"]
+        self._parser = None
+        if robots_txt:
+            self._parser = RobotFileParser()
+            self._parser.parse(robots_txt.splitlines())
+
+    def can_fetch(self, url):
+        if self._parser is None:
+            return True
+        return self._parser.can_fetch(self.user_agent, url)
+
+    @property
+    def sitemaps(self):
+        """Sitemap URLs listed in robots.txt"""
+        if self._parser is None:
+            return []
+        return self._parser.site_maps() or []
+
+
+class SiteDiscovery:
+    """Reads robots.txt and the sitemaps of one site"""
+
+    def __init__(self, site_url, headers=None, timeout=15, max_sitemaps=None):
+        """
+        Args:
+            site_url: Any URL of the site, only scheme and host are used
+            headers: HTTP headers for robots.txt and sitemap requests
+            timeout: Request timeout in seconds
+            max_sitemaps: Maximum number of sitemap files to download, including indexes
+        """
+        parsed = urlparse(site_url)
+        self.origin = f"{parsed.scheme}://{parsed.netloc}"
+        self.netloc = parsed.netloc
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.max_sitemaps = max_sitemaps or config.CRAWL_CONFIG["max_sitemaps"]
+        self.robots = RobotsRules()
+
+    def load_robots(self):
+        """Fetch and parse robots.txt, returning the RobotsRules"""
+        content = self._download(urljoin(self.origin, "/robots.txt"))
+        if content is not None:
+            self.robots = RobotsRules(content.decode('utf-8', errors='replace'))
+        return self.robots
+
+    def sitemap_urls(self, limit=None):
+        """
+        Collect page URLs from the site's sitemaps.
+
+        Args:
+            limit: Maximum number of URLs to return
+
+        Returns:
+            Same-host URLs allowed by robots.txt, most recently modified first
+            (URLs without ``lastmod`` keep their sitemap order, after the dated ones)
+        """
+        pending = list(self.robots.sitemaps) or [urljoin(self.origin, "/sitemap.xml")]
+        visited = set()
+        entries = {}  # url -> lastmod, first occurrence wins
+
+        while pending and len(visited) < self.max_sitemaps:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+
+            content = self._download(sitemap_url)
+            if content is None:
+                continue
+            child_sitemaps, pages = parse_sitemap(content)
+            pending.extend(child_sitemaps)
+            for url, lastmod in pages:
+                if urlparse(url).netloc == self.netloc and url not in entries and self.robots.can_fetch(url):
+                    entries[url] = lastmod
+
+        urls = sorted(entries, key=lambda url: _lastmod_sort_key(entries[url]))
+        if entries:
+            logger.info(f"Found {len(entries)} URLs in {len(visited)} sitemap(s) of {self.origin}")
+        return urls[:limit] if limit else urls
+
+    def _download(self, url):
+        """Body of a successful GET (decompressed if gzipped), or None"""
+        request_kwargs = {"headers": self.headers, "timeout": self.timeout}
+        try:
+            cache = get_http_cache()
+            response = cache.get(url, request_kwargs) if cache is not None else requests.get(url, **request_kwargs)
+        except requests.RequestException as e:
+            logger.info(f"Could not fetch {url}: {str(e)}")
+            return None
+        if response.status_code != 200:
+            return None
+        return decompress_if_gzipped(response.content)
+
+
+def decompress_if_gzipped(content, max_bytes=MAX_SITEMAP_BYTES):
+    """Gunzip ``content`` if it starts with the gzip magic number, refusing oversized output"""
+    if not content.startswith(b'\x1f\x8b'):
+        return content
+    try:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        data = decompressor.decompress(content, max_bytes)
+    except zlib.error as e:
+        logger.warning(f"Invalid gzip data in sitemap: {str(e)}")
+        return None
+    if decompressor.unconsumed_tail:
+        logger.warning(f"Skipping sitemap larger than {max_bytes // (1024 * 1024)}MB")
+        return None
+    return data
+
+
+def parse_sitemap(content):
+    """
+    Parse a sitemap or sitemap index.
+
+    Returns:
+        Tuple of (child sitemap URLs, list of (page URL, lastmod string or None))
+    """
+    try:
+        root = ElementTree.fromstring(content)
+    except ElementTree.ParseError as e:
+        logger.info(f"Could not parse sitemap: {str(e)}")
+        return [], []
+
+    child_sitemaps = []
+    pages = []
+    for element in root:
+        tag = _local_name(element.tag)
+        if tag not in ('url', 'sitemap'):
+            continue
+        loc = lastmod = None
+        for child in element:
+            child_tag = _local_name(child.tag)
+            if child_tag == 'loc' and child.text:
+                loc = child.text.strip()
+            elif child_tag == 'lastmod' and child.text:
+                lastmod = child.text.strip()
+        if not loc:
+            continue
+        if tag == 'sitemap':
+            child_sitemaps.append(loc)
+        else:
+            pages.append((loc, lastmod))
+    return child_sitemaps, pages
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _lastmod_sort_key(lastmod):
+    """Newest first, missing or malformed dates last"""
+    if not lastmod:
+        return (1, 0.0)
+    try:
+        parsed = datetime.fromisoformat(lastmod.replace('Z', '+00:00'))
+    except ValueError:
+        return (1, 0.0)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (0, -parsed.timestamp())
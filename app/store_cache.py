@@ -0,0 +1,251 @@
+"""
+Process-wide cache of open vector store handles.
+
+Opening a collection builds a Chroma client, looks up the collection and counts
+its chunks. That used to happen every time a chat session was created or
+switched websites, and on every message of the legacy ``/chat`` path without a
+chat id. Handles are now kept per collection name and reused, the least
+recently used ones are closed when more than ``max_handles`` are open or the
+estimated size of their collections exceeds ``max_memory_mb``.
+
+Accesses are counted in memory and appended to a local access log every
+``access_log_flush_seconds`` and at exit. With ``preload_count`` set, the
+collections opened most often within ``preload_window_days`` are opened in the
+background when the server starts.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import config
+
+logger = logging.getLogger(__name__)
+
+ACCESS_LOG_FILE = os.path.join(os.path.dirname(__file__), "..", "chroma", "collection_access.log")
+# Rough in-memory size of one chunk: a 384-dimensional float32 vector, its HNSW links and the chunk text
+CHUNK_BYTES_ESTIMATE = 4096
+
+
+def estimate_store_bytes(vector_store):
+    """Estimated memory used by a collection once it is queried"""
+    return vector_store._collection.count() * CHUNK_BYTES_ESTIMATE
+
+
+class VectorStoreCache:
+    """LRU cache of open vector store handles keyed by collection name"""
+
+    def __init__(self, loader, max_handles=None, max_memory_mb=None, access_log=None, sizer=None,
+                 flush_seconds=None):
+        """
+        Args:
+            loader: Callable ``loader(collection_name)`` returning a vector store or None
+            max_handles: Maximum number of open handles
+            max_memory_mb: Maximum estimated size of the cached collections in megabytes
+            access_log: Path of the access log, False to not record accesses
+            sizer: Callable ``sizer(vector_store)`` returning the estimated size in bytes
+            flush_seconds: Minimum time between appends of the buffered access counts to the log
+        """
+        cache_config = config.STORE_CACHE_CONFIG
+        self.loader = loader
+        self.max_handles = max_handles or cache_config["max_handles"]
+        self.max_bytes = int((max_memory_mb or cache_config["max_memory_mb"]) * 1024 * 1024)
+        if access_log is None:
+            access_log = cache_config["access_log"] or ACCESS_LOG_FILE
+        self.access_log = access_log
+        self.sizer = sizer or estimate_store_bytes
+        self.flush_seconds = cache_config["access_log_flush_seconds"] if flush_seconds is None else flush_seconds
+
+        self._lock = threading.Lock()
+        self._handles = OrderedDict()  # collection name -> (vector store, estimated bytes), oldest first
+        self._loading = {}  # collection name -> Lock held while the collection is opened
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "preloaded": 0}
+        self._access_lock = threading.Lock()  # guards the access counts and the access log
+        self._access_counts = Counter()  # accesses since the last flush
+        self._flushed_at = time.time()
+
+    def get(self, collection_name):
+        """
+        Get the open handle of a collection, opening it on first use.
+
+        Returns:
+            Vector store or None if the collection does not exist or is empty
+        """
+        self._record_access(collection_name)
+        vector_store = self._cached(collection_name)
+        if vector_store is not None:
+            return vector_store
+
+        with self._lock:
+            load_lock = self._loading.setdefault(collection_name, threading.Lock())
+        # Concurrent requests for the same collection open it once
+        with load_lock:
+            vector_store = self._cached(collection_name)
+            if vector_store is None:
+                with self._lock:
+                    self._stats["misses"] += 1
+                vector_store = self.loader(collection_name)
+                if vector_store is not None:
+                    self.put(collection_name, vector_store)
+        return vector_store
+
+    def put(self, collection_name, vector_store):
+        """Cache a handle, e.g. of a collection that was just (re-)indexed"""
+        try:
+            size = self.sizer(vector_store)
+        except Exception as e:
+            logger.warning(f"Could not estimate the size of collection '{collection_name}': {str(e)}")
+            size = 0
+        with self._lock:
+            self._handles[collection_name] = (vector_store, size)
+            self._handles.move_to_end(collection_name)
+            self._evict()
+
+    def invalidate(self, collection_name):
+        """Drop the handle of a collection that was deleted or rebuilt"""
+        with self._lock:
+            self._handles.pop(collection_name, None)
+
+    def preload(self, count=None, window_days=None):
+        """
+        Open the collections used most within the access log window.
+
+        Returns:
+            Names of the collections that were opened
+        """
+        cache_config = config.STORE_CACHE_CONFIG
+        count = count if count is not None else cache_config["preload_count"]
+        window_days = window_days if window_days is not None else cache_config["preload_window_days"]
+        if not count:
+            return []
+
+        usage = self._recent_accesses(window_days)
+        preloaded = []
+        for collection_name, _ in usage.most_common(min(count, self.max_handles)):
+            if self._cached(collection_name, count=False) is not None:
+                continue
+            try:
+                vector_store = self.loader(collection_name)
+            except Exception as e:
+                logger.warning(f"Preloading collection '{collection_name}' failed: {str(e)}")
+                continue
+            if vector_store is not None:
+                self.put(collection_name, vector_store)
+                preloaded.append(collection_name)
+        with self._lock:
+            self._stats["preloaded"] += len(preloaded)
+        logger.info(f"Preloaded {len(preloaded)} vector store collections")
+        return preloaded
+
+    def get_stats(self):
+        """Hit/miss/eviction counters and the number and estimated size of open handles"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["handles"] = len(self._handles)
+            stats["memory_mb"] = round(sum(size for _, size in self._handles.values()) / (1024 * 1024), 1)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / total, 3) if total else 0.0
+        return stats
+
+    def _cached(self, collection_name, count=True):
+        with self._lock:
+            entry = self._handles.get(collection_name)
+            if entry is None:
+                return None
+            self._handles.move_to_end(collection_name)
+            if count:
+                self._stats["hits"] += 1
+            return entry[0]
+
+    def _evict(self):
+        """Close least recently used handles until the cache is within budget (caller holds the lock)"""
+        total_bytes = sum(size for _, size in self._handles.values())
+        # The most recently used handle is kept even if it alone exceeds the memory budget
+        while len(self._handles) > 1 and (len(self._handles) > self.max_handles or total_bytes > self.max_bytes):
+            collection_name, (_, size) = self._handles.popitem(last=False)
+            total_bytes -= size
+            self._stats["evictions"] += 1
+            logger.info(f"Closed vector store handle of '{collection_name}'")
+
+    def flush_accesses(self):
+        """Append the access counts buffered since the last flush to the access log"""
+        if not self.access_log:
+            return
+        with self._access_lock:
+            self._flush_accesses()
+
+    def _record_access(self, collection_name):
+        if not self.access_log:
+            return
+        with self._access_lock:
+            self._access_counts[collection_name] += 1
+            if time.time() - self._flushed_at >= self.flush_seconds:
+                self._flush_accesses()
+
+    def _flush_accesses(self):
+        """Write one ``timestamp, collection, count`` line per accessed collection (caller holds the access lock)"""
+        self._flushed_at = time.time()
+        if not self._access_counts:
+            return
+        lines = "".join(f"{self._flushed_at:.0f}\t{collection_name}\t{count}\n"
+                        for collection_name, count in self._access_counts.items())
+        self._access_counts.clear()
+        try:
+            with open(self.access_log, "a") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning(f"Could not write collection access log: {str(e)}")
+
+    def _recent_accesses(self, window_days):
+        """Access counts per collection within the window; older entries are dropped from the log"""
+        if not self.access_log or not os.path.exists(self.access_log):
+            return Counter()
+        cutoff = time.time() - window_days * 86400
+        recent = []
+        usage = Counter()
+        with self._access_lock:
+            self._flush_accesses()
+            with open(self.access_log, "r") as f:
+                for line in f:
+                    try:
+                        # Lines without a count are single accesses logged by older versions
+                        timestamp, collection_name, count = (line.rstrip("\n").split("\t") + ["1"])[:3]
+                        if collection_name and float(timestamp) >= cutoff:
+                            usage[collection_name] += int(count)
+                            recent.append(line)
+                    except ValueError:
+                        continue
+            with open(f"{self.access_log}.tmp", "w") as f:
+                f.writelines(recent)
+            os.replace(f"{self.access_log}.tmp", self.access_log)
+        return usage
+
+
+# Global handle cache shared by all chat sessions in this process
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_store_cache():
+    """Get the process-wide vector store handle cache"""
+    global _cache
+
+    if _cache is not None:
+        return _cache
+
+    with _cache_lock:
+        if _cache is None:
+            from app.vector_store import vector_store_manager
+            _cache = VectorStoreCache(vector_store_manager.load_vector_store)
+            atexit.register(_cache.flush_accesses)
+    return _cache
+
+def preload_vector_stores():
+    """Open the most used collections in a background thread, if preloading is enabled"""
+    if not config.STORE_CACHE_CONFIG["enabled"] or not config.STORE_CACHE_CONFIG["preload_count"]:
+        return None
+    thread = threading.Thread(target=get_store_cache().preload, name="vector-store-preload", daemon=True)
+    thread.start()
+    return thread
@@ -1,13 +1,18 @@
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
 import os
 import config
 import logging
 import time
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from langchain.schema import Document
-import torch
-import json
+import uuid
+import hashlib
+from app.embedding_cache import CachedEmbeddings
+from app.embedding_models import BatchedEmbeddings, get_embedding_registry
+from app.store_cache import get_store_cache
+from app.collection_registry import get_collection_registry
+from app.keyword_index import get_keyword_index, reciprocal_rank_fusion
+from app.quantized_index import drop_quantized_index, get_quantized_index, placeholder_embeddings
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -16,37 +21,115 @@ logger = logging.getLogger(__name__)
 # Constants
 VECTOR_STORE_DIR = os.path.join(os.path.dirname(__file__), "..", "vector_store")
 CHROMA_DIR = os.path.join(os.path.dirname(__file__), "..", "chroma")
-MAPPING_FILE = os.path.join(CHROMA_DIR, "vector_store_map.json")
 
 # Ensure directories exist
 os.makedirs(VECTOR_STORE_DIR, exist_ok=True)
 os.makedirs(CHROMA_DIR, exist_ok=True)
 
+def page_hash(text: str) -> str:
+    """Content hash used to detect changed pages between crawls"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def page_source_key(page: Dict[str, Any]) -> str:
+    """
+    Key a crawled page is stored under (``source_url`` of its chunks).
+
+    Every range of pages of a PDF is a page entry of the document's URL, so each
+    range gets its own key and is compared, replaced or removed on its own.
+    """
+    if page.get("pages"):
+        first, last = page["pages"]
+        return f"{page['url']}#pages={first}-{last}"
+    return page["url"]
+
+def chunk_document_id(doc: Document) -> str:
+    """Stable id of a chunk derived from its page URL, page hash and position"""
+    url_hash = hashlib.sha256(doc.metadata["source_url"].encode('utf-8')).hexdigest()[:16]
+    return f"{url_hash}-{doc.metadata['page_hash'][:16]}-{doc.metadata['chunk_index']}"
+
 class VectorStoreManager:
     """Class to manage vector store operations"""
 
     @staticmethod
-    def get_embeddings():
+    def get_embeddings(chunk_count: Optional[int] = None):
         """
-        Get embedding model with GPU acceleration for better performance
+        Get the shared embedding model (loaded once per process, GPU accelerated when available)
+
+        Args:
+            chunk_count: Number of chunks about to be bulk indexed. When given, documents are
+                encoded with the configured batch size, on the multi-process encode pool for
+                collections of at least ``pool_min_chunks`` chunks.
         """
-        try:
-            import torch
-            # Use GPU if available
-            device = 'cuda' if torch.cuda.is_available() else 'cpu'
-            logger.info(f"✅ Using device: {device} for embeddings")
-
-            # Use more advanced sentence transformer model with GPU acceleration
-            return SentenceTransformerEmbeddings(
-                model_name="all-MiniLM-L6-v2",
-                model_kwargs={'device': device}
-            )
-        except Exception as e:
-            logger.error(f"Error loading embeddings model: {str(e)}")
-            # Fallback to a simpler model
-            return SentenceTransformerEmbeddings(model_name="all-mpnet-base-v2")
+        registry = get_embedding_registry()
+        embeddings = registry.get()
+        model_name = getattr(embeddings, "model_name", config.EMBEDDING_MODEL_CONFIG["model_name"])
+        if chunk_count is not None:
+            bulk_config = config.BULK_INDEX_CONFIG
+            pool = registry.encode_pool() if chunk_count >= bulk_config["pool_min_chunks"] else None
+            embeddings = BatchedEmbeddings(embeddings, bulk_config["encode_batch_size"], pool=pool)
+
+        # Reuse vectors of chunk texts that were embedded before
+        if config.EMBEDDING_CACHE_CONFIG["enabled"]:
+            return CachedEmbeddings(embeddings, model_name)
+        return embeddings
+
+    def bulk_index(self, vector_store: Chroma, documents: List[Document], ids: List[str],
+                   progress_callback=None, keyword_index=None, vector_index=None) -> Dict[str, Any]:
+        """
+        Embed and upsert many chunks into a collection, without persisting.
+
+        Chunks are embedded longest first, so every encode batch holds chunks of
+        similar length and little padding is computed, and they are written in
+        batches of ``upsert_batch_size`` instead of one call per document set.
 
-    def create_vector_store(self, documents: List[Document], source_type: str, collection_name: Optional[str] = None) -> Optional[Chroma]:
+        Args:
+            vector_store: Collection to write to, its embedding function computes the vectors
+            documents: Chunks to index
+            ids: Id of every chunk
+            progress_callback: Optional ``callback(chunks_done, chunks_total)`` called after every batch
+            keyword_index: Optional KeywordIndex of the collection, updated with every batch
+            vector_index: Optional QuantizedVectorIndex that stores the vectors instead of Chroma
+
+        Returns:
+            Statistics with the number of chunks and batches, seconds and chunks per second
+        """
+        batch_size = config.BULK_INDEX_CONFIG["upsert_batch_size"]
+        order = sorted(range(len(documents)), key=lambda i: len(documents[i].page_content), reverse=True)
+        embeddings = vector_store.embeddings
+        start_time = time.time()
+        batches = 0
+        for offset in range(0, len(order), batch_size):
+            batch = order[offset:offset + batch_size]
+            batch_ids = [ids[i] for i in batch]
+            texts = [documents[i].page_content for i in batch]
+            vectors = embeddings.embed_documents(texts)
+            if vector_index is not None:
+                vector_index.add(batch_ids, vectors)
+                vectors = placeholder_embeddings(batch_ids)
+            vector_store._collection.upsert(
+                ids=batch_ids,
+                embeddings=vectors,
+                documents=texts,
+                metadatas=[documents[i].metadata for i in batch]
+            )
+            if keyword_index is not None:
+                keyword_index.add(batch_ids, texts)
+            batches += 1
+            if progress_callback:
+                progress_callback(offset + len(batch), len(order))
+
+        seconds = time.time() - start_time
+        stats = {
+            "chunks": len(order),
+            "batches": batches,
+            "seconds": round(seconds, 2),
+            "chunks_per_second": round(len(order) / seconds, 1) if seconds > 0 else None
+        }
+        logger.info(f"Indexed {stats['chunks']} chunks in {stats['seconds']}s ({stats['chunks_per_second']} chunks/s)")
+        return stats
+
+    def create_vector_store(self, documents: List[Document], source_type: str, collection_name: Optional[str] = None,
+                            progress_callback=None) -> Optional[Chroma]:
         """
         Create a new vector store with the provided documents.
 
@@ -54,14 +137,20 @@ class VectorStoreManager:
             documents: List of documents to add to the vector store
             source_type: Type of the source (Website, PDF Document, etc.)
             collection_name: Optional name for the collection
+            progress_callback: Optional ``callback(chunks_done, chunks_total)``
 
         Returns:
             Chroma vector store object or None if creation failed
         """
+        return self._create_vector_store(documents, source_type, collection_name, progress_callback)[0]
+
+    def _create_vector_store(self, documents: List[Document], source_type: str, collection_name: Optional[str] = None,
+                             progress_callback=None) -> Tuple[Optional[Chroma], Optional[Dict[str, Any]]]:
+        """create_vector_store, also returning the bulk indexing statistics"""
         try:
             if not documents:
                 logger.warning("No documents provided to create vector store")
-                return None
+                return None, None
 
             # Generate a collection name if not provided
             if not collection_name:
@@ -71,34 +160,255 @@ class VectorStoreManager:
             logger.info(f"Creating vector store with {len(documents)} documents in collection '{collection_name}'")
 
             # Get embedding function
-            embeddings = self.get_embeddings()
+            embeddings = self.get_embeddings(chunk_count=len(documents))
 
             # Add metadata to documents for better retrieval
             for i, doc in enumerate(documents):
                 if not hasattr(doc, 'metadata') or doc.metadata is None:
                     doc.metadata = {}
                 doc.metadata["source"] = source_type
-                doc.metadata["chunk_id"] = i
+                # Chunks of crawled pages get stable ids so later crawls can update them in place
+                doc.metadata["chunk_id"] = chunk_document_id(doc) if "page_hash" in doc.metadata else i
                 doc.metadata["collection"] = collection_name
 
-            # Create vector store with optimized parameters
-            vector_store = Chroma.from_documents(
-                documents=documents,
-                embedding=embeddings,
+            if all("page_hash" in doc.metadata for doc in documents):
+                ids = [doc.metadata["chunk_id"] for doc in documents]
+            else:
+                ids = [str(uuid.uuid4()) for _ in documents]
+
+            vector_store = Chroma(
                 persist_directory=VECTOR_STORE_DIR,
+                embedding_function=embeddings,
                 collection_name=collection_name,
                 collection_metadata={"source": source_type, "created_at": time.time()}
             )
+            keyword_index = self._load_keyword_index(vector_store)
+            vector_index = self._open_vector_index(vector_store)
+            index_stats = self.bulk_index(vector_store, documents, ids, progress_callback=progress_callback,
+                                          keyword_index=keyword_index, vector_index=vector_index)
 
-            # Persist the vector store
+            # Persist once, after all batches are written
             vector_store.persist()
+            if keyword_index is not None:
+                keyword_index.save()
+            if vector_index is not None:
+                vector_index.save()
             logger.info(f"Vector store created and persisted: {collection_name}")
+            self._cache_handle(collection_name, vector_store)
 
-            return vector_store
+            return vector_store, index_stats
         except Exception as e:
             logger.error(f"Error creating vector store: {str(e)}")
+            return None, None
+
+    def update_vector_store(self, documents: List[Document], source_type: str, collection_name: str,
+                            progress_callback=None) -> Tuple[Optional[Chroma], Dict[str, int]]:
+        """
+        Incrementally sync an existing collection with freshly crawled chunks.
+
+        Every document must carry ``source_url`` and ``page_hash`` metadata. Pages
+        whose hash matches what is stored are left alone, new or changed pages
+        are embedded and upserted, and chunks of pages that disappeared from the
+        crawl are deleted. Collections created before page hashes were stored
+        are rebuilt once.
+
+        Args:
+            documents: Chunked documents of the whole crawl
+            source_type: Type of the source (Website, PDF Document, etc.)
+            collection_name: Name of the collection to update
+            progress_callback: Optional ``callback(chunks_done, chunks_total)`` while chunks are embedded
+
+        Returns:
+            Tuple of (Chroma vector store or None, statistics about the update)
+        """
+        stats = {"pages_unchanged": 0, "pages_changed": 0, "pages_added": 0, "pages_removed": 0,
+                 "chunks_embedded": 0, "chunks_deleted": 0, "full_rebuild": 0, "chunks_per_second": None}
+        try:
+            embeddings = self.get_embeddings(chunk_count=len(documents))
+            vector_store = Chroma(
+                persist_directory=VECTOR_STORE_DIR,
+                embedding_function=embeddings,
+                collection_name=collection_name
+            )
+            stored_pages = self._stored_pages(vector_store)
+
+            if not stored_pages:
+                if stored_pages is None:
+                    logger.info(f"Collection '{collection_name}' has no page hashes, rebuilding it")
+                    vector_store.delete_collection()
+                    get_store_cache().invalidate(collection_name)
+                    self._reset_keyword_index(collection_name)
+                    drop_quantized_index(collection_name)
+                stats["full_rebuild"] = 1
+                stats["pages_added"] = len({doc.metadata["source_url"] for doc in documents})
+                stats["chunks_embedded"] = len(documents)
+                vector_store, index_stats = self._create_vector_store(documents, source_type, collection_name,
+                                                                      progress_callback)
+                if index_stats:
+                    stats["chunks_per_second"] = index_stats["chunks_per_second"]
+                return vector_store, stats
+
+            # What the crawl produced: source URL -> chunks
+            crawled_pages = {}
+            for doc in documents:
+                crawled_pages.setdefault(doc.metadata["source_url"], []).append(doc)
+
+            ids_to_delete = []
+            docs_to_add = []
+            for source_url, page_docs in crawled_pages.items():
+                stored = stored_pages.get(source_url)
+                if stored and all(doc.metadata["page_hash"] == stored["hash"] for doc in page_docs):
+                    stats["pages_unchanged"] += 1
+                    continue
+                if stored:
+                    stats["pages_changed"] += 1
+                    ids_to_delete.extend(stored["ids"])
+                else:
+                    stats["pages_added"] += 1
+                docs_to_add.extend(page_docs)
+
+            for source_url, stored in stored_pages.items():
+                if source_url not in crawled_pages:
+                    stats["pages_removed"] += 1
+                    ids_to_delete.extend(stored["ids"])
+
+            keyword_index = self._load_keyword_index(vector_store)
+            vector_index = self._open_vector_index(vector_store)
+            if ids_to_delete:
+                vector_store.delete(ids=ids_to_delete)
+                if keyword_index is not None:
+                    keyword_index.delete(ids_to_delete)
+                if vector_index is not None:
+                    vector_index.delete(ids_to_delete)
+                stats["chunks_deleted"] = len(ids_to_delete)
+
+            if docs_to_add:
+                for doc in docs_to_add:
+                    doc.metadata["source"] = source_type
+                    doc.metadata["chunk_id"] = chunk_document_id(doc)
+                    doc.metadata["collection"] = collection_name
+                index_stats = self.bulk_index(vector_store, docs_to_add, [doc.metadata["chunk_id"] for doc in docs_to_add],
+                                              progress_callback=progress_callback, keyword_index=keyword_index,
+                                              vector_index=vector_index)
+                stats["chunks_embedded"] = len(docs_to_add)
+                stats["chunks_per_second"] = index_stats["chunks_per_second"]
+
+            vector_store.persist()
+            if keyword_index is not None:
+                keyword_index.save()
+            if vector_index is not None:
+                vector_index.save()
+            logger.info(f"Vector store '{collection_name}' updated incrementally: {stats}")
+            self._cache_handle(collection_name, vector_store)
+            return vector_store, stats
+        except Exception as e:
+            logger.error(f"Error updating vector store: {str(e)}")
+            return None, stats
+
+    def open_page_index(self, collection_name: str, source_type: str, rebuild: bool = False) -> Tuple[Chroma, Dict[str, Dict[str, Any]]]:
+        """
+        Open (or create) a collection that pages are upserted into one at a time.
+
+        Args:
+            collection_name: Name of the collection
+            source_type: Type of the source (Website, PDF Document, etc.)
+            rebuild: Drop whatever the collection holds and start empty
+
+        Returns:
+            Tuple of (Chroma vector store, source URL -> {"hash", "ids", "fingerprint"} of the stored pages).
+            Collections created before page hashes were stored are emptied.
+        """
+        embeddings = self.get_embeddings()
+
+        def open_collection():
+            return Chroma(
+                persist_directory=VECTOR_STORE_DIR,
+                embedding_function=embeddings,
+                collection_name=collection_name,
+                collection_metadata={"source": source_type, "created_at": time.time()}
+            )
+
+        vector_store = open_collection()
+        stored_pages = self._stored_pages(vector_store)
+        if rebuild or stored_pages is None:
+            if stored_pages != {}:
+                logger.info(f"Emptying collection '{collection_name}' before re-indexing it")
+                vector_store.delete_collection()
+                self._reset_keyword_index(collection_name)
+                drop_quantized_index(collection_name)
+                vector_store = open_collection()
+            stored_pages = {}
+        # The ingest pipeline adds to the keyword index, which must hold the stored chunks first
+        self._load_keyword_index(vector_store)
+        self._open_vector_index(vector_store)
+        self._cache_handle(collection_name, vector_store)
+        return vector_store, stored_pages
+
+    @staticmethod
+    def _load_keyword_index(vector_store: Chroma):
+        """
+        Keyword index of a collection, built from the stored chunks if the collection has none yet.
+
+        Returns:
+            KeywordIndex, or None if keyword indexes are disabled
+        """
+        if not config.HYBRID_SEARCH_CONFIG["keyword_index"]:
+            return None
+        keyword_index = get_keyword_index(vector_store._collection.name)
+        if not keyword_index.loaded:
+            stored = vector_store._collection.get(include=["documents"])
+            keyword_index.clear()
+            keyword_index.add(stored.get("ids") or [], stored.get("documents") or [])
+            keyword_index.save()
+            logger.info(f"Built keyword index of '{vector_store._collection.name}' with {len(keyword_index)} chunks")
+        return keyword_index
+
+    @staticmethod
+    def _open_vector_index(vector_store: Chroma):
+        """
+        Quantized vector index of a collection. Empty collections get one when quantization is
+        enabled, collections that already hold float32 vectors in Chroma keep them.
+
+        Returns:
+            QuantizedVectorIndex, or None if Chroma stores the collection's vectors
+        """
+        collection = vector_store._collection
+        return get_quantized_index(collection.name, create=collection.count() == 0)
+
+    @staticmethod
+    def _reset_keyword_index(collection_name: str):
+        """Empty the keyword index of a deleted collection"""
+        if config.HYBRID_SEARCH_CONFIG["keyword_index"]:
+            keyword_index = get_keyword_index(collection_name)
+            keyword_index.clear()
+            keyword_index.save()
+
+    @staticmethod
+    def _cache_handle(collection_name: str, vector_store: Chroma):
+        """Replace the cached handle of a collection that was (re-)indexed"""
+        if config.STORE_CACHE_CONFIG["enabled"]:
+            get_store_cache().put(collection_name, vector_store)
+
+    @staticmethod
+    def _stored_pages(vector_store: Chroma) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Source URL -> {"hash", "ids", "fingerprint"} of what a collection holds, None if it predates page hashes"""
+        existing = vector_store._collection.get(include=["metadatas"])
+        existing_ids = existing.get("ids") or []
+        existing_metadatas = existing.get("metadatas") or []
+        if any(not meta or "page_hash" not in meta for meta in existing_metadatas):
             return None
 
+        stored_pages = {}
+        for chunk_id, meta in zip(existing_ids, existing_metadatas):
+            page = stored_pages.setdefault(meta["source_url"], {"hash": meta["page_hash"], "ids": [],
+                                                                "fingerprint": meta.get("page_fingerprint")})
+            if page["hash"] != meta["page_hash"]:
+                # Several texts stored under one key (PDF ranges indexed before they had their own
+                # keys): never matches a crawled page, so the key is replaced or removed as a whole
+                page["hash"] = None
+            page["ids"].append(chunk_id)
+        return stored_pages
+
     def load_vector_store(self, collection_name: str) -> Optional[Chroma]:
         """
         Load an existing vector store by collection name
@@ -132,7 +442,7 @@ class VectorStoreManager:
 
     def get_vector_store_for_url(self, url: str) -> Optional[Chroma]:
         """
-        Get vector store for a specific URL from the mapping file
+        Get vector store for a specific URL from the collection registry
 
         Args:
             url: URL to get the vector store for
@@ -141,19 +451,12 @@ class VectorStoreManager:
             Chroma vector store object or None if not found
         """
         try:
-            if not os.path.exists(MAPPING_FILE):
-                logger.warning(f"Vector store mapping file not found: {MAPPING_FILE}")
-                return None
-
-            with open(MAPPING_FILE, 'r') as f:
-                mapping = json.load(f)
-
-            if url not in mapping:
-                logger.warning(f"No vector store mapping found for URL: {url}")
+            record = get_collection_registry().get(url)
+            if record is None:
+                logger.warning(f"No vector store registered for URL: {url}")
                 return None
 
-            collection_name = mapping[url]
-            return self.load_vector_store(collection_name)
+            return self.load_vector_store(record["collection_name"])
         except Exception as e:
             logger.error(f"Error getting vector store for URL: {str(e)}")
             return None
@@ -187,7 +490,11 @@ class VectorStoreManager:
 
     def hybrid_search(self, vector_store: Chroma, query: str, k: int = 5) -> List[Document]:
         """
-        Perform hybrid search (combining vector similarity and keyword matching) for better retrieval
+        Retrieve chunks for a query by vector similarity and BM25 keyword matching.
+
+        Both rankings take the best ``fetch_k`` chunks and are fused with
+        reciprocal rank fusion, so a chunk ranked high by either one is returned.
+        Collections with quantized vectors are ranked by their QuantizedVectorIndex.
 
         Args:
             vector_store: Chroma vector store to search in
@@ -195,37 +502,40 @@ class VectorStoreManager:
             k: Number of documents to retrieve
 
         Returns:
-            List of retrieved documents
+            List of retrieved documents, best first
         """
+        search_config = config.HYBRID_SEARCH_CONFIG
+        fetch_k = max(k, search_config["fetch_k"])
         try:
-            # Get documents by vector similarity
-            vector_docs = vector_store.similarity_search(query, k=k)
-
-            # Get document IDs to avoid duplicates
-            doc_ids = set(doc.metadata.get("chunk_id", i) for i, doc in enumerate(vector_docs))
-
-            # Get additional documents by keyword matching if available
-            try:
-                # Use max_marginal_relevance_search with only required parameters
-                # Without fetch_k parameter that's causing the error
-                keyword_docs = vector_store.max_marginal_relevance_search(
-                    query, k=k
+            collection = vector_store._collection
+            query_vector = vector_store.embeddings.embed_query(query)
+            documents = {}
+            vector_index = get_quantized_index(collection.name)
+            if vector_index is not None:
+                vector_ids = [chunk_id for chunk_id, _ in vector_index.search(query_vector, fetch_k)]
+            else:
+                found = collection.query(
+                    query_embeddings=[query_vector],
+                    n_results=fetch_k,
+                    include=["documents", "metadatas"]
                 )
-
-                # Add non-duplicate keyword docs
-                for doc in keyword_docs:
-                    doc_id = doc.metadata.get("chunk_id")
-                    if doc_id not in doc_ids:
-                        vector_docs.append(doc)
-                        doc_ids.add(doc_id)
-                        if len(vector_docs) >= k*2:
-                            break
-            except Exception as mmr_error:
-                # Log the specific error with max_marginal_relevance_search
-                logger.warning(f"MMR search not supported: {str(mmr_error)}. Using vector similarity only.")
-                pass
-
-            return vector_docs
+                vector_ids = found["ids"][0]
+                for chunk_id, text, meta in zip(vector_ids, found["documents"][0], found["metadatas"][0]):
+                    documents[chunk_id] = Document(page_content=text, metadata=meta or {})
+            rankings = [vector_ids]
+
+            keyword_index = self._load_keyword_index(vector_store)
+            if keyword_index is not None:
+                rankings.append([chunk_id for chunk_id, _ in keyword_index.search(query, fetch_k)])
+            ranked_ids = reciprocal_rank_fusion(rankings, k=search_config["rrf_k"])[:k]
+
+            # Chunks only found by keyword (or ranked by the quantized index) are read from the collection
+            missing_ids = [chunk_id for chunk_id in ranked_ids if chunk_id not in documents]
+            if missing_ids:
+                stored = collection.get(ids=missing_ids, include=["documents", "metadatas"])
+                for chunk_id, text, meta in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+                    documents[chunk_id] = Document(page_content=text, metadata=meta or {})
+            return [documents[chunk_id] for chunk_id in ranked_ids if chunk_id in documents]
         except Exception as e:
             logger.error(f"Error in hybrid search: {str(e)}")
             return []
@@ -238,12 +548,26 @@ def get_embeddings():
     """Global function to get embeddings"""
     return vector_store_manager.get_embeddings()
 
-def create_vector_store(documents: List[Document], content_type: str, collection_name: str = None) -> Optional[Chroma]:
+def create_vector_store(documents: List[Document], content_type: str, collection_name: str = None,
+                        progress_callback=None) -> Optional[Chroma]:
     """Global function to create a vector store"""
-    return vector_store_manager.create_vector_store(documents, content_type, collection_name=collection_name)
+    return vector_store_manager.create_vector_store(documents, content_type, collection_name=collection_name,
+                                                    progress_callback=progress_callback)
+
+def update_vector_store(documents: List[Document], content_type: str, collection_name: str,
+                        progress_callback=None) -> Tuple[Optional[Chroma], Dict[str, int]]:
+    """Global function to incrementally update a vector store"""
+    return vector_store_manager.update_vector_store(documents, content_type, collection_name,
+                                                    progress_callback=progress_callback)
+
+def open_page_index(collection_name: str, content_type: str, rebuild: bool = False) -> Tuple[Chroma, Dict[str, Dict[str, Any]]]:
+    """Global function to open a collection for streaming page upserts"""
+    return vector_store_manager.open_page_index(collection_name, content_type, rebuild=rebuild)
 
 def load_vector_store(collection_name: str) -> Optional[Chroma]:
-    """Global function to load a vector store"""
+    """Global function to load a vector store (an already open handle when the handle cache is enabled)"""
+    if config.STORE_CACHE_CONFIG["enabled"]:
+        return get_store_cache().get(collection_name)
     return vector_store_manager.load_vector_store(collection_name)
 
 def get_latest_collection() -> Optional[str]:
@@ -253,17 +577,3 @@ def get_latest_collection() -> Optional[str]:
 def hybrid_search(vector_store: Chroma, query: str, k: int = 5) -> List[Document]:
     """Global function to perform hybrid search"""
     return vector_store_manager.hybrid_search(vector_store, query, k=k)
-
-def save_vector_store_mapping(website_url, collection_name):
-    """Save mapping between website URL and vector store collection name"""
-    # Ensure the directory exists
-    os.makedirs(CHROMA_DIR, exist_ok=True)
-    # Load or create the mapping file
-    if os.path.exists(MAPPING_FILE):
-        with open(MAPPING_FILE, 'r') as f:
-            mapping = json.load(f)
-    else:
-        mapping = {}
-    mapping[website_url] = collection_name
-    with open(MAPPING_FILE, 'w') as f:
-        json.dump(mapping, f)
@@ -1,7 +1,8 @@
 from bs4 import BeautifulSoup
 import requests
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
+from app.html_document import ParsedPage, parse_html
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,19 +33,20 @@ class WebsiteCategorizer:
             'directory': ['directory', 'listing', 'catalog', 'index', 'search']
         }
 
-    def analyze_content(self, html_content: str) -> Dict:
-        """Analyze website content and return categorization results"""
+    def analyze_content(self, html_content: Union[str, ParsedPage]) -> Dict:
+        """Analyze website content (raw HTML or an already parsed page) and return categorization results"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            page = parse_html(html_content)
+            soup = page.soup
             
             # Extract text content
-            text_content = soup.get_text().lower()
+            text_content = page.full_text.lower()
             
             # Extract meta tags
             meta_tags = {
-                'title': soup.title.string.lower() if soup.title else '',
-                'description': soup.find('meta', {'name': 'description'})['content'].lower() if soup.find('meta', {'name': 'description'}) else '',
-                'keywords': soup.find('meta', {'name': 'keywords'})['content'].lower() if soup.find('meta', {'name': 'keywords'}) else ''
+                'title': page.title.lower(),
+                'description': page.meta_content('description').lower(),
+                'keywords': page.meta_content('keywords').lower()
             }
             
             # Analyze industry
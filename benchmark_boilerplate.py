@@ -0,0 +1,117 @@
+"""
+Benchmark script for cross-page boilerplate removal.
+This script generates a site whose pages share a heavy template (mega menu,
+footer, cookie notice) around a short article, extracts their text blocks and
+indexes them with and without BoilerplateFilter. It reports the number of
+chunks and the embedding time. Embedding is simulated with a fixed cost per
+chunk unless --real-embeddings is given.
+
+Usage:
+    python benchmark_boilerplate.py
+    python benchmark_boilerplate.py --pages 300 --embed-ms 20
+    python benchmark_boilerplate.py --real-embeddings
+"""
+
+import time
+import logging
+import argparse
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from app.boilerplate import BoilerplateFilter
+from app.scraper import extract_text_blocks
+from benchmark_ingest import SimulatedEmbeddings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logging.getLogger('app').setLevel(logging.WARNING)
+
+BASE_URL = "https://bank.example.com"
+
+def template_html(menu_items):
+    menu = "".join(
+        f'<li><a href="/products/{i}">Product {i}: savings, loans and cards for every customer segment</a></li>'
+        for i in range(menu_items)
+    )
+    return (
+        f'<header><div class="logo">Example Bank</div><nav><ul>{menu}</ul></nav></header>',
+        '<div class="cookies"><p>We use cookies to improve your experience. By continuing to browse this site you '
+        'agree to our use of cookies as described in our cookie policy.</p><button>Accept</button></div>'
+        '<footer><p>Example Bank Ltd, 1 Main Street, Springfield. Call us on 555-0100, Monday to Friday 9am-5pm.</p>'
+        '<p>Registered in England. Authorised by the Prudential Regulation Authority.</p>'
+        '<ul><li><a href="/privacy">Privacy</a></li><li><a href="/terms">Terms</a></li>'
+        '<li><a href="/accessibility">Accessibility</a></li></ul></footer>'
+    )
+
+def generate_site(pages, menu_items):
+    """Extracted pages ({"url", "content", "blocks"}) of a site with a shared template"""
+    header, footer = template_html(menu_items)
+    site = []
+    for i in range(pages):
+        article = "".join(
+            f"<p>Article {i}, paragraph {j}: how rate {i * 7 + j} affects repayments on plan {i}-{j}.</p>"
+            for j in range(8)
+        )
+        html = f"<html><head><title>Page {i}</title></head><body>{header}<main><h1>Page {i}</h1>{article}</main>{footer}</body></html>"
+        blocks = extract_text_blocks(html)
+        site.append({"url": f"{BASE_URL}/page/{i}", "content": " ".join(blocks), "blocks": blocks})
+    return site
+
+def index_pages(pages, embeddings, batch_size):
+    """Chunk and embed pages the way the vector store builder does"""
+    documents = [Document(page_content=page["content"], metadata={"source_url": page["url"]}) for page in pages]
+    splits = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).split_documents(documents)
+    start_time = time.time()
+    for i in range(0, len(splits), batch_size):
+        embeddings.embed_documents([doc.page_content for doc in splits[i:i + batch_size]])
+    return {
+        'chunks': len(splits),
+        'characters': sum(len(page["content"]) for page in pages),
+        'embed_seconds': time.time() - start_time
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark indexing with and without boilerplate removal')
+    parser.add_argument('--pages', type=int, default=100, help='Number of pages on the generated site')
+    parser.add_argument('--menu-items', type=int, default=40, help='Entries in the shared navigation menu')
+    parser.add_argument('--embed-ms', type=float, default=10.0, help='Simulated embedding cost per chunk in milliseconds')
+    parser.add_argument('--batch-size', type=int, default=32, help='Chunks per embedding batch')
+    parser.add_argument('--real-embeddings', action='store_true', help='Use the sentence-transformers model instead')
+    args = parser.parse_args()
+
+    if args.real_embeddings:
+        from app.vector_store import get_embeddings
+        embeddings = get_embeddings()
+    else:
+        embeddings = SimulatedEmbeddings(args.embed_ms / 1000)
+
+    pages = generate_site(args.pages, args.menu_items)
+    logger.info(f"Generated {len(pages)} pages with a {args.menu_items}-item menu")
+
+    all_results = {'before': index_pages(pages, embeddings, args.batch_size)}
+
+    boilerplate = BoilerplateFilter(BASE_URL)
+    start_time = time.time()
+    stripped = boilerplate.filter_pages(pages)
+    filter_seconds = time.time() - start_time
+    all_results['after'] = index_pages(stripped, embeddings, args.batch_size)
+    all_results['after']['filter_seconds'] = filter_seconds
+    all_results['after']['stats'] = boilerplate.get_stats()
+
+    for name, results in all_results.items():
+        logger.info(f"{name:>6}: {results['chunks']} chunks, {results['characters']} characters, "
+                    f"embedding {results['embed_seconds']:.2f}s")
+    stats = all_results['after']['stats']
+    logger.info(f"Removed {stats['blocks_removed']} of {stats['blocks']} blocks "
+                f"({stats['template_blocks']} distinct template blocks) in {filter_seconds * 1000:.1f}ms")
+    if all_results['after']['chunks']:
+        reduction = all_results['before']['chunks'] / all_results['after']['chunks']
+        logger.info(f"Boilerplate removal indexes {reduction:.2f}x fewer chunks")
+
+    return all_results
+
+if __name__ == "__main__":
+    main()
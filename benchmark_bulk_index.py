@@ -0,0 +1,126 @@
+"""
+Benchmark script for bulk indexing.
+This script chunks a generated site with pages of very different lengths and
+indexes the chunks three ways: the previous approach (all chunks embedded in
+one call with the default batch size of 32), batched upserts in crawl order,
+and VectorStoreManager.bulk_index (length-sorted batches with the configured
+encode batch size). The encoder is simulated like a padded transformer: every
+forward pass costs a fixed overhead plus time per token of the longest text in
+the batch, times the batch size, and like sentence-transformers it sorts the
+texts of one encode call by length. Reports chunks/sec and the share of
+computed tokens that were padding.
+
+Usage:
+    python benchmark_bulk_index.py
+    python benchmark_bulk_index.py --pages 400 --encode-batch-size 128 --upsert-batch-size 512
+"""
+
+import time
+import random
+import logging
+import argparse
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+import config
+from app.embedding_models import BatchedEmbeddings
+from app.vector_store import VectorStoreManager
+from benchmark_ingest import InMemoryVectorStore
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logging.getLogger('app').setLevel(logging.WARNING)
+
+class SimulatedEncoder:
+    """Stands in for a SentenceTransformer, counting real and padded tokens"""
+
+    def __init__(self, seconds_per_token, seconds_per_call):
+        self.seconds_per_token = seconds_per_token
+        self.seconds_per_call = seconds_per_call
+        self.tokens = 0
+        self.padded_tokens = 0
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        lengths = sorted((len(text) // 4 + 1 for text in texts), reverse=True)
+        for start in range(0, len(lengths), batch_size):
+            batch = lengths[start:start + batch_size]
+            self.tokens += sum(batch)
+            self.padded_tokens += batch[0] * len(batch)
+            time.sleep(self.seconds_per_call + self.seconds_per_token * batch[0] * len(batch))
+        return _Vectors([0.0] * 8 for _ in texts)
+
+class _Vectors(list):
+    def tolist(self):
+        return list(self)
+
+class SimulatedModel:
+    def __init__(self, encoder):
+        self.client = encoder
+        self.model_name = "simulated"
+
+    def embed_documents(self, texts):
+        return self.client.encode(texts).tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+def build_chunks(pages, seed=7):
+    """Chunks of pages between a short paragraph and a long article"""
+    rng = random.Random(seed)
+    words = "service pricing support product customer account order team report delivery".split()
+    documents = []
+    for page in range(pages):
+        length = rng.choice([40, 120, 400, 1500])
+        text = " ".join(rng.choice(words) for _ in range(length))
+        documents.append(Document(page_content=text, metadata={"source_url": f"https://example.com/{page}"}))
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    return splitter.split_documents(documents)
+
+def run(args, name, chunks, index):
+    encoder = SimulatedEncoder(args.token_us / 1e6, args.call_ms / 1000)
+    start_time = time.time()
+    index(SimulatedModel(encoder))
+    seconds = time.time() - start_time
+    waste = 1 - encoder.tokens / encoder.padded_tokens
+    logger.info(f"{name}: {len(chunks) / seconds:.0f} chunks/s ({seconds:.2f}s), {waste:.0%} padding")
+    return seconds
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk indexing')
+    parser.add_argument('--pages', type=int, default=1500, help='Pages of the generated site')
+    parser.add_argument('--encode-batch-size', type=int, default=config.BULK_INDEX_CONFIG["encode_batch_size"])
+    parser.add_argument('--upsert-batch-size', type=int, default=256, help='Chunks per upsert batch')
+    parser.add_argument('--token-us', type=float, default=1.0, help='Simulated microseconds per token')
+    parser.add_argument('--call-ms', type=float, default=4.0, help='Simulated overhead per forward pass')
+    args = parser.parse_args()
+
+    chunks = build_chunks(args.pages)
+    ids = [str(i) for i in range(len(chunks))]
+    texts = [chunk.page_content for chunk in chunks]
+    logger.info(f"{len(chunks)} chunks from {args.pages} pages")
+
+    def one_call(model):
+        InMemoryVectorStore(model)._collection.upsert(ids, model.embed_documents(texts), texts, None)
+
+    def crawl_order_batches(model):
+        store = InMemoryVectorStore(BatchedEmbeddings(model, args.encode_batch_size))
+        for start in range(0, len(texts), args.upsert_batch_size):
+            batch = texts[start:start + args.upsert_batch_size]
+            store._collection.upsert(ids[start:start + len(batch)], store.embeddings.embed_documents(batch), batch, None)
+
+    def bulk_index(model):
+        store = InMemoryVectorStore(BatchedEmbeddings(model, args.encode_batch_size))
+        VectorStoreManager().bulk_index(store, chunks, ids)
+
+    config.BULK_INDEX_CONFIG["upsert_batch_size"] = args.upsert_batch_size
+    baseline = run(args, "One call, batch size 32", chunks, one_call)
+    run(args, f"Upsert batches in crawl order, batch size {args.encode_batch_size}", chunks, crawl_order_batches)
+    seconds = run(args, f"bulk_index, batch size {args.encode_batch_size}", chunks, bulk_index)
+    logger.info(f"Speedup over one call: {baseline / seconds:.2f}x")
+    return {'baseline_seconds': baseline, 'seconds': seconds}
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark script for the website crawl engine.
+This script serves a local fixture website with simulated network latency and
+measures how crawl throughput (pages per second) scales with concurrency.
+
+Usage:
+    python benchmark_crawler.py
+    python benchmark_crawler.py --pages 200 --latency 0.1 --concurrency 1 4 8 16
+"""
+
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import config
+from app.crawler import CrawlEngine
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logger.setLevel(logging.INFO)
+logging.getLogger('app').setLevel(logging.WARNING)
+
+def render_fixture_page(page_id, total_pages, links_per_page=5):
+    """Render one page of the fixture site with a shared header, nav and footer"""
+    links = "".join(
+        f'<li><a href="/page/{(page_id * links_per_page + i) % total_pages}">Page {(page_id * links_per_page + i) % total_pages}</a></li>'
+        for i in range(1, links_per_page + 1)
+    )
+    paragraphs = "".join(
+        f"<p>Page {page_id} paragraph {i}: our savings accounts, loans and cards help customers "
+        f"plan their finances with clear fees and dedicated support for product {page_id * 7 + i}.</p>"
+        for i in range(30)
+    )
+    return f"""<!DOCTYPE html>
+<html><head><title>Fixture page {page_id}</title></head>
+<body>
+<header><nav class="menu"><ul><li><a href="/">Home</a></li><li><a href="/page/1">About</a></li><li><a href="/page/2">Contact</a></li></ul></nav></header>
+<main><h1>Fixture page {page_id}</h1>{paragraphs}<ul>{links}</ul></main>
+<footer><p>Copyright Fixture Bank. All rights reserved. Privacy policy. Terms of use.</p></footer>
+</body></html>""".encode('utf-8')
+
+def start_fixture_site(total_pages=100, latency=0.05, port=0, transfer_kbps=None):
+    """
+    Start a local fixture website in a background thread.
+
+    Pages carry an ETag and answer ``If-None-Match`` with 304 Not Modified.
+
+    Args:
+        total_pages: Number of distinct pages the site serves
+        latency: Simulated server latency per request in seconds
+        port: Port to listen on (0 picks a free port)
+        transfer_kbps: Simulated bandwidth for response bodies (None for unlimited)
+
+    Returns:
+        Tuple of (server, base URL)
+    """
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path == '/':
+                page_id = 0
+            elif self.path.startswith('/page/'):
+                try:
+                    page_id = int(self.path.split('/')[2]) % total_pages
+                except ValueError:
+                    self.send_error(404)
+                    return
+            else:
+                self.send_error(404)
+                return
+
+            body = render_fixture_page(page_id, total_pages)
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            if transfer_kbps:
+                time.sleep(len(body) / 1024 / transfer_kbps)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def benchmark_concurrency(base_url, max_pages, concurrency):
+    """Crawl the fixture site once and return pages per second"""
+    engine = CrawlEngine(
+        headers={},
+        max_pages=max_pages,
+        max_depth=max_pages,
+        concurrency=concurrency,
+        per_host_limit=concurrency,
+        allow_selenium=False
+    )
+    start_time = time.time()
+    result = engine.crawl([f"{base_url}/"])
+    duration = time.time() - start_time
+    return {
+        'pages': len(result.pages),
+        'duration': duration,
+        'pages_per_second': len(result.pages) / duration if duration > 0 else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the concurrent crawl engine')
+    parser.add_argument('--pages', type=int, default=100, help='Number of pages to crawl')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated latency per request in seconds')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Concurrency settings to compare')
+    args = parser.parse_args()
+
+    # Measure network concurrency only, not HTTP cache revalidation
+    config.HTTP_CACHE_CONFIG["enabled"] = False
+
+    server, base_url = start_fixture_site(total_pages=args.pages, latency=args.latency)
+    logger.info(f"Fixture site running at {base_url} ({args.pages} pages, {args.latency * 1000:.0f}ms latency)")
+
+    all_results = {}
+    try:
+        for concurrency in args.concurrency:
+            results = benchmark_concurrency(base_url, args.pages, concurrency)
+            all_results[concurrency] = results
+            logger.info(f"concurrency={concurrency:>3}: {results['pages']} pages in "
+                        f"{results['duration']:.2f}s ({results['pages_per_second']:.1f} pages/s)")
+    finally:
+        server.shutdown()
+
+    baseline = all_results.get(min(all_results)) if all_results else None
+    if baseline and baseline['pages_per_second'] > 0:
+        logger.info("======= Speedup vs lowest concurrency =======")
+        for concurrency, results in all_results.items():
+            logger.info(f"concurrency={concurrency:>3}: {results['pages_per_second'] / baseline['pages_per_second']:.2f}x")
+
+    return all_results
+
+if __name__ == "__main__":
+    main()
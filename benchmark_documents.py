@@ -0,0 +1,131 @@
+"""
+Benchmark script for crawled PDF processing.
+This script builds a long text PDF and measures how long it takes until its
+text is extracted, comparing the previous approach (write the download to a
+temp file, then read every page on one thread) with in-memory extraction on
+the parsing process pool. It also reports how soon the first page range is
+available for chunking.
+
+Usage:
+    python benchmark_documents.py
+    python benchmark_documents.py --pages 400 --workers 4
+    python benchmark_documents.py --pdf annual_report.pdf
+"""
+
+import os
+import time
+import logging
+import argparse
+import tempfile
+import config
+from app.documents import iter_document_pages
+from app.process_pool import shutdown_process_pool
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logging.getLogger('app').setLevel(logging.WARNING)
+
+def build_fixture_pdf(pages, lines_per_page=45):
+    """
+    Build a PDF whose pages are filled with lines of text.
+
+    Args:
+        pages: Number of pages
+        lines_per_page: Lines of text per page
+
+    Returns:
+        Bytes of the PDF
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = [f"({page + 1}.{line + 1} Our annual report explains revenue, services and results "
+                 f"of the year in section {line % 7}.) Tj T*" for line in range(lines_per_page)]
+        stream = ("BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(lines) + " ET").encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return data
+
+def extract_from_temp_file(data):
+    """The previous approach: save to a temp file, then read every page sequentially"""
+    from PyPDF2 import PdfReader
+    fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    try:
+        return [page.extract_text() or "" for page in PdfReader(tmp_path).pages]
+    finally:
+        os.remove(tmp_path)
+
+def extract_in_memory(data):
+    """Returns (page texts, seconds until the first range was ready)"""
+    start_time = time.time()
+    first_range = None
+    texts = []
+    for page_texts in iter_document_pages(data, 'pdf'):
+        if first_range is None:
+            first_range = time.time() - start_time
+        texts.extend(page_texts)
+    return texts, first_range
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PDF text extraction')
+    parser.add_argument('--pages', type=int, default=200, help='Pages of the generated PDF')
+    parser.add_argument('--pdf', type=str, help='Use this PDF file instead of a generated one')
+    parser.add_argument('--workers', type=int, default=0, help='Parsing worker processes (0 = CPU count - 1, -1 = none)')
+    args = parser.parse_args()
+
+    if args.pdf:
+        with open(args.pdf, 'rb') as f:
+            data = f.read()
+    else:
+        data = build_fixture_pdf(args.pages)
+    config.PROCESS_POOL_CONFIG["workers"] = args.workers
+    config.DOCUMENT_CONFIG["max_pages"] = max(config.DOCUMENT_CONFIG["max_pages"], args.pages)
+    logger.info(f"PDF of {len(data) // 1024}KB")
+
+    start_time = time.time()
+    baseline = extract_from_temp_file(data)
+    baseline_seconds = time.time() - start_time
+    logger.info(f"Temp file, sequential: {len(baseline)} pages in {baseline_seconds:.2f}s")
+
+    # The first run pays for starting the worker processes, crawls reuse them
+    extract_in_memory(data)
+    start_time = time.time()
+    texts, first_range = extract_in_memory(data)
+    seconds = time.time() - start_time
+    logger.info(f"In memory, process pool: {len(texts)} pages in {seconds:.2f}s, "
+                f"first pages ready after {first_range:.2f}s")
+    shutdown_process_pool()
+
+    if texts != baseline:
+        logger.warning("Extracted texts differ between the two approaches")
+    if seconds > 0:
+        logger.info(f"Speedup: {baseline_seconds / seconds:.2f}x")
+    return {'baseline_seconds': baseline_seconds, 'seconds': seconds, 'first_range_seconds': first_range}
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark script for the persistent embedding cache.
+This script indexes the fixture site through the ingest pipeline three times:
+with a cold cache, again after a restart (re-processing the same site), and a
+second site that repeats half of the first site's content. Embedding is simulated with a
+fixed cost per chunk unless --real-embeddings is given.
+
+Usage:
+    python benchmark_embedding_cache.py
+    python benchmark_embedding_cache.py --pages 200 --embed-ms 20
+    python benchmark_embedding_cache.py --real-embeddings
+"""
+
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from app.embedding_cache import CachedEmbeddings, EmbeddingCache
+from app.ingest_pipeline import IngestPipeline
+from app.scraper import extract_text
+from benchmark_crawler import render_fixture_page
+from benchmark_ingest import SimulatedEmbeddings, InMemoryVectorStore
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logging.getLogger('app').setLevel(logging.WARNING)
+
+def fixture_pages(total_pages, site="https://bank.example.com", offset=0):
+    """Extracted pages of the fixture site, starting at page ``offset``"""
+    return [{"url": f"{site}/page/{n}", "content": extract_text(render_fixture_page(n + offset, total_pages + offset))}
+            for n in range(total_pages)]
+
+def index_pages(pages, embeddings, model_name, cache_dir):
+    """Index pages into an empty collection, returns seconds and cache statistics"""
+    cached = CachedEmbeddings(embeddings, model_name, cache=EmbeddingCache(cache_dir))
+    pipeline = IngestPipeline(InMemoryVectorStore(cached), {}, "Website", "benchmark").start()
+    start_time = time.time()
+    for page in pages:
+        pipeline.submit(page)
+    stats = pipeline.finish()
+    return {'seconds': time.time() - start_time, 'chunks': stats['chunks_embedded'], 'cache': stats['embedding_cache']}
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark re-indexing with the embedding cache')
+    parser.add_argument('--pages', type=int, default=100, help='Pages per site')
+    parser.add_argument('--embed-ms', type=float, default=10.0, help='Simulated embedding cost per chunk in milliseconds')
+    parser.add_argument('--real-embeddings', action='store_true', help='Use the sentence-transformers model instead')
+    args = parser.parse_args()
+
+    if args.real_embeddings:
+        from app.vector_store import get_embeddings
+        embeddings = get_embeddings()
+        embeddings, model_name = getattr(embeddings, "embeddings", embeddings), embeddings.model_name
+    else:
+        embeddings, model_name = SimulatedEmbeddings(args.embed_ms / 1000), "simulated"
+
+    cache_dir = tempfile.mkdtemp(prefix='zentra_embedding_cache_')
+    runs = [
+        ('cold', fixture_pages(args.pages)),
+        ('re-index', fixture_pages(args.pages)),
+        ('new site', fixture_pages(args.pages, site="https://other.example.com", offset=args.pages // 2))
+    ]
+    results = {}
+    try:
+        for name, pages in runs:
+            results[name] = index_pages(pages, embeddings, model_name, cache_dir)
+            cache = results[name]['cache']
+            logger.info(f"{name:>8}: {results[name]['chunks']} chunks in {results[name]['seconds']:.2f}s, "
+                        f"hit rate {cache['hit_rate']:.0%}, ~{cache['seconds_saved']}s saved")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if results['re-index']['seconds'] > 0:
+        logger.info(f"Re-indexing is {results['cold']['seconds'] / results['re-index']['seconds']:.1f}x faster")
+    return results
+
+if __name__ == "__main__":
+    main()
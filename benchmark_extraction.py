@@ -0,0 +1,81 @@
+"""
+Benchmark script for HTML extraction on the parsing process pool.
+This script serves the local fixture website with little latency, so crawling
+is bound by parsing, and measures crawl throughput (pages per second) with
+extraction in the crawler's threads and with 1, 2, 4, ... worker processes.
+Throughput scales with the worker count up to the number of free cores.
+
+Usage:
+    python benchmark_extraction.py
+    python benchmark_extraction.py --pages 500 --workers -1 1 2 4 8 15
+"""
+
+import os
+import time
+import logging
+import argparse
+import config
+from app.crawler import CrawlEngine
+from app.process_pool import get_process_pool, shutdown_process_pool
+from benchmark_crawler import start_fixture_site
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logger.setLevel(logging.INFO)
+
+def benchmark_workers(base_url, max_pages, concurrency, workers):
+    """Crawl the fixture site with the given number of parsing workers, returns pages per second"""
+    config.PROCESS_POOL_CONFIG["workers"] = workers
+    # Start the worker processes before timing, crawls of a running server reuse them
+    get_process_pool()
+    engine = CrawlEngine(
+        headers={},
+        max_pages=max_pages,
+        max_depth=max_pages,
+        concurrency=concurrency,
+        per_host_limit=concurrency,
+        allow_selenium=False,
+        use_sitemaps=False,
+        respect_robots=False
+    )
+    try:
+        start_time = time.time()
+        result = engine.crawl([f"{base_url}/"])
+        duration = time.time() - start_time
+    finally:
+        shutdown_process_pool()
+    return {
+        'pages': len(result.pages),
+        'duration': duration,
+        'pages_per_second': len(result.pages) / duration if duration > 0 else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML extraction with parsing worker processes')
+    parser.add_argument('--pages', type=int, default=300, help='Number of pages to crawl')
+    parser.add_argument('--latency', type=float, default=0.005, help='Simulated latency per request in seconds')
+    parser.add_argument('--concurrency', type=int, default=16, help='Crawl concurrency')
+    parser.add_argument('--workers', type=int, nargs='+', default=[-1, 1, 2, 4],
+                        help='Worker counts to compare (-1 = extract in the crawler threads)')
+    args = parser.parse_args()
+
+    config.HTTP_CACHE_CONFIG["enabled"] = False
+    server, base_url = start_fixture_site(total_pages=args.pages, latency=args.latency)
+    logger.info(f"{os.cpu_count()} CPUs")
+    results = {}
+    try:
+        for workers in args.workers:
+            results[workers] = benchmark_workers(base_url, args.pages, args.concurrency, workers)
+            label = "in threads" if workers < 0 else f"{workers} workers"
+            logger.info(f"{label:>11}: {results[workers]['pages']} pages in {results[workers]['duration']:.2f}s "
+                        f"({results[workers]['pages_per_second']:.1f} pages/s)")
+    finally:
+        server.shutdown()
+    return results
+
+if __name__ == "__main__":
+    main()
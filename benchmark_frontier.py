@@ -0,0 +1,111 @@
+"""
+Micro-benchmark for the crawl frontier.
+This script measures the cost per discovered link as the crawl grows, comparing
+the hash-indexed CrawlFrontier with the list scans the crawler used before.
+
+Usage:
+    python benchmark_frontier.py
+    python benchmark_frontier.py --sizes 100 1000 10000 --links-per-page 100
+"""
+
+import time
+import logging
+import argparse
+from urllib.parse import urlparse
+from app.frontier import CrawlFrontier
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+
+def discovered_links(page_id, links_per_page, total_pages):
+    """Links found on one synthetic page, most of them already known"""
+    return [
+        f"https://bank.example.com/section/{(page_id * 7 + i) % total_pages}/"
+        for i in range(links_per_page)
+    ]
+
+def benchmark_frontier(pages, links_per_page):
+    """Crawl ``pages`` synthetic pages through a CrawlFrontier"""
+    frontier = CrawlFrontier(priority_terms=['account', 'loan'])
+    frontier.add("https://bank.example.com/", 0)
+
+    processed = 0
+    links_seen = 0
+    start_time = time.perf_counter()
+    while processed < pages:
+        item = frontier.pop()
+        if item is None:
+            break
+        url, depth = item
+        processed += 1
+        links = discovered_links(processed, links_per_page, pages * 4)
+        links_seen += len(links)
+        frontier.add_many(links, depth + 1)
+    duration = time.perf_counter() - start_time
+    return duration, links_seen
+
+def benchmark_legacy(pages, links_per_page):
+    """Crawl ``pages`` synthetic pages with the previous list based dedup checks"""
+    processed_urls = set()
+    to_process = ["https://bank.example.com/"]
+    next_level = []
+    all_links = set()
+
+    links_seen = 0
+    start_time = time.perf_counter()
+    while len(processed_urls) < pages:
+        if not to_process:
+            if not next_level:
+                break
+            to_process, next_level = next_level, []
+        current_url = to_process.pop(0)
+        parsed_url = urlparse(current_url)
+        if any(urlparse(p).netloc == parsed_url.netloc and urlparse(p).path == parsed_url.path for p in processed_urls):
+            continue
+        processed_urls.add(current_url)
+
+        links = discovered_links(len(processed_urls), links_per_page, pages * 4)
+        links_seen += len(links)
+        for new_link in links:
+            parsed_new = urlparse(new_link)
+            if (new_link not in processed_urls and
+                new_link not in to_process and
+                new_link not in next_level and
+                new_link not in all_links and
+                not any(urlparse(p).netloc == parsed_new.netloc and
+                        urlparse(p).path == parsed_new.path for p in processed_urls)):
+                next_level.append(new_link)
+                all_links.add(new_link)
+    duration = time.perf_counter() - start_time
+    return duration, links_seen
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark crawl frontier dedup cost')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 100, 300, 1000, 10000],
+                        help='Number of pages to crawl')
+    parser.add_argument('--links-per-page', type=int, default=100, help='Links discovered on each page')
+    parser.add_argument('--legacy-limit', type=int, default=300,
+                        help='Largest crawl size to run the legacy implementation for')
+    args = parser.parse_args()
+
+    logger.info("pages | frontier us/link | legacy us/link")
+    all_results = {}
+    for pages in args.sizes:
+        duration, links = benchmark_frontier(pages, args.links_per_page)
+        frontier_cost = duration / links * 1e6
+        legacy_cost = None
+        if pages <= args.legacy_limit:
+            legacy_duration, legacy_links = benchmark_legacy(pages, args.links_per_page)
+            legacy_cost = legacy_duration / legacy_links * 1e6
+        all_results[pages] = {'frontier_us_per_link': frontier_cost, 'legacy_us_per_link': legacy_cost}
+        legacy_text = f"{legacy_cost:14.2f}" if legacy_cost is not None else f"{'skipped':>14}"
+        logger.info(f"{pages:5d} | {frontier_cost:16.2f} | {legacy_text}")
+
+    return all_results
+
+if __name__ == "__main__":
+    main()
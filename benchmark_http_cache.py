@@ -0,0 +1,89 @@
+"""
+Benchmark script for the scraper HTTP cache.
+This script crawls the local fixture website twice, first with an empty cache
+and then again as a nightly refresh would, and compares bytes transferred and
+crawl wall time.
+
+Usage:
+    python benchmark_http_cache.py
+    python benchmark_http_cache.py --pages 200 --latency 0.02 --transfer-kbps 256
+"""
+
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import config
+from app.crawler import CrawlEngine
+from app.http_cache import get_http_cache
+from benchmark_crawler import start_fixture_site
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logger.setLevel(logging.INFO)
+logging.getLogger('app').setLevel(logging.WARNING)
+
+def crawl_once(base_url, max_pages, concurrency):
+    """Crawl the fixture site and return wall time and HTTP cache counters"""
+    cache = get_http_cache()
+    before = cache.get_stats()
+    engine = CrawlEngine(
+        headers={},
+        max_pages=max_pages,
+        max_depth=max_pages,
+        concurrency=concurrency,
+        allow_selenium=False
+    )
+    start_time = time.time()
+    result = engine.crawl([f"{base_url}/"])
+    duration = time.time() - start_time
+    after = cache.get_stats()
+    return {
+        'pages': len(result.pages),
+        'duration': duration,
+        'bytes_downloaded': after['bytes_downloaded'] - before['bytes_downloaded'],
+        'bytes_saved': after['bytes_saved'] - before['bytes_saved'],
+        'hits': after['hits'] - before['hits'],
+        'misses': after['misses'] - before['misses']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTTP cache revalidation on re-crawl')
+    parser.add_argument('--pages', type=int, default=100, help='Number of pages to crawl')
+    parser.add_argument('--latency', type=float, default=0.02, help='Simulated latency per request in seconds')
+    parser.add_argument('--transfer-kbps', type=float, default=256, help='Simulated bandwidth in KB/s')
+    parser.add_argument('--concurrency', type=int, default=4, help='Crawl concurrency')
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix='zentra_http_cache_')
+    config.HTTP_CACHE_CONFIG["enabled"] = True
+    config.HTTP_CACHE_CONFIG["path"] = cache_dir
+    server, base_url = start_fixture_site(total_pages=args.pages, latency=args.latency,
+                                          transfer_kbps=args.transfer_kbps)
+
+    all_results = {}
+    try:
+        for run in ['cold', 'refresh']:
+            results = crawl_once(base_url, args.pages, args.concurrency)
+            all_results[run] = results
+            logger.info(f"{run:>7}: {results['pages']} pages in {results['duration']:.2f}s, "
+                        f"{results['bytes_downloaded'] / 1024:.0f}KB downloaded, "
+                        f"{results['hits']} cache hits / {results['misses']} misses")
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    cold, refresh = all_results['cold'], all_results['refresh']
+    if cold['bytes_downloaded'] and cold['duration']:
+        logger.info(f"Refresh transferred {100 * (1 - refresh['bytes_downloaded'] / cold['bytes_downloaded']):.0f}% fewer bytes "
+                    f"and took {100 * (1 - refresh['duration'] / cold['duration']):.0f}% less wall time")
+
+    return all_results
+
+if __name__ == "__main__":
+    main()
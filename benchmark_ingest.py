@@ -0,0 +1,160 @@
+"""
+Benchmark script for website ingestion.
+This script crawls the local fixture site and indexes it twice: first the old
+way (crawl everything, then chunk and embed all pages at the end), then through
+the streaming IngestPipeline where embedding overlaps the crawl. Embedding is
+simulated with a fixed cost per chunk unless --real-embeddings is given.
+
+Usage:
+    python benchmark_ingest.py
+    python benchmark_ingest.py --pages 200 --latency 0.1 --embed-ms 20
+    python benchmark_ingest.py --real-embeddings
+"""
+
+import time
+import logging
+import argparse
+import tracemalloc
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+import config
+from app.crawler import CrawlEngine
+from app.ingest_pipeline import IngestPipeline
+from benchmark_crawler import start_fixture_site
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logging.getLogger('app').setLevel(logging.WARNING)
+
+class SimulatedEmbeddings:
+    """Embedding function with a fixed cost per text (sleeps, like a GPU call releasing the GIL)"""
+
+    def __init__(self, seconds_per_text):
+        self.seconds_per_text = seconds_per_text
+
+    def embed_documents(self, texts):
+        time.sleep(self.seconds_per_text * len(texts))
+        return [[0.0] * 8 for _ in texts]
+
+class InMemoryCollection:
+    def __init__(self):
+        self.count = 0
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.count += len(ids)
+
+class InMemoryVectorStore:
+    """Minimal vector store with the interface IngestPipeline writes to"""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self._collection = InMemoryCollection()
+
+    def delete(self, ids):
+        pass
+
+    def persist(self):
+        pass
+
+def crawl_engine(base_url, pages, concurrency, page_sink=None):
+    return CrawlEngine(
+        headers={},
+        max_pages=pages,
+        max_depth=pages,
+        concurrency=concurrency,
+        per_host_limit=concurrency,
+        allow_selenium=False,
+        page_sink=page_sink
+    ), [f"{base_url}/"]
+
+def benchmark_batch(base_url, pages, concurrency, embeddings, batch_size):
+    """Crawl the whole site, then chunk and embed every page"""
+    engine, seeds = crawl_engine(base_url, pages, concurrency)
+    start_time = time.time()
+    result = engine.crawl(seeds)
+    crawl_seconds = time.time() - start_time
+
+    documents = [Document(page_content=page["content"], metadata={"source_url": page["url"]}) for page in result.pages]
+    splits = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).split_documents(documents)
+    store = InMemoryVectorStore(embeddings)
+    for i in range(0, len(splits), batch_size):
+        batch = splits[i:i + batch_size]
+        vectors = embeddings.embed_documents([doc.page_content for doc in batch])
+        store._collection.upsert([str(j) for j in range(len(batch))], vectors, None, None)
+
+    return {
+        'total_seconds': time.time() - start_time,
+        'crawl_seconds': crawl_seconds,
+        'chunks': store._collection.count
+    }
+
+def benchmark_streaming(base_url, pages, concurrency, embeddings, batch_size):
+    """Crawl the site while the pipeline chunks, embeds and upserts pages"""
+    store = InMemoryVectorStore(embeddings)
+    pipeline = IngestPipeline(store, {}, "Website", "benchmark", batch_size=batch_size).start()
+    engine, seeds = crawl_engine(base_url, pages, concurrency, page_sink=pipeline.submit)
+
+    start_time = time.time()
+    engine.crawl(seeds)
+    crawl_seconds = time.time() - start_time
+    stats = pipeline.finish()
+
+    return {
+        'total_seconds': time.time() - start_time,
+        'crawl_seconds': crawl_seconds,
+        'chunks': store._collection.count,
+        'stages': stats['stages']
+    }
+
+def measure(name, benchmark, *args):
+    tracemalloc.start()
+    results = benchmark(*args)
+    results['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    logger.info(f"{name:>9}: {results['total_seconds']:.2f}s total (crawl {results['crawl_seconds']:.2f}s), "
+                f"{results['chunks']} chunks, peak traced memory {results['peak_memory_mb']:.1f}MB")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batch vs streaming website ingestion')
+    parser.add_argument('--pages', type=int, default=100, help='Number of pages to crawl')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated latency per request in seconds')
+    parser.add_argument('--concurrency', type=int, default=4, help='Crawl concurrency')
+    parser.add_argument('--embed-ms', type=float, default=10.0, help='Simulated embedding cost per chunk in milliseconds')
+    parser.add_argument('--batch-size', type=int, default=32, help='Chunks per embedding batch')
+    parser.add_argument('--real-embeddings', action='store_true', help='Use the sentence-transformers model instead')
+    args = parser.parse_args()
+
+    config.HTTP_CACHE_CONFIG["enabled"] = False
+    if args.real_embeddings:
+        from app.vector_store import get_embeddings
+        embeddings = get_embeddings()
+    else:
+        embeddings = SimulatedEmbeddings(args.embed_ms / 1000)
+
+    server, base_url = start_fixture_site(total_pages=args.pages, latency=args.latency)
+    logger.info(f"Fixture site running at {base_url} ({args.pages} pages, {args.latency * 1000:.0f}ms latency)")
+
+    all_results = {}
+    try:
+        run_args = (base_url, args.pages, args.concurrency, embeddings, args.batch_size)
+        all_results['batch'] = measure('batch', benchmark_batch, *run_args)
+        all_results['streaming'] = measure('streaming', benchmark_streaming, *run_args)
+    finally:
+        server.shutdown()
+
+    for stage, counters in all_results['streaming']['stages'].items():
+        logger.info(f"  {stage:>6}: {counters['items']} items, busy {counters['busy_seconds']}s, "
+                    f"blocked {counters['blocked_seconds']}s, {counters['items_per_second']} items/s")
+    if all_results['streaming']['total_seconds'] > 0:
+        speedup = all_results['batch']['total_seconds'] / all_results['streaming']['total_seconds']
+        logger.info(f"Streaming ingestion is {speedup:.2f}x faster end to end")
+
+    return all_results
+
+if __name__ == "__main__":
+    main()
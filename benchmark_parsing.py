@@ -0,0 +1,116 @@
+"""
+Benchmark script for HTML parsing.
+This script measures CPU time per page for the three consumers of every crawled
+page (text extraction, link discovery and website categorization), comparing
+one html.parser parse per consumer with a single lxml parse shared by all three.
+
+Usage:
+    python benchmark_parsing.py --corpus saved_pages/
+    python benchmark_parsing.py --urls https://www.example.com/ https://www.example.org/
+    python benchmark_parsing.py  # synthetic fixture pages
+"""
+
+import os
+import time
+import logging
+import argparse
+import requests
+from app.html_document import ParsedPage
+from app.scraper import extract_text, extract_links
+from app.website_categorizer import WebsiteCategorizer
+from benchmark_crawler import render_fixture_page
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logging.getLogger('app').setLevel(logging.WARNING)
+
+def load_corpus(corpus_dir=None, urls=None, limit=None):
+    """
+    Load the pages to parse.
+
+    Args:
+        corpus_dir: Directory searched recursively for saved .html/.htm files
+        urls: URLs to download instead
+        limit: Maximum number of pages
+
+    Returns:
+        List of (base URL, HTML) tuples
+    """
+    pages = []
+    if corpus_dir:
+        for root, _, files in os.walk(corpus_dir):
+            for name in sorted(files):
+                if name.lower().endswith(('.html', '.htm')):
+                    with open(os.path.join(root, name), 'rb') as f:
+                        pages.append((f"https://example.com/{name}", f.read().decode('utf-8', errors='replace')))
+    elif urls:
+        for url in urls:
+            try:
+                response = requests.get(url, timeout=30, headers={'User-Agent': 'Mozilla/5.0'})
+                pages.append((response.url, response.text))
+            except requests.RequestException as e:
+                logger.warning(f"Skipping {url}: {str(e)}")
+    else:
+        pages = [(f"https://example.com/page/{i}", render_fixture_page(i, 100).decode('utf-8')) for i in range(100)]
+    return pages[:limit] if limit else pages
+
+def process_separately(url, html, categorizer):
+    """Previous flow: every consumer parses the page itself with html.parser"""
+    categorizer.analyze_content(ParsedPage(html, url=url, parser='html.parser'))
+    extract_links(ParsedPage(html, url=url, parser='html.parser'), url)
+    return extract_text(ParsedPage(html, url=url, parser='html.parser'))
+
+def process_shared(url, html, categorizer):
+    """Current flow: one lxml parse shared by all consumers"""
+    document = ParsedPage(html, url=url)
+    categorizer.analyze_content(document)
+    extract_links(document, url)
+    return extract_text(document)
+
+def benchmark_flow(pages, flow, rounds):
+    """Run one flow over the corpus and return CPU milliseconds per page"""
+    categorizer = WebsiteCategorizer()
+    start_time = time.process_time()
+    for _ in range(rounds):
+        for url, html in pages:
+            flow(url, html, categorizer)
+    return (time.process_time() - start_time) * 1000 / (len(pages) * rounds)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark shared HTML parsing')
+    parser.add_argument('--corpus', help='Directory of saved HTML pages')
+    parser.add_argument('--urls', nargs='+', help='Pages to download and parse')
+    parser.add_argument('--limit', type=int, help='Maximum number of pages')
+    parser.add_argument('--rounds', type=int, default=3, help='Passes over the corpus per flow')
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus, args.urls, args.limit)
+    if not pages:
+        logger.error("No pages to parse")
+        return None
+    total_kb = sum(len(html) for _, html in pages) / 1024
+    logger.info(f"Parsing {len(pages)} pages ({total_kb / len(pages):.0f}KB average)")
+
+    # Both flows must produce the same text
+    mismatches = sum(process_separately(url, html, WebsiteCategorizer()) != process_shared(url, html, WebsiteCategorizer())
+                     for url, html in pages)
+    if mismatches:
+        logger.warning(f"{mismatches} pages produced different text with lxml")
+
+    results = {
+        'separate_html_parser': benchmark_flow(pages, process_separately, args.rounds),
+        'shared_lxml': benchmark_flow(pages, process_shared, args.rounds)
+    }
+    for flow, ms_per_page in results.items():
+        logger.info(f"{flow:>20}: {ms_per_page:.1f} CPU ms/page")
+    if results['shared_lxml'] > 0:
+        logger.info(f"Shared parsing uses {results['separate_html_parser'] / results['shared_lxml']:.1f}x less CPU per page")
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark script for quantized vector storage.
+This script builds a synthetic corpus of clustered, sentence-embedding sized
+vectors and stores it in a QuantizedVectorIndex per mode. It compares float32
+vectors (what Chroma stores for every chunk) with float16 and int8 codes, with
+and without float32 rescoring of the candidates, on bytes per vector in memory
+and on disk, recall@k against exact float32 search and search latency.
+
+Usage:
+    python benchmark_quantization.py
+    python benchmark_quantization.py --vectors 200000 --dim 768 --k 5
+"""
+
+import os
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import numpy as np
+import config
+from app.quantized_index import QuantizedVectorIndex
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logging.getLogger('app').setLevel(logging.WARNING)
+
+def clustered_vectors(count, dim, clusters, seed):
+    """Vectors around topic centres, as chunks of a website about a few subjects are"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    noise = rng.normal(scale=0.6, size=(count, dim)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=count)] + noise
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def evaluate(name, search, queries, exact, k):
+    hits = 0
+    start_time = time.time()
+    for query, expected in zip(queries, exact):
+        hits += len(set(search(query)) & expected)
+    seconds = time.time() - start_time
+    recall = hits / (k * len(queries))
+    return recall, seconds / len(queries) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark quantized vector storage')
+    parser.add_argument('--vectors', type=int, default=50000, help='Vectors in the collection')
+    parser.add_argument('--dim', type=int, default=384, help='Vector dimensions (384 for all-MiniLM-L6-v2)')
+    parser.add_argument('--clusters', type=int, default=50, help='Topic clusters in the corpus')
+    parser.add_argument('--queries', type=int, default=200, help='Queries searched')
+    parser.add_argument('--k', type=int, default=config.HYBRID_SEARCH_CONFIG["fetch_k"], help='Results per query')
+    args = parser.parse_args()
+
+    vectors = clustered_vectors(args.vectors, args.dim, args.clusters, seed=1)
+    queries = clustered_vectors(args.queries, args.dim, args.clusters, seed=2)
+    ids = [str(i) for i in range(args.vectors)]
+    exact = [set(np.argpartition(-(vectors @ query), args.k)[:args.k].tolist()) for query in queries]
+
+    def float32_search(query):
+        scores = vectors @ query
+        return np.argpartition(-scores, args.k)[:args.k].tolist()
+
+    recall, ms = evaluate("float32", float32_search, queries, exact, args.k)
+    float32_bytes = args.dim * 4
+    logger.info(f"float32: {float32_bytes} bytes/vector in memory, {float32_bytes} on disk, "
+                f"recall@{args.k} {recall:.1%}, {ms:.1f}ms per query")
+    results = {"float32": {"memory_bytes": float32_bytes, "recall": recall, "ms": ms}}
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for mode in ("float16", "int8"):
+            for rescore in (False, True):
+                name = f"{mode}{' + float32 rescoring' if rescore else ''}"
+                index = QuantizedVectorIndex(os.path.join(temp_dir, name), mode=mode, rescore=rescore)
+                index.add(ids, vectors)
+                index.save()
+                recall, ms = evaluate(name, lambda query: [int(i) for i, _ in index.search(query, args.k)],
+                                      queries, exact, args.k)
+                memory_bytes = index.memory_bytes() / args.vectors
+                disk_bytes = index.disk_bytes() / args.vectors
+                logger.info(f"{name}: {memory_bytes:.0f} bytes/vector in memory "
+                            f"({1 - memory_bytes / float32_bytes:.0%} saved), {disk_bytes:.0f} on disk, "
+                            f"recall@{args.k} {recall:.1%}, {ms:.1f}ms per query")
+                results[name] = {"memory_bytes": memory_bytes, "disk_bytes": disk_bytes, "recall": recall, "ms": ms}
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+if __name__ == "__main__":
+    main()
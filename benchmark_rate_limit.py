@@ -0,0 +1,157 @@
+"""
+Benchmark script for per-host rate control.
+This script serves a fragile fixture website that answers
+``429 Too Many Requests`` with a ``Retry-After`` header when more than a few
+requests arrive at once or the request rate exceeds its budget, and crawls it
+three ways: with the old blocking retries inside fetch_page, with non-blocking
+retries at a fixed per-host concurrency, and with the adaptive rate controller.
+
+Usage:
+    python benchmark_rate_limit.py
+    python benchmark_rate_limit.py --pages 150 --capacity 2 --rate 15
+"""
+
+import time
+import logging
+import argparse
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import mock
+import config
+from app.crawler import CrawlEngine
+from app.rate_limiter import HostRateController
+from app.scraper import fetch_page
+from benchmark_crawler import render_fixture_page
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logger.setLevel(logging.INFO)
+logging.getLogger('app').setLevel(logging.CRITICAL)
+
+def start_fragile_site(total_pages, latency, capacity, rate, retry_after):
+    """
+    Start a fixture site that throttles clients.
+
+    Args:
+        total_pages: Number of distinct pages
+        latency: Seconds per request
+        capacity: Concurrent requests served before answering 429
+        rate: Requests per second served before answering 429
+        retry_after: Value of the Retry-After header on 429 responses
+
+    Returns:
+        Tuple of (server, base URL, counters dict)
+    """
+    lock = threading.Lock()
+    counters = {"active": 0, "served": 0, "throttled": 0}
+    bucket = {"tokens": float(rate), "updated": time.time()}
+
+    class FragileHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                now = time.time()
+                bucket["tokens"] = min(rate, bucket["tokens"] + (now - bucket["updated"]) * rate)
+                bucket["updated"] = now
+                throttle = counters["active"] >= capacity or bucket["tokens"] < 1
+                if throttle:
+                    counters["throttled"] += 1
+                else:
+                    bucket["tokens"] -= 1
+                    counters["active"] += 1
+            if throttle:
+                self.send_response(429)
+                self.send_header('Retry-After', str(retry_after))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            try:
+                time.sleep(latency)
+                page_id = int(self.path.split('/')[2]) % total_pages if self.path.startswith('/page/') else 0
+                body = render_fixture_page(page_id, total_pages)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with lock:
+                    counters["active"] -= 1
+                    counters["served"] += 1
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FragileHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", counters
+
+def crawl(base_url, pages, concurrency, mode):
+    """Crawl the fragile site in one of the modes: blocking, fixed or adaptive"""
+    controller = HostRateController(initial_per_host=concurrency, adaptive=(mode == 'adaptive'))
+    engine = CrawlEngine(
+        headers={},
+        max_pages=pages,
+        max_depth=pages,
+        concurrency=concurrency,
+        per_host_limit=concurrency,
+        allow_selenium=False,
+        use_sitemaps=False,
+        respect_robots=False,
+        rate_controller=controller,
+        max_retries=0 if mode == 'blocking' else config.RATE_LIMIT_CONFIG["max_retries"]
+    )
+    start_time = time.time()
+    if mode == 'blocking':
+        # The old behaviour: three attempts inside the worker thread, sleeping 4s and 6s in between
+        blocking_fetch = partial(lambda url, headers, **kwargs: fetch_page(url, headers, **dict(kwargs, retries=3)))
+        with mock.patch('app.crawler.fetch_page', blocking_fetch), \
+             mock.patch('app.scraper.retry_delay', lambda attempt, retry_after=None: 2 + attempt * 2):
+            result = engine.crawl([f"{base_url}/"])
+    else:
+        result = engine.crawl([f"{base_url}/"])
+    return {
+        'seconds': time.time() - start_time,
+        'pages': len(result.pages),
+        'failed': len(result.failed_urls),
+        'retries': result.retries
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark crawling a site that rate limits its clients')
+    parser.add_argument('--pages', type=int, default=100, help='Number of pages to crawl')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated latency per request in seconds')
+    parser.add_argument('--concurrency', type=int, default=8, help='Crawl concurrency')
+    parser.add_argument('--capacity', type=int, default=3, help='Concurrent requests the site serves')
+    parser.add_argument('--rate', type=float, default=20.0, help='Requests per second the site serves')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on 429 responses')
+    args = parser.parse_args()
+
+    config.HTTP_CACHE_CONFIG["enabled"] = False
+
+    all_results = {}
+    for mode in ('blocking', 'fixed', 'adaptive'):
+        server, base_url, counters = start_fragile_site(args.pages, args.latency, args.capacity,
+                                                        args.rate, args.retry_after)
+        try:
+            results = crawl(base_url, args.pages, args.concurrency, mode)
+        finally:
+            server.shutdown()
+        results['throttled'] = counters['throttled']
+        all_results[mode] = results
+        logger.info(f"{mode:>8}: {results['pages']} pages in {results['seconds']:.2f}s, "
+                    f"{results['failed']} failed, {results['retries']} scheduled retries, "
+                    f"{results['throttled']} responses were 429")
+
+    if all_results['adaptive']['seconds'] > 0:
+        logger.info(f"Adaptive rate control is {all_results['blocking']['seconds'] / all_results['adaptive']['seconds']:.2f}x "
+                    f"faster than blocking retries")
+    return all_results
+
+if __name__ == "__main__":
+    main()
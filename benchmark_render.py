@@ -0,0 +1,143 @@
+"""
+Benchmark script for Selenium page rendering.
+This script serves a local JavaScript-heavy fixture site (content loaded over
+fetch, slow images and web fonts, a cookie banner) and compares per-page render
+time of the legacy fixed-sleep mode with the smart readiness mode.
+
+Requires Chrome and chromedriver on the PATH.
+
+Usage:
+    python benchmark_render.py
+    python benchmark_render.py --pages 20 --api-delay 0.3 --asset-delay 1.0
+"""
+
+import time
+import logging
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from app.browser_pool import BrowserPool
+from app.scraper import render_with_selenium
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logger.setLevel(logging.INFO)
+logging.getLogger('app').setLevel(logging.WARNING)
+
+FIXTURE_PAGE = """<!DOCTYPE html>
+<html><head><title>Render fixture {page_id}</title>
+<link rel="preload" href="/assets/font-{page_id}.woff2" as="font" crossorigin>
+</head>
+<body>
+<div class="cookie-banner"><p>We use cookies.</p><button id="cookie-accept">Accept all</button></div>
+<img src="/assets/hero-{page_id}.jpg"><img src="/assets/banner-{page_id}.png">
+<main id="content">Loading...</main>
+<script>
+fetch('/api/content/{page_id}').then(function(r) {{ return r.text(); }}).then(function(html) {{
+    document.getElementById('content').innerHTML = html;
+}});
+</script>
+</body></html>"""
+
+def start_render_fixture(api_delay=0.3, asset_delay=1.0, port=0):
+    """
+    Start a local JavaScript-heavy fixture site in a background thread.
+
+    Args:
+        api_delay: Latency of the content API called from page JavaScript
+        asset_delay: Latency of images and fonts (blocked in smart mode)
+        port: Port to listen on (0 picks a free port)
+
+    Returns:
+        Tuple of (server, base URL)
+    """
+    class RenderFixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/page/'):
+                page_id = self.path.split('/')[2]
+                self._send(FIXTURE_PAGE.format(page_id=page_id), 'text/html; charset=utf-8')
+            elif self.path.startswith('/api/content/'):
+                time.sleep(api_delay)
+                page_id = self.path.split('/')[3]
+                paragraphs = "".join(f"<p>Rendered paragraph {i} of page {page_id}.</p>" for i in range(20))
+                links = "".join(f'<a href="/page/{i}">Page {i}</a>' for i in range(5))
+                self._send(paragraphs + links, 'text/html; charset=utf-8')
+            elif self.path.startswith('/assets/'):
+                time.sleep(asset_delay)
+                self._send('', 'application/octet-stream')
+            else:
+                self.send_error(404)
+
+        def _send(self, body, content_type):
+            body = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), RenderFixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def benchmark_mode(base_url, pages, smart_render, base_port):
+    """Render every fixture page with one pooled browser and return timing statistics"""
+    pool = BrowserPool(size=1, base_port=base_port, smart_render=smart_render)
+    try:
+        # Launch the browser up front so startup is not counted as render time
+        pool.release(pool.acquire())
+
+        render_times = []
+        complete_pages = 0
+        for page_id in range(pages):
+            start_time = time.time()
+            rendered = render_with_selenium(f"{base_url}/page/{page_id}", pool=pool)
+            render_times.append(time.time() - start_time)
+            if rendered and f"Rendered paragraph 19 of page {page_id}" in rendered[0]:
+                complete_pages += 1
+    finally:
+        pool.shutdown()
+
+    return {
+        'avg_render_time': sum(render_times) / len(render_times),
+        'min_render_time': min(render_times),
+        'max_render_time': max(render_times),
+        'complete_pages': complete_pages
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Selenium render modes')
+    parser.add_argument('--pages', type=int, default=10, help='Number of pages to render per mode')
+    parser.add_argument('--api-delay', type=float, default=0.3, help='Latency of the JavaScript content API')
+    parser.add_argument('--asset-delay', type=float, default=1.0, help='Latency of images and fonts')
+    args = parser.parse_args()
+
+    server, base_url = start_render_fixture(api_delay=args.api_delay, asset_delay=args.asset_delay)
+    logger.info(f"Render fixture running at {base_url}")
+
+    all_results = {}
+    try:
+        for mode, smart_render, base_port in [('legacy', False, 9322), ('smart', True, 9332)]:
+            results = benchmark_mode(base_url, args.pages, smart_render, base_port)
+            all_results[mode] = results
+            logger.info(f"{mode:>6}: avg {results['avg_render_time'] * 1000:.0f}ms/page "
+                        f"(min {results['min_render_time'] * 1000:.0f}ms, max {results['max_render_time'] * 1000:.0f}ms), "
+                        f"{results['complete_pages']}/{args.pages} pages with full dynamic content")
+    finally:
+        server.shutdown()
+
+    if len(all_results) == 2 and all_results['smart']['avg_render_time'] > 0:
+        speedup = all_results['legacy']['avg_render_time'] / all_results['smart']['avg_render_time']
+        logger.info(f"Smart render mode is {speedup:.1f}x faster per page")
+
+    return all_results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Benchmark script for chat retrieval.
+This script builds a product catalogue collection in memory, where products of
+one family are described alike and differ mainly in their model code, and asks
+for products by code. It compares the retrieval of the previous get_response
+(similarity search, then one extra vector query per keyword) with hybrid_search
+(one vector query fused with the BM25 keyword index) on recall@k and latency.
+
+Queries are embedded with a hashed bag-of-words model that, like sentence
+embedding models, carries little signal for rare model codes (--code-weight),
+and every query embedding costs --embed-ms. Use --real-embeddings to embed with the configured
+sentence-transformers model instead.
+
+Usage:
+    python benchmark_retrieval.py
+    python benchmark_retrieval.py --products 2000 --queries 200 --embed-ms 15
+    python benchmark_retrieval.py --real-embeddings
+"""
+
+import re
+import zlib
+import time
+import random
+import logging
+import argparse
+import tempfile
+import numpy as np
+from langchain.schema import Document
+import config
+from app import keyword_index
+from app.keyword_index import tokenize
+from app.vector_store import VectorStoreManager
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('benchmark')
+logging.getLogger('app').setLevel(logging.WARNING)
+
+FAMILIES = {
+    "XR": "router with mesh networking, parental controls and a guest network",
+    "CM": "security camera with night vision, motion alerts and cloud recording",
+    "SP": "smart speaker with voice control, multi-room audio and a bass boost",
+    "TH": "thermostat with schedules, energy reports and remote control"
+}
+
+class HashingEmbeddings:
+    """Hashed bag-of-words vectors; tokens containing digits (model codes) get a small weight"""
+
+    def __init__(self, seconds_per_query, code_weight, dim=256):
+        self.seconds_per_query = seconds_per_query
+        self.code_weight = code_weight
+        self.dim = dim
+
+    def _vector(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            is_code = any(char.isdigit() for char in token)
+            vector[zlib.crc32(token.encode()) % self.dim] += self.code_weight if is_code else 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        time.sleep(self.seconds_per_query)
+        return self._vector(text)
+
+class InMemoryCollection:
+    name = "benchmark_retrieval"
+
+    def __init__(self, ids, texts, vectors):
+        self.ids, self.texts = ids, texts
+        self.vectors = np.array(vectors, dtype=np.float32)
+        self.positions = {chunk_id: position for position, chunk_id in enumerate(ids)}
+
+    def count(self):
+        return len(self.ids)
+
+    def query(self, query_embeddings, n_results, include=None):
+        scores = self.vectors @ np.asarray(query_embeddings[0], dtype=np.float32)
+        top = np.argsort(-scores, kind="stable")[:n_results]
+        ids = [self.ids[i] for i in top]
+        return {"ids": [ids], "documents": [[self.texts[i] for i in top]],
+                "metadatas": [[{"chunk_id": chunk_id} for chunk_id in ids]]}
+
+    def get(self, ids=None, include=None):
+        ids = self.ids if ids is None else ids
+        return {"ids": list(ids), "documents": [self.texts[self.positions[i]] for i in ids],
+                "metadatas": [{"chunk_id": i} for i in ids]}
+
+class InMemoryStore:
+    """The parts of a Chroma vector store that retrieval uses"""
+
+    def __init__(self, embeddings, ids, texts):
+        self.embeddings = embeddings
+        self._collection = InMemoryCollection(ids, texts, embeddings.embed_documents(texts))
+
+    def similarity_search(self, query, k):
+        found = self._collection.query([self.embeddings.embed_query(query)], k)
+        return [Document(page_content=text, metadata=meta)
+                for text, meta in zip(found["documents"][0], found["metadatas"][0])]
+
+def build_catalogue(products, seed=3):
+    rng = random.Random(seed)
+    ids, texts, codes = [], [], []
+    for number in range(products):
+        family = rng.choice(list(FAMILIES))
+        code = f"{family}-{100 + number}"
+        texts.append(f"The {code} is a {FAMILIES[family]}. Model {code} ships with a "
+                     f"{rng.choice([1, 2, 3])} year warranty and costs {rng.randint(40, 400)} euros.")
+        ids.append(f"chunk-{number}")
+        codes.append(code)
+    return ids, texts, codes
+
+def multi_query_retrieve(store, user_query, k):
+    """Retrieval of the previous DynamicChatbot.get_response, with its keyword queries always applied"""
+    relevant_docs = store.similarity_search(user_query, k)
+    seen_contents = set(doc.page_content for doc in relevant_docs)
+    stop_words = {'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were',
+                  'in', 'on', 'at', 'to', 'for', 'with', 'by', 'about', 'as', 'of'}
+    keywords = [word.lower() for word in re.sub(r'[^\w\s-]', '', user_query).split()
+                if word.lower() not in stop_words and len(word) > 3]
+    for keyword in keywords:
+        for doc in store.similarity_search(keyword, k):
+            if doc.page_content not in seen_contents:
+                relevant_docs.append(doc)
+                seen_contents.add(doc.page_content)
+    # The previous code capped the context at 8 chunks
+    return relevant_docs[:8]
+
+def evaluate(name, retrieve, queries):
+    hits = 0
+    start_time = time.time()
+    for query, expected in queries:
+        hits += any(doc.metadata["chunk_id"] == expected for doc in retrieve(query))
+    seconds = time.time() - start_time
+    logger.info(f"{name}: recall {hits / len(queries):.0%}, {seconds / len(queries) * 1000:.1f}ms per query")
+    return hits / len(queries), seconds / len(queries)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark chat retrieval')
+    parser.add_argument('--products', type=int, default=1000, help='Products in the catalogue')
+    parser.add_argument('--queries', type=int, default=100, help='Questions asked')
+    parser.add_argument('--k', type=int, default=config.HYBRID_SEARCH_CONFIG["k"], help='Chunks retrieved')
+    parser.add_argument('--embed-ms', type=float, default=10.0, help='Simulated milliseconds per query embedding')
+    parser.add_argument('--code-weight', type=float, default=0.3, help='Weight of model codes in simulated embeddings')
+    parser.add_argument('--real-embeddings', action='store_true', help='Use the configured embedding model')
+    args = parser.parse_args()
+
+    if args.real_embeddings:
+        from app.embedding_models import get_embedding_registry
+        embeddings = get_embedding_registry().get()
+    else:
+        embeddings = HashingEmbeddings(args.embed_ms / 1000, args.code_weight)
+    ids, texts, codes = build_catalogue(args.products)
+    store = InMemoryStore(embeddings, ids, texts)
+    rng = random.Random(11)
+    asked = rng.sample(range(len(codes)), min(args.queries, len(codes)))
+    questions = ["What does the {} cost?", "How long is the warranty of the {}?", "Tell me about {}"]
+    queries = [(rng.choice(questions).format(codes[i]), ids[i]) for i in asked]
+
+    config.HYBRID_SEARCH_CONFIG["index_dir"] = tempfile.mkdtemp()
+    keyword_index._indexes.clear()
+    manager = VectorStoreManager()
+    start_time = time.time()
+    manager._load_keyword_index(store)
+    logger.info(f"Keyword index of {len(texts)} chunks built in {time.time() - start_time:.2f}s")
+
+    baseline = evaluate("Vector search + one query per keyword",
+                        lambda query: multi_query_retrieve(store, query, args.k), queries)
+    hybrid = evaluate("BM25 + vector, reciprocal rank fusion",
+                      lambda query: manager.hybrid_search(store, query, k=args.k), queries)
+    return {'baseline': baseline, 'hybrid': hybrid}
+
+if __name__ == "__main__":
+    main()
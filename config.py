@@ -10,6 +10,8 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # Vector Store Configuration
 VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "vector_store")
+# Re-crawls only embed new/changed pages and delete removed ones
+INCREMENTAL_INDEXING = os.getenv("INCREMENTAL_INDEXING", "true").lower() == "true"
 
 # Model Configuration
 MODEL_CONFIG = {
@@ -31,3 +33,186 @@ MONGO_COLLECTIONS = {
     "user_chats": "user_chats",
     "users": "users"
 }
+
+# Website Crawler Configuration
+CRAWL_CONFIG = {
+    "concurrency": int(os.getenv("CRAWL_CONCURRENCY", "8")),
+    "per_host_limit": int(os.getenv("CRAWL_PER_HOST_LIMIT", "4")),
+    # Seed the crawl from robots.txt/sitemap.xml and skip paths disallowed by robots.txt
+    "use_sitemaps": os.getenv("CRAWL_USE_SITEMAPS", "true").lower() == "true",
+    "respect_robots": os.getenv("CRAWL_RESPECT_ROBOTS", "true").lower() == "true",
+    "robots_user_agent": os.getenv("CRAWL_ROBOTS_USER_AGENT", "*"),
+    "max_sitemaps": int(os.getenv("CRAWL_MAX_SITEMAPS", "20"))
+}
+
+# Adaptive Per-Host Rate Control Configuration
+RATE_LIMIT_CONFIG = {
+    # Adapt per-host concurrency and request spacing to latency and 429/503 responses
+    "adaptive": os.getenv("CRAWL_ADAPTIVE_RATE", "true").lower() == "true",
+    # Concurrency per host starts at CRAWL_CONFIG["per_host_limit"] and grows up to this while responses are fast
+    "max_per_host": int(os.getenv("CRAWL_MAX_PER_HOST", "8")),
+    # Responses slower than this (seconds) reduce a host's concurrency
+    "target_latency": float(os.getenv("CRAWL_TARGET_LATENCY", "2.0")),
+    # Longest pause between two request starts against a throttling host
+    "max_interval": float(os.getenv("CRAWL_MAX_INTERVAL", "10.0")),
+    # Failed fetches (429, 5xx, timeouts) are retried without blocking other pages
+    "max_retries": int(os.getenv("CRAWL_MAX_RETRIES", "3")),
+    "backoff_base": float(os.getenv("CRAWL_BACKOFF_BASE", "2.0")),
+    # Retry-After values above this many seconds are capped
+    "max_retry_after": float(os.getenv("CRAWL_MAX_RETRY_AFTER", "120"))
+}
+
+# Crawled PDF/DOCX Document Configuration
+DOCUMENT_CONFIG = {
+    # Larger documents are skipped, longer PDFs are cut off
+    "max_size_mb": int(os.getenv("DOCUMENT_MAX_SIZE_MB", "50")),
+    "max_pages": int(os.getenv("DOCUMENT_MAX_PAGES", "500")),
+    # PDFs with at least this many pages are extracted in parallel worker processes
+    "parallel_min_pages": int(os.getenv("DOCUMENT_PARALLEL_MIN_PAGES", "32")),
+    "pages_per_task": int(os.getenv("DOCUMENT_PAGES_PER_TASK", "16"))
+}
+
+# Parsing Process Pool Configuration (HTML and PDF extraction run outside the crawler's threads)
+PROCESS_POOL_CONFIG = {
+    # -1 (default) parses in the crawler's threads, 0 = CPU count - 1 spawned worker processes.
+    # Spawned workers re-import the entry script, enable them under gunicorn or a guarded script.
+    "workers": int(os.getenv("PARSE_WORKERS", "-1"))
+}
+
+# Crawl Checkpoint Configuration (interrupted crawls of the same URL resume from disk)
+CHECKPOINT_CONFIG = {
+    "enabled": os.getenv("CRAWL_CHECKPOINTS", "true").lower() == "true",
+    "path": os.getenv("CHECKPOINT_DIR"),  # Defaults to <repo>/crawl_checkpoints
+    # A checkpoint is written after this many new pages or this many seconds, whichever comes first
+    "interval_pages": int(os.getenv("CHECKPOINT_INTERVAL_PAGES", "25")),
+    "interval_seconds": float(os.getenv("CHECKPOINT_INTERVAL_SECONDS", "30")),
+    # Bounds on the checkpoint directory: older or surplus checkpoints are deleted
+    "max_age_hours": float(os.getenv("CHECKPOINT_MAX_AGE_HOURS", "24")),
+    "max_checkpoints": int(os.getenv("CHECKPOINT_MAX_COUNT", "20")),
+    # A crawl whose page log grows beyond this stops checkpointing
+    "max_size_mb": int(os.getenv("CHECKPOINT_MAX_SIZE_MB", "64"))
+}
+
+# Headless Browser Pool Configuration
+BROWSER_POOL_CONFIG = {
+    "size": int(os.getenv("BROWSER_POOL_SIZE", "2")),
+    "base_port": int(os.getenv("BROWSER_POOL_BASE_PORT", "9222")),
+    "max_pages_per_browser": int(os.getenv("BROWSER_MAX_PAGES", "100")),
+    "max_memory_mb": int(os.getenv("BROWSER_MAX_MEMORY_MB", "1024")),
+    "checkout_timeout": int(os.getenv("BROWSER_CHECKOUT_TIMEOUT", "60")),
+    # Wait for DOM/network quiet instead of fixed sleeps, block images/fonts/media/trackers
+    "smart_render": os.getenv("BROWSER_SMART_RENDER", "true").lower() == "true",
+    "ready_quiet_period": float(os.getenv("BROWSER_READY_QUIET_PERIOD", "0.5")),
+    "ready_max_wait": float(os.getenv("BROWSER_READY_MAX_WAIT", "5"))
+}
+
+# Scraper HTTP Cache Configuration
+HTTP_CACHE_CONFIG = {
+    "enabled": os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true",
+    "path": os.getenv("HTTP_CACHE_DIR"),  # Defaults to <repo>/http_cache
+    "max_size_mb": int(os.getenv("HTTP_CACHE_MAX_SIZE_MB", "512"))
+}
+
+# Near-Duplicate Page Detection Configuration
+DEDUP_CONFIG = {
+    "enabled": os.getenv("DEDUP_ENABLED", "true").lower() == "true",
+    # Fraction of matching SimHash bits from which a page is dropped as a near-duplicate
+    "similarity_threshold": float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.95"))
+}
+
+# Cross-Page Boilerplate Removal Configuration
+BOILERPLATE_CONFIG = {
+    "enabled": os.getenv("BOILERPLATE_REMOVAL", "true").lower() == "true",
+    # A text block is site template once it is on this many pages and this fraction of all pages
+    "min_pages": int(os.getenv("BOILERPLATE_MIN_PAGES", "3")),
+    "min_ratio": float(os.getenv("BOILERPLATE_MIN_RATIO", "0.3")),
+    # Pages buffered at the start of a crawl to learn the template
+    "warmup_pages": int(os.getenv("BOILERPLATE_WARMUP_PAGES", "20"))
+}
+
+# Streaming Ingest Pipeline Configuration (crawl -> chunk -> embed -> upsert)
+INGEST_PIPELINE_CONFIG = {
+    "enabled": os.getenv("STREAMING_INGEST", "true").lower() == "true",
+    "page_queue_size": int(os.getenv("INGEST_PAGE_QUEUE_SIZE", "32")),
+    "chunk_queue_size": int(os.getenv("INGEST_CHUNK_QUEUE_SIZE", "512")),
+    "embed_batch_size": int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64")),
+    # Embed a partial batch once no new chunk arrived for this many seconds
+    "flush_interval": float(os.getenv("INGEST_FLUSH_INTERVAL", "1.0"))
+}
+
+# Embedding Model Configuration (each model is loaded once per process)
+EMBEDDING_MODEL_CONFIG = {
+    "model_name": os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+    "fallback_model": os.getenv("EMBEDDING_FALLBACK_MODEL", "all-mpnet-base-v2"),
+    "device": os.getenv("EMBEDDING_DEVICE"),  # Defaults to cuda when available, else cpu
+    # Load and warm up the model in the background when the server starts
+    "preload": os.getenv("EMBEDDING_PRELOAD", "true").lower() == "true"
+}
+
+# Embedding Cache Configuration (vectors of chunk texts embedded before are reused)
+EMBEDDING_CACHE_CONFIG = {
+    "enabled": os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true",
+    "path": os.getenv("EMBEDDING_CACHE_DIR"),  # Defaults to <repo>/embedding_cache
+    "max_size_mb": int(os.getenv("EMBEDDING_CACHE_MAX_SIZE_MB", "1024"))  # Per embedding model
+}
+
+# Bulk Indexing Configuration (whole sites and documents embedded in one go)
+BULK_INDEX_CONFIG = {
+    "encode_batch_size": int(os.getenv("ENCODE_BATCH_SIZE", "64")),  # Chunks per model forward pass
+    "upsert_batch_size": int(os.getenv("UPSERT_BATCH_SIZE", "1024")),  # Chunks embedded and written per step
+    # Comma separated devices of the multi-process encode pool (e.g. "cuda:0,cuda:1" or "cpu,cpu"), empty for none
+    "encode_devices": os.getenv("ENCODE_DEVICES", ""),
+    "pool_min_chunks": int(os.getenv("ENCODE_POOL_MIN_CHUNKS", "2000"))  # Smaller collections are encoded in-process
+}
+
+# Vector Store Handle Cache Configuration (open collections are reused between chat sessions)
+STORE_CACHE_CONFIG = {
+    "enabled": os.getenv("STORE_CACHE_ENABLED", "true").lower() == "true",
+    "max_handles": int(os.getenv("STORE_CACHE_MAX_HANDLES", "16")),
+    "max_memory_mb": int(os.getenv("STORE_CACHE_MAX_MEMORY_MB", "512")),  # Estimated size of the cached collections
+    "access_log": os.getenv("STORE_ACCESS_LOG"),  # Defaults to <repo>/chroma/collection_access.log
+    # Access counts are buffered in memory and appended to the access log this often and at exit
+    "access_log_flush_seconds": float(os.getenv("STORE_ACCESS_LOG_FLUSH_SECONDS", "60")),
+    # Open the most used collections of the last days when the server starts (0 to disable)
+    "preload_count": int(os.getenv("STORE_PRELOAD_COUNT", "4")),
+    "preload_window_days": float(os.getenv("STORE_PRELOAD_WINDOW_DAYS", "7"))
+}
+
+# Hybrid Retrieval Configuration (BM25 keyword ranking fused with vector similarity)
+HYBRID_SEARCH_CONFIG = {
+    # Keep a BM25 index per collection; when disabled retrieval is vector similarity only
+    "keyword_index": os.getenv("KEYWORD_INDEX_ENABLED", "true").lower() == "true",
+    "index_dir": os.getenv("KEYWORD_INDEX_DIR"),  # Defaults to <repo>/vector_store/keyword_index
+    "k": int(os.getenv("RETRIEVAL_K", "5")),  # Chunks passed to the LLM
+    "fetch_k": int(os.getenv("RETRIEVAL_FETCH_K", "20")),  # Candidates taken from each ranking before fusion
+    "rrf_k": int(os.getenv("RETRIEVAL_RRF_K", "60")),
+    "bm25_k1": float(os.getenv("BM25_K1", "1.5")),
+    "bm25_b": float(os.getenv("BM25_B", "0.75"))
+}
+
+# Quantized Vector Storage Configuration (applies to collections created while it is set)
+QUANTIZATION_CONFIG = {
+    # "none" keeps float32 vectors in Chroma, "float16" or "int8" stores them quantized next to it
+    "mode": os.getenv("VECTOR_QUANTIZATION", "none").lower(),
+    "index_dir": os.getenv("QUANTIZED_INDEX_DIR"),  # Defaults to <repo>/vector_store/quantized
+    # Re-rank the best rescore_factor * k candidates with float32 vectors memory-mapped from disk
+    "rescore": os.getenv("QUANTIZATION_RESCORE", "true").lower() == "true",
+    "rescore_factor": int(os.getenv("QUANTIZATION_RESCORE_FACTOR", "4"))
+}
+
+# Collection Registry Configuration (website URL -> vector store collection)
+COLLECTION_REGISTRY_CONFIG = {
+    "path": os.getenv("COLLECTION_REGISTRY_PATH"),  # Defaults to <repo>/chroma/collections.db
+    # Lookups of unregistered URLs check for websites registered by other processes at most this often
+    "refresh_seconds": float(os.getenv("COLLECTION_REGISTRY_REFRESH_SECONDS", "2"))
+}
+
+# Background Job Configuration (website processing runs outside the request thread)
+JOBS_CONFIG = {
+    "path": os.getenv("JOBS_DIR"),  # Defaults to <repo>/jobs
+    "max_workers": int(os.getenv("JOB_WORKERS", "2")),
+    # Finished jobs are forgotten after this many hours
+    "retention_hours": float(os.getenv("JOB_RETENTION_HOURS", "168")),
+    # Minimum seconds between progress writes of one job
+    "persist_interval": float(os.getenv("JOB_PERSIST_INTERVAL", "1.0"))
+}
@@ -134,6 +134,7 @@ const Chat = () => {
   const [renameChatId, setRenameChatId] = useState(null);
   const [showNewChatDialog, setShowNewChatDialog] = useState(false);
   const cancelRequestRef = useRef(null);
+  const jobIdRef = useRef(null);
 
   // Profile menu state
   const [profileMenuAnchorEl, setProfileMenuAnchorEl] = useState(null);
@@ -305,14 +306,51 @@ const Chat = () => {
         cancelToken: source.token
       };
 
-      const response = await axios.post(
+      // Processing runs as a background job; follow /jobs/<id>/events (an EventSource SSE stream) until it finishes
+      const submitted = await axios.post(
         `http://localhost:5000/process-website?sid=${user.id}`,
         { websiteUrl, userId: user.id },
         config
       );
+      if (!submitted.data.success) {
+        setShowProgress(false);
+        setProgressMessage('');
+        showError(submitted.data.error || 'Failed to process website', submitted.data.details);
+        return;
+      }
+      jobIdRef.current = submitted.data.job_id;
+
+      // Follow the job's progress stream until it reports the final state
+      const job = await new Promise((resolve, reject) => {
+        const events = new EventSource(`http://localhost:5000/jobs/${submitted.data.job_id}/events`);
+        source.token.promise.then(cancel => {
+          events.close();
+          reject(cancel);
+        });
+        events.addEventListener('progress', (event) => {
+          const progress = JSON.parse(event.data);
+          if (progress.last_page) {
+            setScrapingLink(progress.last_page.url);
+          }
+          if (progress.pages_total) {
+            const eta = progress.eta_seconds != null ? `, about ${Math.ceil(progress.eta_seconds / 60)} min left` : '';
+            setProgressMessage(`⏳ Processed ${progress.pages_done} of ${progress.pages_total} pages${eta}`);
+          }
+        });
+        events.addEventListener('done', (event) => {
+          events.close();
+          resolve(JSON.parse(event.data));
+        });
+        events.onerror = () => {
+          // The browser reconnects on its own unless the stream was closed for good
+          if (events.readyState === EventSource.CLOSED) {
+            reject(new Error('Lost connection to the progress stream'));
+          }
+        };
+      });
 
-      if (response.data.success) {
-        // Rest of the code remains the same
+      if (job.state === 'completed') {
+        const response = { data: job.result };
         setWebsiteUrl('');
         setShowProgress(false);
         setProgressMessage('');
@@ -328,7 +366,7 @@ const Chat = () => {
       } else {
         setShowProgress(false);
         setProgressMessage('');
-        showError(response.data.error || 'Failed to process website', response.data.details);
+        showError(job.error || 'Failed to process website');
       }
     } catch (error) {
       if (axios.isCancel(error)) {
@@ -343,6 +381,7 @@ const Chat = () => {
     } finally {
       setLoading(false);
       cancelRequestRef.current = null;
+      jobIdRef.current = null;
     }
   };
 
@@ -1644,7 +1683,7 @@ const Chat = () => {
                 }
                 // Send abort request to Flask backend
                 try {
-                  await axios.post('http://localhost:5000/abort-processing', { user_id: sid });
+                  await axios.post('http://localhost:5000/abort-processing', { job_id: jobIdRef.current, user_id: sid });
                 } catch (err) {
                   console.error('Failed to send abort signal:', err);
                 }
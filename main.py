@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 from app.chatbot import get_response, process_website, process_document
 import os
@@ -6,9 +6,15 @@ from dotenv import load_dotenv
 import traceback
 from werkzeug.utils import secure_filename
 import logging
-import hashlib
+import json
 from app.vector_store import load_vector_store
 from app.chatbot import chatbot
+from app.scraper import close_selenium_driver
+from app.jobs import get_job_manager, FINAL_STATES
+from app.process_pool import shutdown_process_pool
+from app.embedding_models import get_embedding_registry, preload_embedding_model
+from app.store_cache import get_store_cache, preload_vector_stores
+from app.collection_registry import get_collection_registry
 import threading
 import requests
 import atexit
@@ -26,6 +32,11 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 # CORS will be handled manually via after_request to avoid conflicts
 
+# Load the embedding model while the server starts instead of on the first request
+preload_embedding_model()
+# Open the most used collections so their first chat message does not wait for them
+preload_vector_stores()
+
 UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
@@ -39,9 +50,6 @@ def after_request(response):
     response.headers['Access-Control-Allow-Credentials'] = 'true'
     return response
 
-# Track abort flags by session/user id
-global_abort_flags = {}
-
 # Get API settings from environment variables or use defaults
 NODE_BACKEND_URL = os.environ.get('NODE_BACKEND_URL', 'http://localhost:4000')
 
@@ -101,7 +109,11 @@ def health_check():
         "version": "1.0.0",
         "service": "ZentraChatbot Flask API",
         "llm": "local_ollama",
-        "environment": "development"
+        "environment": "development",
+        # Load/warm-up seconds and requests served per embedding model
+        "embedding_models": get_embedding_registry().get_stats(),
+        # Hits, misses and evictions of the open vector store handle cache
+        "vector_store_cache": get_store_cache().get_stats()
     })
 
 @app.route('/chat', methods=['POST', 'OPTIONS'])
@@ -185,39 +197,93 @@ def process_website_endpoint():
 
         sid = request.args.get('sid')
         user_id = sid or 'default'
-        global_abort_flags[user_id] = False
 
-        # Pass abort flag to process_website
-        def abort_checker():
-            return global_abort_flags.get(user_id, False)
-
-        success, result = process_website(website_url, sid=sid, abort_checker=abort_checker)
-        if success:
-            if isinstance(result, dict):
-                message = result["message"]
-                categories = result["categories"]
-            else:
-                message = result
-                categories = None
-
-            pages_processed = message.split("Scraped ")[1].split(" pages")[0]
-            response = {
-                "success": True,
-                "message": message,
-                "pages_processed": int(pages_processed),
-                "website_url": website_url
-            }
-            if categories:
-                response["categories"] = categories
-            return jsonify(response)
-        else:
-            return jsonify({"success": False, "error": result}), 500
+        # Crawl and index in the background, the client follows the /jobs/<job_id>/events Server-Sent Events stream
+        def run_job(report_progress, should_abort):
+            success, result = process_website(website_url, sid=sid, abort_checker=should_abort,
+                                              progress_callback=report_progress)
+            if not success:
+                return False, result
+            return True, website_result_response(website_url, result)
+
+        job = get_job_manager().submit("website", website_url, run_job, owner=user_id)
+        return jsonify({
+            "success": True,
+            "job_id": job["id"],
+            "state": job["state"],
+            "status_url": f"/jobs/{job['id']}"
+        }), 202
 
     except Exception as e:
         logger.error(f"Error in /process-website: {e}")
         logger.error(traceback.format_exc())
         return jsonify({"success": False, "error": str(e)}), 500
 
+def website_result_response(website_url, result):
+    """Response body for a successfully processed website"""
+    index_stats = None
+    dedup_stats = None
+    boilerplate_stats = None
+    embedding_cache_stats = None
+    if isinstance(result, dict):
+        message = result["message"]
+        categories = result["categories"]
+        index_stats = result.get("index_stats")
+        dedup_stats = result.get("dedup_stats")
+        boilerplate_stats = result.get("boilerplate_stats")
+        embedding_cache_stats = result.get("embedding_cache_stats")
+    else:
+        message = result
+        categories = None
+
+    pages_processed = message.split("Scraped ")[1].split(" pages")[0]
+    response = {
+        "success": True,
+        "message": message,
+        "pages_processed": int(pages_processed),
+        "website_url": website_url
+    }
+    if categories:
+        response["categories"] = categories
+    if index_stats:
+        response["index_stats"] = index_stats
+    if dedup_stats:
+        response["duplicate_pages"] = dedup_stats["duplicate_pages"]
+        response["duplicate_bytes_saved"] = dedup_stats["bytes_saved"]
+    if boilerplate_stats:
+        response["boilerplate_blocks_removed"] = boilerplate_stats["blocks_removed"]
+        response["boilerplate_chars_removed"] = boilerplate_stats["chars_before"] - boilerplate_stats["chars_after"]
+    if embedding_cache_stats:
+        response["embedding_cache_hit_rate"] = embedding_cache_stats["hit_rate"]
+        response["embedding_seconds_saved"] = embedding_cache_stats["seconds_saved"]
+    return response
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, "job": job})
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Stream a job's progress as Server-Sent Events until it finishes"""
+    manager = get_job_manager()
+    if manager.get(job_id) is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+
+    def stream():
+        # A slow client gets the latest status instead of a growing backlog
+        for job in manager.follow(job_id):
+            if job is None:
+                yield ": keep-alive\n\n"
+            else:
+                event = "done" if job["state"] in FINAL_STATES else "progress"
+                yield f"event: {event}\ndata: {json.dumps(job)}\n\n"
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/get-website-categories', methods=['GET'])
 def get_website_categories():
     try:
@@ -277,8 +343,7 @@ def load_website():
         if not website_url:
             return jsonify({"success": False, "error": "No website URL provided"}), 400
 
-        url_hash = hashlib.md5(website_url.encode()).hexdigest()
-        collection_name = f"website_{url_hash}"
+        collection_name = get_collection_registry().collection_name(website_url)
         vector_store = load_vector_store(collection_name)
         if not vector_store:
             return jsonify({"success": False, "error": "No vector store found for this website"}), 404
@@ -294,13 +359,21 @@ def load_website():
 
 @app.route('/abort-processing', methods=['POST'])
 def abort_processing():
-    user_id = request.json.get('user_id')
-    logger.info(f"Abort requested for user_id: {user_id}")
+    data = request.get_json(silent=True) or {}
+    job_id = data.get('job_id')
+    user_id = data.get('user_id')
+    logger.info(f"Abort requested for job_id: {job_id}, user_id: {user_id}")
+    manager = get_job_manager()
+    if job_id:
+        if manager.abort(job_id):
+            return {"success": True, "message": "Abort signal sent."}
+        return {"success": False, "message": "No running job with this id."}, 404
     if user_id:
-        global_abort_flags[user_id] = True
-        logger.info(f"Abort flag set for user_id: {user_id}")
-        return {"success": True, "message": "Abort signal sent."}
-    return {"success": False, "message": "No user_id provided."}, 400
+        # Without a job id, abort every unfinished job of the user
+        aborted = [job["id"] for job in manager.list_jobs(owner=user_id, active_only=True) if manager.abort(job["id"])]
+        logger.info(f"Aborted {len(aborted)} jobs for user_id: {user_id}")
+        return {"success": True, "message": "Abort signal sent.", "job_ids": aborted}
+    return {"success": False, "message": "No job_id or user_id provided."}, 400
 
 # Add a signal handler for clean shutdown
 def signal_handler(sig, frame):
@@ -333,7 +406,10 @@ signal.signal(signal.SIGINT, signal_handler)
 # Register a cleanup function to run on normal exit
 def cleanup():
     print('Performing final cleanup...')
-    # Any additional cleanup code can go here
+    # Ask running jobs to stop, then quit the pooled headless browsers and parsing workers
+    get_job_manager().shutdown()
+    close_selenium_driver()
+    shutdown_process_pool()
 
 atexit.register(cleanup)
 
@@ -0,0 +1,58 @@
+"""
+Test script for cross-page boilerplate removal.
+"""
+
+import unittest
+from app.boilerplate import BoilerplateFilter, TEMPLATE_URL_SUFFIX
+from app.scraper import extract_text_blocks
+
+TEMPLATE = ("<nav><ul><li><a href='/'>Home</a></li><li><a href='/loans'>Loans and mortgages</a></li></ul></nav>",
+            "<footer><p>Example Bank, call 555-0100</p></footer>")
+
+def make_page(i):
+    html = (f"<html><body>{TEMPLATE[0]}<main><h1>Article {i}</h1>"
+            f"<p>Rates for plan {i} change every quarter.</p></main>{TEMPLATE[1]}</body></html>")
+    blocks = extract_text_blocks(html)
+    return {"url": f"https://example.com/{i}", "content": " ".join(blocks), "blocks": blocks}
+
+class TestBoilerplateFilter(unittest.TestCase):
+    """Test cases for learning and stripping a site template."""
+
+    def test_repeated_blocks_are_removed_and_kept_once(self):
+        pages = [make_page(i) for i in range(6)]
+        boilerplate = BoilerplateFilter("https://example.com/", min_pages=3, min_ratio=0.5, warmup_pages=4)
+        stripped = boilerplate.filter_pages(pages)
+
+        self.assertEqual(len(stripped), 7)
+        for page in stripped[:6]:
+            self.assertNotIn("blocks", page)
+            self.assertNotIn("555-0100", page["content"])
+            self.assertNotIn("Loans and mortgages", page["content"])
+        self.assertEqual(stripped[2]["content"], "Article 2 Rates for plan 2 change every quarter.")
+
+        template = stripped[-1]
+        self.assertEqual(template["url"], "https://example.com/" + TEMPLATE_URL_SUFFIX)
+        self.assertEqual(template["content"].count("555-0100"), 1)
+        self.assertIn("Loans and mortgages", template["content"])
+        self.assertEqual(boilerplate.get_stats()["blocks_removed"], 6 * boilerplate.get_stats()["template_blocks"])
+
+    def test_pages_are_buffered_during_warmup(self):
+        boilerplate = BoilerplateFilter("https://example.com/", min_pages=2, min_ratio=0.5, warmup_pages=3)
+        self.assertEqual(boilerplate.add(make_page(0)), [])
+        self.assertEqual(boilerplate.add(make_page(1)), [])
+        self.assertEqual(len(boilerplate.add(make_page(2))), 3)
+        self.assertEqual(len(boilerplate.add(make_page(3))), 1)
+
+        # Documents without blocks (PDF, DOCX) are passed through unchanged
+        document = {"url": "https://example.com/report.pdf", "content": "Annual report"}
+        self.assertEqual(boilerplate.add(document), [document])
+
+    def test_small_sites_keep_their_content(self):
+        """With fewer pages than min_pages nothing counts as boilerplate."""
+        boilerplate = BoilerplateFilter("https://example.com/", min_pages=3)
+        stripped = boilerplate.filter_pages([make_page(0), make_page(1)])
+        self.assertEqual(len(stripped), 2)
+        self.assertIn("555-0100", stripped[0]["content"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Test script for the headless browser pool, with fake drivers instead of Chrome.
+"""
+
+import threading
+import unittest
+from unittest import mock
+from app.browser_pool import BrowserPool, PooledBrowser
+
+class FakeDriver:
+    def __init__(self, port):
+        self.port = port
+        self.alive = True
+        self.quit_calls = 0
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return "about:blank"
+
+    def quit(self):
+        self.quit_calls += 1
+
+class TestBrowserPool(unittest.TestCase):
+    """Test cases for checkout, health checks, recycling and shutdown."""
+
+    def setUp(self):
+        self.drivers = []
+
+        def create_driver(port, page_load_timeout=30, smart_render=True):
+            driver = FakeDriver(port)
+            self.drivers.append(driver)
+            return driver
+
+        patcher = mock.patch("app.browser_pool.create_chrome_driver", side_effect=create_driver)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_pool(self, **options):
+        options = {"size": 2, "base_port": 9300, "max_pages_per_browser": 100, "max_memory_mb": 1024, **options}
+        pool = BrowserPool(**options)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_browsers_are_reused_up_to_the_pool_size(self):
+        pool = self.make_pool()
+        first, second = pool.acquire(), pool.acquire()
+        self.assertEqual({first.port, second.port}, {9300, 9301})
+        self.assertIsNone(pool.acquire(timeout=0.05))  # both browsers are checked out
+
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        stats = pool.get_stats()
+        self.assertEqual((stats["launched"], stats["checkouts"], stats["running"]), (2, 3, 2))
+
+    def test_waiting_checkout_gets_a_released_browser(self):
+        pool = self.make_pool(size=1)
+        browser = pool.acquire()
+        threading.Timer(0.05, pool.release, args=(browser,)).start()
+        self.assertIs(pool.acquire(timeout=5), browser)
+
+    def test_unresponsive_browser_is_replaced_on_checkout(self):
+        pool = self.make_pool(size=1)
+        browser = pool.acquire()
+        pool.release(browser)
+        browser.driver.alive = False
+
+        replacement = pool.acquire()
+        self.assertIsNot(replacement, browser)
+        self.assertEqual(browser.driver.quit_calls, 1)
+        self.assertEqual(replacement.port, browser.port)  # the port was freed for the new browser
+        self.assertEqual(pool.get_stats()["unhealthy"], 1)
+
+    def test_browsers_are_recycled_after_max_pages_or_memory(self):
+        pool = self.make_pool(size=1, max_pages_per_browser=2)
+        browser = pool.acquire()
+        pool.release(browser)
+        self.assertIs(pool.acquire(), browser)
+        pool.release(browser)  # second page
+        self.assertEqual(browser.driver.quit_calls, 1)
+        self.assertIsNot(pool.acquire(), browser)
+
+        pool = self.make_pool(size=1, max_memory_mb=100)
+        browser = pool.acquire()
+        with mock.patch.object(PooledBrowser, "memory_mb", return_value=150.0):
+            pool.release(browser)
+        self.assertEqual(browser.driver.quit_calls, 1)
+        self.assertEqual(pool.get_stats()["recycled"], 1)
+
+    def test_shutdown_quits_browsers(self):
+        pool = self.make_pool()
+        idle, busy = pool.acquire(), pool.acquire()
+        pool.release(idle)
+        pool.shutdown()
+        self.assertEqual(idle.driver.quit_calls, 1)
+        self.assertIsNone(pool.acquire())
+
+        # A browser checked out during the shutdown is quit when it comes back
+        pool.release(busy)
+        self.assertEqual(busy.driver.quit_calls, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Test script for checkpointing and resuming website crawls.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app.checkpoint import CrawlCheckpoint
+from app.crawler import CrawlEngine
+from app.scraper import FetchResult
+
+SITE = "https://example.com"
+
+def fake_fetch(url, *args, **kwargs):
+    """Every page links to the next two pages of a 30 page site"""
+    page_id = int(url.rsplit("/", 1)[-1] or 0)
+    links = "".join(f'<a href="{SITE}/page/{n}">Page {n}</a>' for n in (page_id + 1, page_id + 2) if n < 30)
+    result = FetchResult(url)
+    result.set_content(f"<html><body><p>Content of page {page_id}</p>{links}</body></html>", "html")
+    return result
+
+class TestCrawlCheckpoint(unittest.TestCase):
+    """Test cases for saving crawl state and resuming from it."""
+
+    def setUp(self):
+        self.checkpoint_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.checkpoint_dir)
+
+    def crawl(self, abort_after=None):
+        checkpoint = CrawlCheckpoint(SITE, checkpoint_dir=self.checkpoint_dir, interval_pages=5)
+        fetched = []
+
+        def fetch(url, *args, **kwargs):
+            fetched.append(url)
+            return fake_fetch(url)
+
+        engine = CrawlEngine({}, max_pages=100, max_depth=100, concurrency=2, allow_selenium=False,
+                             use_sitemaps=False, respect_robots=False, checkpoint=checkpoint,
+                             abort_checker=lambda: abort_after is not None and len(fetched) >= abort_after)
+        with mock.patch("app.crawler.fetch_page", side_effect=fetch):
+            result = engine.crawl([f"{SITE}/page/1"], exclude=[SITE])
+        return result, fetched, checkpoint
+
+    def test_aborted_crawl_resumes_without_refetching(self):
+        first, first_fetched, first_checkpoint = self.crawl(abort_after=12)
+        self.assertTrue(first.aborted)
+        self.assertIsNone(first_checkpoint._log)  # the page log is closed after the final snapshot
+
+        second, second_fetched, checkpoint = self.crawl()
+        self.assertFalse(second.aborted)
+        self.assertEqual(len(second.pages), 29)
+        self.assertEqual(sorted(page["url"] for page in second.pages),
+                         sorted(f"{SITE}/page/{n}" for n in range(1, 30)))
+        # Pages extracted before the abort are restored, not fetched again
+        self.assertFalse(set(first.processed_urls) & set(second_fetched))
+        self.assertEqual(len(first.processed_urls) + len(second_fetched), 29)
+        self.assertEqual(second.pages[0]["content"], "Content of page 1 Page 2 Page 3")
+
+        checkpoint.clear()
+        self.assertIsNone(checkpoint.load())
+
+    def test_old_checkpoints_are_pruned(self):
+        with mock.patch.dict("config.CHECKPOINT_CONFIG", {"max_checkpoints": 2, "max_age_hours": 1e9}):
+            for n in range(4):
+                checkpoint = CrawlCheckpoint(f"{SITE}/{n}", checkpoint_dir=self.checkpoint_dir)
+                checkpoint.record_page({"url": f"{SITE}/{n}", "content": "text"})
+                checkpoint.write(checkpoint.snapshot({"levels": [], "seen": []}))
+                os.utime(checkpoint.path, (1e9 + n, 1e9 + n))
+            self.assertIsNone(CrawlCheckpoint(f"{SITE}/0", checkpoint_dir=self.checkpoint_dir).load())
+            self.assertEqual(len(os.listdir(self.checkpoint_dir)), 4)  # two snapshots and their page logs
+
+    def test_snapshots_do_not_hold_pages(self):
+        checkpoint = CrawlCheckpoint(SITE, checkpoint_dir=self.checkpoint_dir)
+        frontier = {"levels": [[1, [f"{SITE}/queued"]]], "seen": []}
+        for n in range(3):
+            checkpoint.record_page({"url": f"{SITE}/{n}", "content": "text " * 100})
+        first = checkpoint.snapshot(frontier)
+        for n in range(3, 5):
+            checkpoint.record_page({"url": f"{SITE}/{n}", "content": "text " * 100})
+        second = checkpoint.snapshot(frontier)
+        self.assertEqual(set(second), {"version", "site_url", "saved_at", "frontier", "page_count", "log_offset"})
+        self.assertEqual((first["page_count"], second["page_count"]), (3, 5))
+        self.assertEqual(second["log_offset"], os.path.getsize(checkpoint.log_path))
+        checkpoint.write(first)
+
+        # Pages logged after the saved snapshot are dropped, their URLs are fetched again
+        resumed = CrawlCheckpoint(SITE, checkpoint_dir=self.checkpoint_dir)
+        state = resumed.load()
+        self.assertEqual([page["url"] for page in state["pages"]], [f"{SITE}/{n}" for n in range(3)])
+        resumed.record_page({"url": f"{SITE}/queued", "content": "text"})
+        resumed.write(resumed.snapshot(frontier))
+        state = CrawlCheckpoint(SITE, checkpoint_dir=self.checkpoint_dir).load()
+        self.assertEqual(state["page_count"], 4)
+        self.assertEqual([page["url"] for page in state["pages"]][-1], f"{SITE}/queued")
+
+    def test_closed_page_log_is_appended_to(self):
+        checkpoint = CrawlCheckpoint(SITE, checkpoint_dir=self.checkpoint_dir)
+        checkpoint.record_page({"url": f"{SITE}/0", "content": "text"})
+        checkpoint.close()
+        self.assertIsNone(checkpoint._log)
+        checkpoint.record_page({"url": f"{SITE}/1", "content": "text"})
+        checkpoint.write(checkpoint.snapshot({"levels": [], "seen": []}))
+        checkpoint.close()
+
+        state = CrawlCheckpoint(SITE, checkpoint_dir=self.checkpoint_dir).load()
+        self.assertEqual([page["url"] for page in state["pages"]], [f"{SITE}/0", f"{SITE}/1"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Test script for the website collection registry.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app.collection_registry import CollectionRegistry, website_collection_name
+
+class TestCollectionRegistry(unittest.TestCase):
+    """Test cases for recording and looking up website collections."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "collections.db")
+        self.legacy_file = os.path.join(self.temp_dir, "vector_store_map.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def open_registry(self, refresh_seconds=0):
+        registry = CollectionRegistry(self.db_path, legacy_mapping_file=self.legacy_file,
+                                      refresh_seconds=refresh_seconds)
+        self.addCleanup(registry.close)
+        return registry
+
+    def test_record_and_refresh(self):
+        registry = self.open_registry()
+        url = "https://example.com/"
+        self.assertIsNone(registry.get(url))
+        self.assertEqual(registry.collection_name(url), website_collection_name(url))
+
+        registry.record(url, "website_a", chunk_count=10, size_bytes=2048, categories={"website_type": "corporate"})
+        created_at = registry.get(url)["created_at"]
+        registry.record(url, "website_a", chunk_count=12, size_bytes=4096)
+
+        record = registry.get(url)
+        self.assertEqual(record["chunk_count"], 12)
+        self.assertEqual(record["created_at"], created_at)
+        self.assertGreaterEqual(record["refreshed_at"], created_at)
+        self.assertIsNone(record["categories"])
+
+    def test_writes_of_another_registry_are_visible(self):
+        reader = self.open_registry()
+        self.assertIsNone(reader.get("https://example.com/"))
+
+        writer = self.open_registry()
+        writer.record("https://example.com/", "website_b", categories={"primary_industry": "education"})
+        self.assertEqual(reader.collection_name("https://example.com/"), "website_b")
+        self.assertEqual(reader.get("https://example.com/")["categories"], {"primary_industry": "education"})
+
+    def test_misses_are_cached(self):
+        reader = self.open_registry(refresh_seconds=60)
+        statements = []
+        reader._conn.set_trace_callback(statements.append)
+        for _ in range(100):
+            self.assertIsNone(reader.get("https://example.com/"))
+        self.assertEqual(statements, [])
+
+        # After the interval a miss checks the data version and reloads only when another registry wrote
+        with mock.patch("app.collection_registry.time.monotonic", return_value=reader._checked_at + 61):
+            self.assertIsNone(reader.get("https://example.com/"))
+            self.assertEqual(statements, ["PRAGMA data_version"])
+        self.open_registry().record("https://example.com/", "website_c")
+        with mock.patch("app.collection_registry.time.monotonic", return_value=reader._checked_at + 61):
+            self.assertEqual(reader.collection_name("https://example.com/"), "website_c")
+
+    def test_legacy_mapping_is_imported_once(self):
+        with open(self.legacy_file, "w") as f:
+            json.dump({"https://old.example/": "website_old"}, f)
+        registry = self.open_registry()
+        self.assertEqual(registry.collection_name("https://old.example/"), "website_old")
+
+        registry.remove("https://old.example/")
+        registry.record("https://new.example/", "website_new")
+        self.assertEqual([record["url"] for record in self.open_registry().all()], ["https://new.example/"])
+
+if __name__ == "__main__":
+    unittest.main()
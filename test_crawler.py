@@ -0,0 +1,94 @@
+"""
+Test script for the concurrent crawl engine, run against the local fixture site.
+"""
+
+import threading
+import unittest
+from unittest import mock
+from app.crawler import CrawlEngine
+from app.rate_limiter import HostRateController
+from app.scraper import FetchResult, fetch_page
+from benchmark_crawler import start_fixture_site
+
+class TestCrawlEngine(unittest.TestCase):
+    """Test cases for depth, page budget, per-host limits and aborts."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.base_url = start_fixture_site(total_pages=100, latency=0.01)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        for patcher in (mock.patch.dict("config.HTTP_CACHE_CONFIG", {"enabled": False}),
+                        mock.patch.dict("config.PROCESS_POOL_CONFIG", {"workers": -1})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def crawl(self, fetch=None, **options):
+        options = {"max_pages": 100, "max_depth": 3, "concurrency": 4, "allow_selenium": False,
+                   "use_sitemaps": False, "respect_robots": False,
+                   "rate_controller": HostRateController(adaptive=False), **options}
+        engine = CrawlEngine({}, **options)
+        with mock.patch("app.crawler.fetch_page", side_effect=fetch or fetch_page):
+            return engine.crawl([f"{self.base_url}/"])
+
+    def test_links_are_followed_to_max_depth(self):
+        self.assertEqual(self.crawl(max_depth=1).processed_urls, {f"{self.base_url}/"})
+        # The home page links to pages 1 to 5
+        self.assertEqual(self.crawl(max_depth=2).processed_urls,
+                         {f"{self.base_url}/"} | {f"{self.base_url}/page/{n}" for n in range(1, 6)})
+
+    def test_max_pages(self):
+        result = self.crawl(max_pages=7, max_depth=10)
+        self.assertEqual(len(result.processed_urls), 7)
+        self.assertEqual(len(result.pages), 7)
+
+    def test_per_host_limit(self):
+        lock = threading.Lock()
+        active = [0, 0]  # current, highest
+
+        def fetch(*args, **kwargs):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            try:
+                return fetch_page(*args, **kwargs)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        result = self.crawl(fetch, max_pages=20, max_depth=10, concurrency=8, per_host_limit=2)
+        self.assertEqual(len(result.processed_urls), 20)
+        self.assertEqual(active[1], 2)
+
+    def test_abort(self):
+        done = []
+        result = self.crawl(max_pages=50, max_depth=10, on_page=lambda *args: done.append(args[0]),
+                            abort_checker=lambda: len(done) >= 5)
+        self.assertTrue(result.aborted)
+        self.assertLess(len(result.processed_urls), 10)  # pages in flight at the abort still finish
+
+    def test_pending_retries_count_against_max_pages(self):
+        attempts = []
+
+        def fetch(url, *args, **kwargs):
+            attempts.append(url)
+            if len(attempts) == 2:  # the first page after the home page is throttled once
+                result = FetchResult(url)
+                result.error, result.retryable, result.retry_after = "HTTP 503", True, 0.2
+                return result
+            return fetch_page(url, *args, **kwargs)
+
+        result = self.crawl(fetch, max_pages=3, max_depth=10, concurrency=1)
+        self.assertEqual(result.retries, 1)
+        # The page waiting for its retry kept its place instead of being crowded out by later pages
+        self.assertIn(attempts[1], result.processed_urls)
+        self.assertEqual(len(result.processed_urls), 3)
+        self.assertEqual(len(attempts), 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Test script for near-duplicate page detection.
+"""
+
+import unittest
+from app.dedup import NearDuplicateFilter, simhash, hamming_distance
+
+ARTICLE = " ".join(
+    f"Section {i} explains how our savings accounts, fixed deposits and home loans work for customer group {i}."
+    for i in range(40)
+)
+
+class TestNearDuplicateFilter(unittest.TestCase):
+    """Test cases for SimHash fingerprints and duplicate filtering."""
+
+    def test_similar_texts_have_close_fingerprints(self):
+        print_view = "Print this page. " + ARTICLE + " Back to top."
+        unrelated = " ".join(f"Admission {i} for engineering students opens in semester {i}." for i in range(40))
+        self.assertLessEqual(hamming_distance(simhash(ARTICLE), simhash(print_view)), 3)
+        self.assertGreater(hamming_distance(simhash(ARTICLE), simhash(unrelated)), 10)
+        self.assertIsNone(simhash("  ...  "))
+
+    def test_duplicates_are_dropped_and_counted(self):
+        """The first copy is kept, later near-copies are dropped with their size reported."""
+        pages = [
+            {"url": "https://example.com/article", "content": ARTICLE},
+            {"url": "https://example.com/article?print=1", "content": "Print this page. " + ARTICLE},
+            {"url": "https://example.com/fr/article", "content": ARTICLE},
+            {"url": "https://example.com/contact", "content": "Call us on 555-0100 or visit any branch."},
+        ]
+        dedup = NearDuplicateFilter(similarity_threshold=0.95)
+        kept = dedup.filter_pages(pages)
+
+        self.assertEqual([page["url"] for page in kept], ["https://example.com/article", "https://example.com/contact"])
+        stats = dedup.get_stats()
+        self.assertEqual(stats["duplicate_pages"], 2)
+        self.assertEqual(stats["bytes_saved"], len(pages[1]["content"]) + len(pages[2]["content"]))
+
+    def test_threshold_of_one_only_drops_exact_copies(self):
+        dedup = NearDuplicateFilter(similarity_threshold=1.0)
+        self.assertIsNone(dedup.check("a", ARTICLE))
+        self.assertIsNone(dedup.check("b", "Print this page. Or not. " + ARTICLE))
+        self.assertEqual(dedup.check("c", ARTICLE), "a")
+
+    def test_kept_page_does_not_depend_on_the_order(self):
+        """Of near-duplicates the shortest URL is kept, replacing a copy kept before it arrived."""
+        urls = ["https://example.com/article?print=1", "https://example.com/fr/article", "https://example.com/article"]
+        for order in (urls, list(reversed(urls))):
+            dedup = NearDuplicateFilter(similarity_threshold=0.95)
+            for url in order:
+                dedup.check(url, ARTICLE)
+            self.assertEqual(dedup.check("https://example.com/article/", ARTICLE), "https://example.com/article")
+            self.assertEqual(dedup.get_stats()["duplicate_pages"], 3)
+            self.assertEqual(dedup.fingerprint("https://example.com/article"), simhash(ARTICLE))
+            self.assertIsNone(dedup.fingerprint(urls[0]))
+
+        dedup = NearDuplicateFilter(similarity_threshold=0.95)
+        self.assertIsNone(dedup.check(urls[0], ARTICLE))
+        self.assertEqual(dedup.add(urls[2], ARTICLE), (None, [urls[0]]))
+
+if __name__ == "__main__":
+    unittest.main()
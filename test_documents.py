@@ -0,0 +1,67 @@
+"""
+Test script for in-memory PDF processing of crawled documents.
+"""
+
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+from app.crawler import CrawlEngine
+from app.documents import iter_document_pages, load_document
+from app.process_pool import shutdown_process_pool
+from app.scraper import FetchResult, set_document_content
+from benchmark_documents import build_fixture_pdf
+
+SITE = "https://example.com"
+
+class TestDocuments(unittest.TestCase):
+    """Test cases for page range extraction, caps and streaming into the crawl."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pdf = build_fixture_pdf(10, lines_per_page=3)
+
+    def test_pages_are_extracted_in_order(self):
+        texts = load_document(self.pdf, 'pdf')
+        self.assertEqual(len(texts), 10)
+        self.assertTrue(all(text.startswith(f"{n + 1}.1 ") for n, text in enumerate(texts)))
+
+    def test_process_pool_keeps_document_order(self):
+        with mock.patch.dict("config.DOCUMENT_CONFIG", {"parallel_min_pages": 1, "pages_per_task": 3}), \
+             mock.patch.dict("config.PROCESS_POOL_CONFIG", {"workers": 2}), \
+             mock.patch.object(ProcessPoolExecutor, "submit", autospec=True,
+                               side_effect=ProcessPoolExecutor.submit) as submit:
+            try:
+                ranges = list(iter_document_pages(self.pdf, 'pdf'))
+            finally:
+                shutdown_process_pool()
+        self.assertEqual(submit.call_count, 2)  # the document is sent once per worker
+        self.assertEqual([len(texts) for texts in ranges], [3, 3, 3, 1])
+        self.assertEqual(sum(ranges, []), load_document(self.pdf, 'pdf'))
+
+    def test_page_and_size_caps(self):
+        self.assertEqual(sum(len(texts) for texts in iter_document_pages(self.pdf, 'pdf', max_pages=4)), 4)
+        with mock.patch.dict("config.DOCUMENT_CONFIG", {"max_size_mb": 0}):
+            result = set_document_content(FetchResult(f"{SITE}/report.pdf"), self.pdf, 'pdf')
+        self.assertFalse(result.ok)
+        self.assertIn("limit", result.error)
+
+    def test_crawl_streams_page_ranges(self):
+        def fetch(url, *args, **kwargs):
+            result = FetchResult(url)
+            if url.endswith(".pdf"):
+                result.set_content(self.pdf, 'pdf')
+            else:
+                result.set_content(f'<html><body><p>Home</p><a href="{SITE}/report.pdf">Report</a></body></html>', 'html')
+            return result
+
+        engine = CrawlEngine({}, max_pages=10, max_depth=3, concurrency=2, allow_selenium=False,
+                             use_sitemaps=False, respect_robots=False)
+        with mock.patch("app.crawler.fetch_page", side_effect=fetch), \
+             mock.patch.dict("config.DOCUMENT_CONFIG", {"pages_per_task": 4}):
+            result = engine.crawl([f"{SITE}/home"], exclude=[SITE])
+        parts = [page for page in result.pages if page["type"] == 'pdf']
+        self.assertEqual([part["pages"] for part in parts], [[1, 4], [5, 8], [9, 10]])
+        self.assertTrue(all(part["url"] == f"{SITE}/report.pdf" for part in parts))
+
+if __name__ == "__main__":
+    unittest.main()
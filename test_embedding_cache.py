@@ -0,0 +1,72 @@
+"""
+Test script for the persistent embedding cache.
+"""
+
+import shutil
+import tempfile
+import unittest
+from app.embedding_cache import CachedEmbeddings, EmbeddingCache, text_key
+
+class CountingEmbeddings:
+    def __init__(self, dim=4):
+        self.dim = dim
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(text))] + [0.5] * (self.dim - 1) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Test cases for reusing, persisting and evicting cached vectors."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def test_only_missing_texts_are_embedded(self):
+        model = CountingEmbeddings()
+        embeddings = CachedEmbeddings(model, "model-a", cache=EmbeddingCache(self.cache_dir))
+        first = embeddings.embed_documents(["menu", "page one", "menu"])
+        self.assertEqual(model.texts, ["menu", "page one"])
+
+        second = embeddings.embed_documents(["page one", "page two", "menu"])
+        self.assertEqual(model.texts, ["menu", "page one", "page two"])
+        self.assertEqual(second[0], first[1])
+        self.assertEqual(second[2], first[0])
+        stats = embeddings.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 3))
+
+    def test_vectors_survive_a_restart_and_are_per_model(self):
+        CachedEmbeddings(CountingEmbeddings(), "model-a", cache=EmbeddingCache(self.cache_dir)).embed_documents(["text"])
+
+        model = CountingEmbeddings()
+        cache = EmbeddingCache(self.cache_dir)
+        vectors = CachedEmbeddings(model, "model-a", cache=cache).embed_documents(["text"])
+        self.assertEqual(model.texts, [])
+        self.assertEqual(vectors, [[4.0, 0.5, 0.5, 0.5]])
+
+        CachedEmbeddings(model, "model-b", cache=cache).embed_documents(["text"])
+        self.assertEqual(model.texts, ["text"])
+
+    def test_least_recently_used_vectors_are_evicted(self):
+        # A cache this small holds the minimum of 1024 vectors
+        cache = EmbeddingCache(self.cache_dir, max_size_mb=0.05)
+        embeddings = CachedEmbeddings(CountingEmbeddings(dim=8), "model-a", cache=cache)
+        embeddings.embed_documents([f"old {n}" for n in range(1000)])
+        embeddings.embed_documents(["old 999"])
+        embeddings.embed_documents([f"new {n}" for n in range(100)])
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["evictions"], 102)
+        self.assertEqual(stats["entries"], 1100 - 102)
+        # The recently used vector and all new ones are kept, older ones made room
+        cached = cache.lookup("model-a", [text_key(f"old {n}") for n in range(1000)])
+        self.assertIsNotNone(cached[999])
+        self.assertEqual(sum(vector is None for vector in cached), 102)
+        self.assertNotIn(None, cache.lookup("model-a", [text_key(f"new {n}") for n in range(100)]))
+
+if __name__ == "__main__":
+    unittest.main()
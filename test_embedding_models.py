@@ -0,0 +1,120 @@
+"""
+Test script for the process-wide embedding model registry and bulk indexing.
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+from langchain.schema import Document
+from app.embedding_models import BatchedEmbeddings, EmbeddingModelRegistry
+from app.vector_store import VectorStoreManager
+
+class FakeModel:
+    def __init__(self, name):
+        self.model_name = name
+        self.queries = 0
+
+    def embed_query(self, text):
+        self.queries += 1
+        return [0.0]
+
+class TestEmbeddingModelRegistry(unittest.TestCase):
+    """Test cases for loading models once and reporting load metrics."""
+
+    def test_concurrent_callers_share_one_load(self):
+        loads = []
+
+        def loader(model_name, device):
+            loads.append(model_name)
+            time.sleep(0.05)
+            return FakeModel(model_name)
+
+        registry = EmbeddingModelRegistry(loader=loader)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("model-a"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(loads, ["model-a"])
+        self.assertTrue(all(model is results[0] for model in results))
+        stats = registry.get_stats()["model-a"]
+        self.assertEqual(stats["requests"], 8)
+        self.assertGreaterEqual(stats["load_seconds"], 0.05)
+
+    def test_fallback_model_and_warm_up(self):
+        def loader(model_name, device):
+            if model_name == "broken":
+                raise OSError("weights not found")
+            return FakeModel(model_name)
+
+        registry = EmbeddingModelRegistry(loader=loader)
+        with mock.patch.dict("config.EMBEDDING_MODEL_CONFIG", {"fallback_model": "backup"}):
+            self.assertTrue(registry.warm_up("broken"))
+            model = registry.get("broken")
+        self.assertEqual(model.model_name, "backup")
+        self.assertEqual(model.queries, 1)
+        stats = registry.get_stats()
+        self.assertEqual(stats["broken"]["loaded_model"], "backup")
+        self.assertIsNotNone(stats["broken"]["warmup_seconds"])
+
+class FakeVectors(list):
+    def tolist(self):
+        return list(self)
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(("encode", batch_size, list(texts)))
+        return FakeVectors([float(len(text))] for text in texts)
+
+    def encode_multi_process(self, texts, pool, batch_size=32):
+        self.calls.append(("pool", batch_size, list(texts)))
+        return FakeVectors([float(len(text))] for text in texts)
+
+class FakeCollection:
+    def __init__(self):
+        self.upserts = []
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.upserts.append((ids, embeddings, documents))
+
+class FakeStore:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self._collection = FakeCollection()
+
+class TestBulkIndexing(unittest.TestCase):
+    """Test cases for batched encoding and bulk upserts."""
+
+    def test_batched_embeddings_use_batch_size_and_pool(self):
+        model = FakeModel("model-a")
+        model.client = FakeClient()
+        self.assertEqual(BatchedEmbeddings(model, 16).embed_documents(["a\nb"]), [[3.0]])
+        BatchedEmbeddings(model, 8, pool=object()).embed_documents(["abc"])
+        self.assertEqual(model.client.calls, [("encode", 16, ["a b"]), ("pool", 8, ["abc"])])
+
+    def test_bulk_index_sorts_by_length_and_upserts_in_batches(self):
+        model = FakeModel("model-a")
+        model.client = FakeClient()
+        store = FakeStore(BatchedEmbeddings(model, 4))
+        documents = [Document(page_content="x" * length, metadata={"n": length}) for length in (3, 9, 1, 7, 5)]
+        progress = []
+        with mock.patch.dict("config.BULK_INDEX_CONFIG", {"upsert_batch_size": 2}):
+            stats = VectorStoreManager().bulk_index(store, documents, [f"id{i}" for i in range(5)],
+                                                    progress_callback=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual(stats["chunks"], 5)
+        self.assertEqual(stats["batches"], 3)
+        self.assertEqual([ids for ids, _, _ in store._collection.upserts], [["id1", "id3"], ["id4", "id0"], ["id2"]])
+        # Every chunk is stored with its own vector
+        self.assertEqual(store._collection.upserts[0][1], [[9.0], [7.0]])
+        self.assertEqual(progress, [(2, 5), (4, 5), (5, 5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
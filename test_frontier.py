@@ -0,0 +1,59 @@
+"""
+Test script for the crawl frontier used by the website crawler.
+"""
+
+import unittest
+from app.frontier import CrawlFrontier, canonical_key
+
+class TestCrawlFrontier(unittest.TestCase):
+    """Test cases for frontier ordering and duplicate detection."""
+
+    def test_canonical_key_ignores_scheme_query_and_trailing_slash(self):
+        """Variants of the same page share one key."""
+        key = canonical_key("https://Example.com/about/")
+        self.assertEqual(key, canonical_key("http://example.com/about"))
+        self.assertEqual(key, canonical_key("https://example.com/about?ref=nav#team"))
+        self.assertNotEqual(key, canonical_key("https://example.com/contact"))
+
+    def test_duplicates_are_rejected(self):
+        """A page is only queued once, even after it was popped."""
+        frontier = CrawlFrontier()
+        self.assertTrue(frontier.add("https://example.com/a", 0))
+        self.assertFalse(frontier.add("https://example.com/a/", 0))
+        frontier.pop()
+        self.assertEqual(frontier.add_many(["https://example.com/a", "https://example.com/b"], 1),
+                         ["https://example.com/b"])
+        self.assertIn("https://example.com/a?x=1", frontier)
+        self.assertEqual(frontier.seen_count, 2)
+
+    def test_shallowest_depth_first(self):
+        """Deeper links are only returned once shallower levels are empty."""
+        frontier = CrawlFrontier()
+        frontier.add("https://example.com/deep", 2)
+        frontier.add("https://example.com/one", 1)
+        frontier.add("https://example.com/zero", 0)
+        self.assertEqual(len(frontier), 3)
+        self.assertEqual(frontier.pop(), ("https://example.com/zero", 0))
+        self.assertEqual(frontier.pop(), ("https://example.com/one", 1))
+        self.assertEqual(frontier.pop(), ("https://example.com/deep", 2))
+        self.assertIsNone(frontier.pop())
+
+    def test_priority_links_first_within_batch(self):
+        """Links matching a priority term are queued ahead of the rest."""
+        frontier = CrawlFrontier(priority_terms=['faq'])
+        frontier.add_many(["https://example.com/news", "https://example.com/FAQ"], 0)
+        self.assertEqual(frontier.pop()[0], "https://example.com/FAQ")
+
+    def test_link_filter_and_mark_seen(self):
+        """Filtered links and already processed pages are never queued."""
+        frontier = CrawlFrontier()
+        frontier.mark_seen("https://example.com/")
+        added = frontier.add_many(
+            ["https://example.com", "https://example.com/blog", "https://example.com/shop"], 0,
+            link_filter=lambda url: "blog" in url
+        )
+        self.assertEqual(added, ["https://example.com/blog"])
+        self.assertEqual(frontier.pending_at(0), 1)
+
+if __name__ == "__main__":
+    unittest.main()
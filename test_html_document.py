@@ -0,0 +1,76 @@
+"""
+Test script for the shared parsed HTML document.
+"""
+
+import unittest
+from unittest import mock
+from app.crawler import CrawlEngine
+from app.html_document import ParsedPage, parse_html
+from app.process_pool import shutdown_process_pool
+from app.scraper import extract_text, extract_links, extract_page, FetchResult
+from app.website_categorizer import WebsiteCategorizer
+
+PAGE = """<html><head><title>Union Bank</title><meta name="description" content="Savings and Loans">
+<style>body { color: red; }</style></head>
+<body><nav class="menu"><a href="/accounts">Accounts</a> <a href="#top">Top</a></nav>
+<div><h1>Welcome</h1><p>Open a  savings
+account today.</p><script>var x = "hidden";</script><!-- comment --></div>
+<form action="/login"></form><a href="https://other.example.org/">Elsewhere</a>
+</body></html>"""
+
+class TestParsedPage(unittest.TestCase):
+    """Test cases for sharing one parse between consumers."""
+
+    def test_consumers_share_one_unmodified_tree(self):
+        """Text, links and categorization read the same tree without changing it."""
+        page = ParsedPage(PAGE, url="https://bank.example.com/")
+        html_before = str(page.soup)
+
+        self.assertEqual(extract_text(page), "Accounts Top Welcome Open a savings account today. Elsewhere")
+        self.assertEqual(sorted(extract_links(page, "https://bank.example.com/")), [
+            "https://bank.example.com/", "https://bank.example.com/accounts", "https://bank.example.com/login"
+        ])
+        categories = WebsiteCategorizer().analyze_content(page)
+        self.assertEqual(categories["meta_information"]["title"], "union bank")
+        self.assertEqual(categories["meta_information"]["description"], "savings and loans")
+
+        self.assertEqual(str(page.soup), html_before)
+        self.assertIs(parse_html(page), page)
+
+    def test_bytes_and_strings_give_the_same_text(self):
+        self.assertEqual(extract_text(PAGE.encode("utf-8")), extract_text(PAGE))
+        self.assertEqual(extract_text("<p>caf\xe9</p>".encode("latin-1")), "caf\xe9")
+
+class TestExtractPage(unittest.TestCase):
+    """Test cases for extracting pages in worker processes."""
+
+    def test_extract_page_matches_the_single_extractors(self):
+        blocks, links = extract_page(PAGE, "https://bank.example.com/")
+        self.assertEqual(" ".join(blocks), extract_text(PAGE))
+        self.assertEqual(sorted(links), sorted(extract_links(PAGE, "https://bank.example.com/")))
+
+    def test_crawl_extracts_on_the_process_pool(self):
+        site = "https://bank.example.com"
+
+        def fetch(url, *args, **kwargs):
+            page_id = int(url.rsplit("/", 1)[-1])
+            links = "".join(f'<a href="/page/{n}">Page {n}</a>' for n in (page_id + 1, page_id + 2) if n < 10)
+            result = FetchResult(url)
+            result.set_content(f"<html><body><p>Content of page {page_id}</p>{links}</body></html>", "html")
+            return result
+
+        engine = CrawlEngine({}, max_pages=20, max_depth=20, concurrency=4, allow_selenium=False,
+                             use_sitemaps=False, respect_robots=False)
+        with mock.patch("app.crawler.fetch_page", side_effect=fetch), \
+             mock.patch.dict("config.PROCESS_POOL_CONFIG", {"workers": 2}):
+            try:
+                result = engine.crawl([f"{site}/page/1"], exclude=[site])
+            finally:
+                shutdown_process_pool()
+        self.assertEqual(sorted(page["url"] for page in result.pages),
+                         sorted(f"{site}/page/{n}" for n in range(1, 10)))
+        page = next(page for page in result.pages if page["url"].endswith("/page/3"))
+        self.assertEqual(page["blocks"], ["Content of page 3", "Page 4 Page 5"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Test script for the scraper's on-disk HTTP cache.
+"""
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app.http_cache import HttpCache
+
+class FakeResponse:
+    """Minimal requests.Response replacement."""
+
+    def __init__(self, status_code=200, content=b"", headers=None, url="https://example.com/"):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = url
+        self.encoding = "utf-8"
+
+class TestHttpCache(unittest.TestCase):
+    """Test cases for conditional revalidation and eviction."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_not_modified_is_served_from_cache(self):
+        """A 304 answer returns the stored body and counts a hit."""
+        cache = HttpCache(cache_dir=self.cache_dir, max_size_mb=1)
+        url = "https://example.com/page"
+        fresh = FakeResponse(content=b"<html>hello</html>", headers={"ETag": '"v1"', "content-type": "text/html"}, url=url)
+
+        with mock.patch("app.http_cache.requests.get", return_value=fresh) as get:
+            cache.get(url, {"headers": {}})
+            self.assertNotIn("If-None-Match", get.call_args.kwargs["headers"])
+
+        with mock.patch("app.http_cache.requests.get", return_value=FakeResponse(status_code=304)) as get:
+            response = cache.get(url, {"headers": {}})
+            self.assertEqual(get.call_args.kwargs["headers"]["If-None-Match"], '"v1"')
+
+        self.assertEqual(response.content, b"<html>hello</html>")
+        self.assertEqual(response.headers["content-type"], "text/html")
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["bytes_saved"], len(b"<html>hello</html>"))
+
+    def test_responses_without_validators_are_not_stored(self):
+        cache = HttpCache(cache_dir=self.cache_dir, max_size_mb=1)
+        self.assertFalse(cache.store("https://example.com/", FakeResponse(content=b"x")))
+        self.assertIsNone(cache.load("https://example.com/"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        """The total body size stays under the limit, recently used entries survive."""
+        cache = HttpCache(cache_dir=self.cache_dir, max_size_mb=0.001)  # ~1KB
+        body = b"x" * 400
+        for name in ["a", "b"]:
+            cache.store(f"https://example.com/{name}", FakeResponse(content=body, headers={"ETag": name}))
+        cache.load("https://example.com/a")
+        cache.store("https://example.com/c", FakeResponse(content=body, headers={"ETag": "c"}))
+
+        self.assertIsNotNone(cache.load("https://example.com/a"))
+        self.assertIsNone(cache.load("https://example.com/b"))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+        # The index is rebuilt from disk by a new process
+        self.assertEqual(HttpCache(cache_dir=self.cache_dir, max_size_mb=1).get_stats()["entries"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Test script for the streaming website ingest pipeline.
+"""
+
+import unittest
+from app.dedup import NearDuplicateFilter
+from app.ingest_pipeline import IngestPipeline
+from app.vector_store import VectorStoreManager, page_hash
+
+class FakeEmbeddings:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batch_sizes = []
+
+    def embed_documents(self, texts):
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        self.batch_sizes.append(len(texts))
+        return [[float(len(text))] for text in texts]
+
+class FakeCollection:
+    def __init__(self):
+        self.rows = {}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        for chunk_id, metadata in zip(ids, metadatas):
+            self.rows[chunk_id] = metadata
+
+    def get(self, include=None):
+        return {"ids": list(self.rows), "metadatas": list(self.rows.values())}
+
+class FakeVectorStore:
+    """Stands in for the langchain Chroma wrapper."""
+
+    def __init__(self, embeddings=None):
+        self.embeddings = embeddings or FakeEmbeddings()
+        self._collection = FakeCollection()
+        self.persisted = False
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            self._collection.rows.pop(chunk_id, None)
+
+    def persist(self):
+        self.persisted = True
+
+class TestIngestPipeline(unittest.TestCase):
+    """Test cases for streaming chunking, embedding and upserts."""
+
+    def test_pages_are_synced_with_the_stored_collection(self):
+        """New pages are embedded in batches, unchanged ones skipped, changed and removed ones replaced."""
+        store = FakeVectorStore()
+        store._collection.rows = {"old-1": {}, "gone-1": {}, "same-1": {}}
+        stored_pages = {
+            "https://example.com/changed": {"hash": "outdated", "ids": ["old-1"]},
+            "https://example.com/removed": {"hash": "whatever", "ids": ["gone-1"]},
+            "https://example.com/same": {"hash": page_hash("Same text"), "ids": ["same-1"]},
+        }
+        pipeline = IngestPipeline(store, stored_pages, "Website", "website_test",
+                                  page_queue_size=2, batch_size=4, chunk_size=100, chunk_overlap=0).start()
+        for i in range(5):
+            pipeline.submit({"url": f"https://example.com/{i}", "content": "word " * 40})
+        pipeline.submit({"url": "https://example.com/changed", "content": "New text"})
+        pipeline.submit({"url": "https://example.com/same", "content": "Same text"})
+        pipeline.submit({"url": "https://example.com/empty", "content": "  "})
+        stats = pipeline.finish()
+
+        self.assertEqual((stats["pages_received"], stats["pages_added"], stats["pages_changed"],
+                          stats["pages_unchanged"], stats["pages_removed"], stats["pages_empty"]), (8, 5, 1, 1, 1, 1))
+        self.assertEqual(stats["chunks_embedded"], 11)  # two chunks per new page plus the changed page
+        self.assertEqual(stats["chunks_deleted"], 2)
+        self.assertTrue(all(size <= 4 for size in store.embeddings.batch_sizes))
+        self.assertNotIn("old-1", store._collection.rows)
+        self.assertNotIn("gone-1", store._collection.rows)
+        self.assertIn("same-1", store._collection.rows)
+        self.assertEqual(len(store._collection.rows), 12)
+        self.assertTrue(store.persisted)
+        self.assertEqual(stats["stages"]["upsert"]["items"], 11)
+
+    def test_unchanged_pdf_page_ranges_are_kept(self):
+        """Every page range of a PDF is compared on its own, an identical re-crawl changes nothing."""
+        ranges = [{"url": "https://example.com/report.pdf", "content": f"Pages {first} to {first + 15}",
+                   "type": "pdf", "pages": [first, first + 15]} for first in (1, 17)]
+        store = FakeVectorStore()
+        stored_pages = {}
+        for crawl in range(2):
+            pipeline = IngestPipeline(store, stored_pages, "Website", "website_test", batch_size=4).start()
+            for page in ranges:
+                pipeline.submit(dict(page))
+            stats = pipeline.finish()
+            stored_pages = VectorStoreManager._stored_pages(store)
+
+        self.assertEqual(sorted(stored_pages), ["https://example.com/report.pdf#pages=1-16",
+                                                "https://example.com/report.pdf#pages=17-32"])
+        self.assertEqual((stats["pages_unchanged"], stats["pages_changed"], stats["chunks_deleted"],
+                          stats["chunks_embedded"]), (2, 0, 0, 0))
+        self.assertEqual(len(store._collection.rows), 2)
+
+    def test_near_duplicates_are_resolved_the_same_in_any_order(self):
+        """The shortest URL of near-duplicate pages is indexed; re-crawls in another order change nothing."""
+        article = " ".join(f"Section {i} explains how our savings accounts and home loans work." for i in range(40))
+        pages = {
+            "https://example.com/article?print=1": "Print this page. " + article,
+            "https://example.com/fr/article": article,
+            "https://example.com/article": article,
+            "https://example.com/contact": "Call us on 555-0100 or visit any branch.",
+        }
+        store = FakeVectorStore()
+        stored_pages = {}
+
+        def crawl(urls):
+            pipeline = IngestPipeline(store, stored_pages, "Website", "website_test", batch_size=4,
+                                      dedup=NearDuplicateFilter(similarity_threshold=0.95)).start()
+            for url in urls:
+                pipeline.submit({"url": url, "content": pages[url]})
+            return pipeline.finish(), VectorStoreManager._stored_pages(store)
+
+        stats, stored_pages = crawl(list(pages))  # the kept page is the last to arrive
+        self.assertEqual(sorted(stored_pages), ["https://example.com/article", "https://example.com/contact"])
+        self.assertEqual(stats["pages_duplicate"], 2)
+        self.assertEqual(len(store._collection.rows), sum(len(page["ids"]) for page in stored_pages.values()))
+
+        for urls in (list(reversed(pages)), list(pages)):
+            stats, recrawled = crawl(urls)
+            self.assertEqual(recrawled, stored_pages)
+            self.assertEqual((stats["chunks_embedded"], stats["chunks_deleted"], stats["pages_duplicate"]), (0, 0, 2))
+
+        # Pages held back for a stored page that is gone are indexed in its place
+        stats, stored_pages = crawl(["https://example.com/article?print=1", "https://example.com/fr/article",
+                                     "https://example.com/contact"])
+        self.assertEqual(sorted(stored_pages), ["https://example.com/contact", "https://example.com/fr/article"])
+        self.assertEqual((stats["pages_added"], stats["pages_removed"], stats["pages_duplicate"]), (1, 1, 1))
+
+    def test_embedding_failure_does_not_block_the_crawl(self):
+        """A failing stage drains its input so submit never deadlocks."""
+        pipeline = IngestPipeline(FakeVectorStore(FakeEmbeddings(fail=True)), {}, "Website", "website_test",
+                                  page_queue_size=1, chunk_queue_size=1, batch_size=1).start()
+        for i in range(20):
+            pipeline.submit({"url": f"https://example.com/{i}", "content": f"Page {i}"})
+        stats = pipeline.finish()
+        self.assertTrue(pipeline.failed)
+        self.assertIn("model unavailable", stats["error"])
+        self.assertEqual(stats["chunks_embedded"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Test script for the background job manager.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from app.jobs import JobManager, COMPLETED, FAILED, ABORTED, INTERRUPTED, FINAL_STATES
+
+class TestJobManager(unittest.TestCase):
+    """Test cases for job execution, progress, abort and persistence."""
+
+    def setUp(self):
+        self.jobs_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.jobs_dir)
+        self.manager = JobManager(jobs_dir=self.jobs_dir, max_workers=1, persist_interval=0)
+        self.addCleanup(self.manager.shutdown, True)
+
+    def wait_for(self, job_id):
+        for _ in range(500):
+            job = self.manager.get(job_id)
+            if job["state"] in FINAL_STATES:
+                return job
+            time.sleep(0.01)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_job_reports_progress_and_result(self):
+        def runner(report_progress, should_abort):
+            report_progress(pages_done=5, pages_total=20, chunks_embedded=12)
+            return True, {"pages_processed": 20}
+
+        job = self.manager.submit("website", "https://example.com", runner, owner="user-1")
+        finished = self.wait_for(job["id"])
+
+        self.assertEqual(finished["state"], COMPLETED)
+        self.assertEqual(finished["result"], {"pages_processed": 20})
+        self.assertEqual((finished["pages_done"], finished["pages_total"], finished["chunks_embedded"]), (5, 20, 12))
+        with open(os.path.join(self.jobs_dir, f"{job['id']}.json")) as f:
+            self.assertEqual(json.load(f)["state"], COMPLETED)
+
+    def test_errors_are_recorded(self):
+        failing = self.manager.submit("website", "https://a.example", lambda progress, abort: (False, "No content"))
+        crashing = self.manager.submit("website", "https://b.example", lambda progress, abort: 1 / 0)
+        self.assertEqual(self.wait_for(failing["id"])["error"], "No content")
+        self.assertEqual(self.wait_for(crashing["id"])["state"], FAILED)
+
+    def test_abort_running_and_queued_jobs(self):
+        started = threading.Event()
+
+        def runner(report_progress, should_abort):
+            started.set()
+            while not should_abort():
+                time.sleep(0.01)
+            return False, "Processing aborted by user."
+
+        running = self.manager.submit("website", "https://a.example", runner, owner="user-1")
+        queued = self.manager.submit("website", "https://b.example", runner, owner="user-1")
+        started.wait(5)
+
+        self.assertTrue(self.manager.abort(queued["id"]))
+        self.assertEqual(self.manager.get(queued["id"])["state"], ABORTED)
+        self.assertTrue(self.manager.abort(running["id"]))
+        self.assertEqual(self.wait_for(running["id"])["state"], ABORTED)
+        self.assertFalse(self.manager.abort(running["id"]))
+
+    def test_followers_get_coalesced_updates(self):
+        """A follower that falls behind receives the latest status, not every update."""
+        release = threading.Event()
+
+        def runner(report_progress, should_abort):
+            release.wait(5)
+            for page in range(1, 101):
+                report_progress(pages_done=page, pages_total=100, page={"url": f"https://example.com/{page}"})
+            return True, "done"
+
+        job = self.manager.submit("website", "https://example.com", runner)
+        events = self.manager.follow(job["id"], heartbeat=0.01)
+        first = next(events)
+        while first is None or first["state"] != "running":
+            first = next(events)
+        release.set()
+        updates = [update for update in events if update is not None]
+
+        self.assertLess(len(updates), 100)
+        self.assertEqual(updates[-1]["state"], COMPLETED)
+        self.assertEqual(updates[-1]["last_page"], {"url": "https://example.com/100"})
+        self.assertEqual(len(updates) + sum(update["coalesced"] for update in updates), 101)
+
+    def test_unfinished_jobs_are_interrupted_after_restart(self):
+        release = threading.Event()
+        job = self.manager.submit("website", "https://example.com", lambda progress, abort: (release.wait(5), "done"))
+
+        restarted = JobManager(jobs_dir=self.jobs_dir, max_workers=1)
+        self.addCleanup(restarted.shutdown, True)
+        self.assertEqual(restarted.get(job["id"])["state"], INTERRUPTED)
+        release.set()
+
+    def test_expired_jobs_are_deleted_when_a_job_finishes(self):
+        old = self.manager.submit("website", "https://old.example", lambda progress, abort: (True, "done"))
+        self.wait_for(old["id"])
+        with self.manager._lock:
+            self.manager._jobs[old["id"]]["finished_at"] -= self.manager.retention_seconds + 1
+
+        new = self.manager.submit("website", "https://new.example", lambda progress, abort: (True, "done"))
+        self.wait_for(new["id"])
+        self.assertIsNone(self.manager.get(old["id"]))
+        self.assertEqual(sorted(os.listdir(self.jobs_dir)), [f"{new['id']}.json"])
+
+    def test_zero_retention_is_not_replaced_by_the_default(self):
+        manager = JobManager(jobs_dir=self.jobs_dir, retention_hours=0)
+        self.addCleanup(manager.shutdown, True)
+        self.assertEqual(manager.retention_seconds, 0)
+
+if __name__ == "__main__":
+    unittest.main()
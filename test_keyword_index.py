@@ -0,0 +1,93 @@
+"""
+Test script for the BM25 keyword index and hybrid retrieval.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app import keyword_index
+from app.keyword_index import KeywordIndex, reciprocal_rank_fusion, tokenize
+from app.vector_store import VectorStoreManager
+
+CHUNKS = {
+    "c1": "Our support team answers questions about accounts and billing.",
+    "c2": "The XR-200 router supports mesh networking and parental controls.",
+    "c3": "Opening hours: the support desk is open from nine to five.",
+    "c4": "Shipping is free for orders above fifty euros."
+}
+
+class FakeCollection:
+    """Chroma collection returning a fixed similarity ranking"""
+
+    name = "website_test"
+
+    def __init__(self, vector_ranking):
+        self.vector_ranking = vector_ranking
+        self.get_calls = []
+
+    def query(self, query_embeddings, n_results, include):
+        ids = self.vector_ranking[:n_results]
+        return {"ids": [ids], "documents": [[CHUNKS[i] for i in ids]], "metadatas": [[{"chunk_id": i} for i in ids]]}
+
+    def get(self, ids=None, include=None):
+        self.get_calls.append(ids)
+        ids = list(CHUNKS) if ids is None else ids
+        return {"ids": ids, "documents": [CHUNKS[i] for i in ids], "metadatas": [{"chunk_id": i} for i in ids]}
+
+class FakeEmbeddings:
+    def embed_query(self, text):
+        return [0.0]
+
+class FakeStore:
+    def __init__(self, vector_ranking):
+        self._collection = FakeCollection(vector_ranking)
+        self.embeddings = FakeEmbeddings()
+
+class TestKeywordIndex(unittest.TestCase):
+    """Test cases for BM25 ranking, persistence and rank fusion."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_bm25_ranking_updates_and_persistence(self):
+        path = os.path.join(self.temp_dir, "index.json.gz")
+        index = KeywordIndex(path, k1=1.5, b=0.75)
+        index.add(list(CHUNKS), list(CHUNKS.values()))
+        self.assertEqual(tokenize("What is the XR-200?"), ["xr", "200"])
+        self.assertEqual(index.search("xr-200 router", 2)[0][0], "c2")
+        self.assertEqual([chunk_id for chunk_id, _ in index.search("support", 5)], ["c1", "c3"])  # shorter chunk first
+
+        index.add(["c2"], ["Shipping rates for the router."])
+        index.delete(["c4"])
+        self.assertEqual(index.search("xr", 5), [])
+        index.save()
+
+        reloaded = KeywordIndex(path)
+        self.assertTrue(reloaded.loaded)
+        self.assertEqual(len(reloaded), 3)
+        self.assertEqual(reloaded.search("shipping", 5), index.search("shipping", 5))
+
+    def test_reciprocal_rank_fusion(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], k=60)
+        self.assertEqual(fused[0], "c")  # in both rankings
+        self.assertEqual(set(fused), {"a", "b", "c", "d"})
+
+    def test_hybrid_search_adds_keyword_matches(self):
+        keyword_index._indexes.clear()
+        self.addCleanup(keyword_index._indexes.clear)
+        store = FakeStore(["c1", "c3", "c4"])  # the vector ranking misses the product code
+        with mock.patch.dict("config.HYBRID_SEARCH_CONFIG", {"index_dir": self.temp_dir, "fetch_k": 3}):
+            docs = VectorStoreManager().hybrid_search(store, "XR-200 specifications", k=3)
+
+        self.assertIn("c2", [doc.metadata["chunk_id"] for doc in docs])
+        # The index was built from the stored chunks, c2 was then fetched by id
+        self.assertEqual(store._collection.get_calls, [None, ["c2"]])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "website_test.json.gz")))
+
+if __name__ == "__main__":
+    unittest.main()
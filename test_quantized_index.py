@@ -0,0 +1,82 @@
+"""
+Test script for quantized vector storage.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from app import quantized_index
+from app.quantized_index import QuantizedVectorIndex, get_quantized_index
+
+def clustered_vectors(count, dim=64, clusters=8, seed=5):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(clusters, size=count)] + 0.4 * rng.normal(size=(count, dim))).astype(np.float32)
+
+class TestQuantizedVectorIndex(unittest.TestCase):
+    """Test cases for quantized search, updates and persistence."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.vectors = clustered_vectors(500)
+        self.ids = [f"c{i}" for i in range(len(self.vectors))]
+        normalized = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        self.queries = clustered_vectors(20, seed=9)
+        self.exact = [set(np.argsort(-(normalized @ query))[:10]) for query in self.queries]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def recall(self, index):
+        hits = 0
+        for query, expected in zip(self.queries, self.exact):
+            hits += len({int(chunk_id[1:]) for chunk_id, _ in index.search(query, 10)} & expected)
+        return hits / (10 * len(self.queries))
+
+    def test_quantized_recall(self):
+        for mode in ("float16", "int8"):
+            index = QuantizedVectorIndex(os.path.join(self.temp_dir, mode), mode=mode, rescore=False)
+            index.add(self.ids, self.vectors)
+            self.assertGreaterEqual(self.recall(index), 0.9, mode)
+            self.assertEqual(index.memory_bytes(), self.vectors.nbytes // (2 if mode == "float16" else 4)
+                             + (len(self.ids) * 4 if mode == "int8" else 0))
+
+    def test_updates_and_rescored_reload(self):
+        path = os.path.join(self.temp_dir, "index")
+        index = QuantizedVectorIndex(path, mode="int8", rescore=True)
+        index.add(self.ids, self.vectors)
+        index.add(["c0"], self.queries[:1])  # replaced vector
+        index.delete(["c1"])
+        self.assertEqual(len(index), 499)
+        self.assertEqual(index.search(self.queries[0], 1)[0][0], "c0")
+        self.assertAlmostEqual(index.search(self.queries[0], 1)[0][1], 1.0, places=5)  # float32 rescoring
+        index.save()
+
+        reloaded = QuantizedVectorIndex(path)
+        self.assertEqual((reloaded.mode, len(reloaded)), ("int8", 499))
+        self.assertNotIn("c1", [chunk_id for chunk_id, _ in reloaded.search(self.vectors[1], 5)])
+        self.assertEqual(reloaded.search(self.queries[3], 10), index.search(self.queries[3], 10))
+        self.assertEqual(self.recall(reloaded), self.recall(index))
+
+    def test_only_new_collections_are_quantized(self):
+        quantized_index._indexes.clear()
+        self.addCleanup(quantized_index._indexes.clear)
+        with mock.patch.dict("config.QUANTIZATION_CONFIG", {"index_dir": self.temp_dir, "mode": "none"}):
+            self.assertIsNone(get_quantized_index("website_a", create=True))
+        with mock.patch.dict("config.QUANTIZATION_CONFIG", {"index_dir": self.temp_dir, "mode": "float16"}):
+            self.assertIsNone(get_quantized_index("website_a"))
+            index = get_quantized_index("website_a", create=True)
+            index.add(["c0"], self.vectors[:1])
+            index.save()
+        quantized_index._indexes.clear()
+        # A saved index keeps being used after quantization is turned off
+        with mock.patch.dict("config.QUANTIZATION_CONFIG", {"index_dir": self.temp_dir, "mode": "none"}):
+            self.assertEqual(get_quantized_index("website_a").mode, "float16")
+            quantized_index.drop_quantized_index("website_a")
+            self.assertIsNone(get_quantized_index("website_a"))
+
+if __name__ == "__main__":
+    unittest.main()
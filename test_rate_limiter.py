@@ -0,0 +1,65 @@
+"""
+Test script for the adaptive per-host rate controller and crawl retries.
+"""
+
+import time
+import unittest
+from unittest import mock
+from email.utils import formatdate
+from app.crawler import CrawlEngine
+from app.rate_limiter import HostRateController, parse_retry_after
+from app.scraper import FetchResult
+
+SITE = "https://example.com"
+
+class TestHostRateController(unittest.TestCase):
+    """Test cases for Retry-After parsing and per-host back-off."""
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertAlmostEqual(parse_retry_after(formatdate(1000.0 + 30, usegmt=True), now=1000.0), 30.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_throttling_halves_limit_and_blocks_host(self):
+        controller = HostRateController(initial_per_host=8, max_per_host=8, adaptive=True)
+        self.assertEqual(controller.reserve("a.com"), 0.0)
+        controller.record("a.com", 0.05, 429, retry_after=0.5)
+        self.assertEqual(controller.limit("a.com"), 4)
+        self.assertGreater(controller.reserve("a.com"), 0.3)
+        # Other hosts are not affected
+        self.assertEqual(controller.reserve("b.com"), 0.0)
+        self.assertEqual(controller.limit("b.com"), 8)
+
+class TestCrawlRetries(unittest.TestCase):
+    """Test cases for retrying throttled pages without failing them."""
+
+    def test_throttled_pages_are_retried(self):
+        attempts = {}
+
+        def fetch(url, *args, **kwargs):
+            attempts[url] = attempts.get(url, 0) + 1
+            result = FetchResult(url)
+            if attempts[url] == 1 and url.endswith("/2"):
+                result.status_code, result.retry_after, result.retryable = 429, 0.2, True
+                result.error = "429 Client Error: Too Many Requests"
+                return result
+            page_id = int(url.rsplit("/", 1)[-1])
+            links = "".join(f'<a href="{SITE}/page/{n}">Page {n}</a>' for n in (page_id + 1,) if n < 5)
+            result.set_content(f"<html><body><p>Content of page {page_id}</p>{links}</body></html>", "html")
+            return result
+
+        engine = CrawlEngine({}, max_pages=10, max_depth=10, concurrency=2, allow_selenium=False,
+                             use_sitemaps=False, respect_robots=False,
+                             rate_controller=HostRateController(adaptive=True), max_retries=2)
+        started = time.time()
+        with mock.patch("app.crawler.fetch_page", side_effect=fetch):
+            result = engine.crawl([f"{SITE}/page/1"], exclude=[SITE])
+        self.assertEqual(sorted(page["url"] for page in result.pages),
+                         [f"{SITE}/page/{n}" for n in range(1, 5)])
+        self.assertEqual(result.retries, 1)
+        self.assertFalse(result.failed_urls)
+        self.assertGreaterEqual(time.time() - started, 0.2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Test script for single-pass page fetching: every page is rendered with Selenium at most once.
+"""
+
+import unittest
+from collections import Counter
+from unittest import mock
+from app.crawler import CrawlEngine
+from app.rate_limiter import HostRateController
+from app.scraper import fetch_page, render_fetch_result
+
+SITE = "https://example.com"
+PAGES = {
+    "/": ["/about", "/page/1"],
+    "/about": ["/page/2"],
+    "/page/1": [],
+    "/page/2": [],
+    "/from-script": []
+}
+
+class FakeResponse:
+    def __init__(self, url, body):
+        self.url = url
+        self.status_code = 200 if body is not None else 404
+        self.headers = {"content-type": "text/html; charset=utf-8"}
+        self.content = (body or "").encode("utf-8")
+        self.encoding = "utf-8"
+        self.text = body or ""
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code} Not Found")
+
+def fake_get(url, **kwargs):
+    """Small static pages (so the scraper considers rendering them), linking as in PAGES"""
+    path = url[len(SITE):] or "/"
+    if path not in PAGES:
+        return FakeResponse(url, None)
+    links = "".join(f'<a href="{SITE}{link}">{link}</a>' for link in PAGES[path])
+    return FakeResponse(url, f"<html><body><p>Static text of {path}</p>{links}</body></html>")
+
+class TestSinglePassFetch(unittest.TestCase):
+    """Test cases for fetch_page, render_fetch_result and the crawl's link discovery renders."""
+
+    def setUp(self):
+        self.renders = Counter()
+
+        def render(url, wait_time=10, pool=None):
+            self.renders[url] += 1
+            path = url[len(SITE):] or "/"
+            # The live DOM of the home page has a link that only a script adds
+            dom_links = [f"{SITE}{link}" for link in PAGES[path] + (["/from-script"] if path == "/" else [])]
+            anchors = "".join(f'<a href="{link}">{link}</a>' for link in dom_links)
+            html = f"<html><body><p>Rendered text of {path}. {'Content loaded by scripts. ' * 10}</p>{anchors}</body></html>"
+            return html, dom_links, url, 0.01
+
+        for patcher in (mock.patch("app.scraper.render_with_selenium", side_effect=render),
+                        mock.patch("app.scraper.requests.get", side_effect=fake_get),
+                        mock.patch.dict("config.HTTP_CACHE_CONFIG", {"enabled": False}),
+                        mock.patch.dict("config.PROCESS_POOL_CONFIG", {"workers": -1})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_fetch_renders_once(self):
+        result = fetch_page(f"{SITE}/", {}, use_selenium=True, rate_controller=HostRateController(adaptive=False))
+        self.assertTrue(result.rendered)
+        # Link discovery on an already rendered page reuses the render
+        render_fetch_result(result)
+        self.assertEqual(self.renders, Counter({f"{SITE}/": 1}))
+        self.assertIn(f"{SITE}/from-script", result.links)
+        self.assertIn(f"{SITE}/about", result.links)
+        self.assertIn("Rendered text", result.content)
+
+    def crawl(self, is_js_heavy):
+        engine = CrawlEngine({}, max_pages=20, max_depth=4, concurrency=2, is_js_heavy=is_js_heavy,
+                             use_sitemaps=False, respect_robots=False,
+                             rate_controller=HostRateController(adaptive=False))
+        return engine.crawl([f"{SITE}/"])
+
+    def test_crawl_renders_every_page_at_most_once(self):
+        for is_js_heavy in (True, False):
+            self.renders.clear()
+            result = self.crawl(is_js_heavy)
+            self.assertEqual(result.processed_urls, {f"{SITE}{path}" for path in PAGES})
+            # Pages with few links get a discovery render (js-heavy sites are rendered while fetching)
+            self.assertEqual(set(self.renders), result.processed_urls)
+            self.assertEqual(max(self.renders.values()), 1, is_js_heavy)
+
+if __name__ == "__main__":
+    unittest.main()
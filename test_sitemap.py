@@ -0,0 +1,71 @@
+"""
+Test script for robots.txt and sitemap URL discovery.
+"""
+
+import gzip
+import unittest
+from unittest import mock
+import config
+from app.sitemap import SiteDiscovery
+
+ROBOTS = b"""User-agent: *
+Disallow: /private/
+Sitemap: https://example.com/sitemap_index.xml
+"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/pages.xml.gz</loc></sitemap>
+</sitemapindex>"""
+
+PAGES = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/old</loc><lastmod>2021-03-01</lastmod></url>
+  <url><loc>https://example.com/undated</loc></url>
+  <url><loc>https://example.com/new</loc><lastmod>2024-05-01T10:00:00Z</lastmod></url>
+  <url><loc>https://example.com/private/report</loc><lastmod>2024-06-01</lastmod></url>
+  <url><loc>https://cdn.example.net/asset</loc></url>
+</urlset>"""
+
+class FakeResponse:
+    def __init__(self, status_code=200, content=b""):
+        self.status_code = status_code
+        self.content = content
+
+def fake_get(url, **kwargs):
+    bodies = {
+        "https://example.com/robots.txt": ROBOTS,
+        "https://example.com/sitemap_index.xml": SITEMAP_INDEX,
+        "https://example.com/pages.xml.gz": gzip.compress(PAGES),
+    }
+    if url in bodies:
+        return FakeResponse(content=bodies[url])
+    return FakeResponse(status_code=404)
+
+class TestSiteDiscovery(unittest.TestCase):
+    """Test cases for robots.txt rules and sitemap seeding."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(config.HTTP_CACHE_CONFIG, {"enabled": False})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sitemap_index_and_gzip_are_followed_newest_first(self):
+        """URLs come from nested gzipped sitemaps, sorted by lastmod, minus disallowed and foreign ones."""
+        with mock.patch("app.sitemap.requests.get", side_effect=fake_get):
+            site = SiteDiscovery("https://example.com/some/page")
+            robots = site.load_robots()
+            urls = site.sitemap_urls()
+
+        self.assertEqual(urls, ["https://example.com/new", "https://example.com/old", "https://example.com/undated"])
+        self.assertFalse(robots.can_fetch("https://example.com/private/report"))
+        self.assertTrue(robots.can_fetch("https://example.com/about"))
+
+    def test_missing_robots_allows_everything(self):
+        with mock.patch("app.sitemap.requests.get", return_value=FakeResponse(status_code=404)):
+            site = SiteDiscovery("https://example.com/")
+            self.assertTrue(site.load_robots().can_fetch("https://example.com/private/"))
+            self.assertEqual(site.sitemap_urls(), [])
+
+if __name__ == "__main__":
+    unittest.main()
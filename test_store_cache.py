@@ -0,0 +1,91 @@
+"""
+Test script for the vector store handle cache.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app.store_cache import VectorStoreCache
+
+class TestVectorStoreCache(unittest.TestCase):
+    """Test cases for reusing, evicting and preloading collection handles."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.access_log = os.path.join(self.temp_dir, "access.log")
+        self.loads = []
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def loader(self, collection_name):
+        self.loads.append(collection_name)
+        return None if collection_name == "missing" else {"name": collection_name}
+
+    def make_cache(self, **kwargs):
+        kwargs.setdefault("max_handles", 2)
+        kwargs.setdefault("max_memory_mb", 100)
+        return VectorStoreCache(self.loader, access_log=self.access_log, sizer=lambda store: 1024 * 1024, **kwargs)
+
+    def test_handles_are_reused_and_evicted_least_recently_used_first(self):
+        cache = self.make_cache()
+        first = cache.get("a")
+        self.assertIs(cache.get("a"), first)
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")  # evicts b, the least recently used
+
+        self.assertIsNone(cache.get("missing"))
+        cache.get("b")
+        self.assertEqual(self.loads, ["a", "b", "c", "missing", "b"])
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 5, 2))
+        self.assertEqual(stats["handles"], 2)
+
+    def test_memory_budget_and_invalidation(self):
+        cache = self.make_cache(max_handles=10, max_memory_mb=2)
+        for name in ("a", "b", "c"):
+            cache.get(name)
+        self.assertEqual(cache.get_stats()["memory_mb"], 2.0)
+
+        replacement = {"name": "c", "rebuilt": True}
+        cache.put("c", replacement)
+        self.assertIs(cache.get("c"), replacement)
+        cache.invalidate("c")
+        self.assertEqual(cache.get("c"), {"name": "c"})
+        self.assertEqual(self.loads, ["a", "b", "c", "c"])
+
+    def test_preload_most_used_recent_collections(self):
+        old = time.time() - 30 * 86400
+        with open(self.access_log, "w") as f:
+            f.write(f"{old:.0f}\told\n" * 5)
+        cache = self.make_cache()
+        for name in ("a", "b", "b", "c", "c", "c"):
+            cache.get(name)
+        cache.flush_accesses()
+
+        fresh = self.make_cache()
+        self.assertEqual(fresh.preload(count=2, window_days=7), ["c", "b"])
+        with open(self.access_log) as f:
+            self.assertNotIn("old", f.read())
+        fresh.get("c")
+        self.assertEqual(fresh.get_stats()["hits"], 1)
+
+    def test_accesses_are_buffered(self):
+        cache = self.make_cache(flush_seconds=60)
+        for _ in range(100):
+            cache.get("a")
+        cache.get("b")
+        self.assertFalse(os.path.exists(self.access_log))
+
+        cache.flush_accesses()
+        with open(self.access_log) as f:
+            self.assertEqual([line.split("\t")[1:] for line in f], [["a", "100\n"], ["b", "1\n"]])
+        # Counts still buffered when the log is read are included
+        cache.get("b")
+        self.assertEqual(cache._recent_accesses(window_days=1), {"a": 100, "b": 2})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Test script for incremental re-indexing of website collections.
+"""
+
+import unittest
+from unittest import mock
+from langchain.schema import Document
+from app.vector_store import VectorStoreManager, page_hash, page_source_key
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+class FakeCollection:
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows  # chunk id -> (text, metadata)
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, include=None):
+        return {"ids": list(self.rows), "documents": [text for text, _ in self.rows.values()],
+                "metadatas": [meta for _, meta in self.rows.values()]}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        for chunk_id, text, meta in zip(ids, documents, metadatas):
+            self.rows[chunk_id] = (text, dict(meta))
+
+class FakeChroma:
+    """Stands in for the langchain Chroma wrapper; collections outlive their handles like on disk."""
+
+    collections = {}
+
+    def __init__(self, persist_directory=None, embedding_function=None, collection_name=None,
+                 collection_metadata=None):
+        self.embeddings = embedding_function
+        self._collection = FakeCollection(collection_name, self.collections.setdefault(collection_name, {}))
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            self._collection.rows.pop(chunk_id, None)
+
+    def delete_collection(self):
+        self.collections.pop(self._collection.name, None)
+
+    def persist(self):
+        pass
+
+def crawl(pages):
+    """Chunked documents of a crawl, one chunk per page, as DynamicChatbot builds them"""
+    return [Document(page_content=page["content"],
+                     metadata={"source_url": page_source_key(page), "page_hash": page_hash(page["content"]),
+                               "chunk_index": 0})
+            for page in pages]
+
+class TestIncrementalIndexing(unittest.TestCase):
+    """Test cases for syncing a collection with a new crawl of its website."""
+
+    def setUp(self):
+        FakeChroma.collections = {}
+        self.embeddings = FakeEmbeddings()
+        for patcher in (mock.patch("app.vector_store.Chroma", FakeChroma),
+                        mock.patch("app.vector_store.get_store_cache"),
+                        mock.patch.object(VectorStoreManager, "get_embeddings", return_value=self.embeddings),
+                        mock.patch.dict("config.HYBRID_SEARCH_CONFIG", {"keyword_index": False}),
+                        mock.patch.dict("config.QUANTIZATION_CONFIG", {"mode": "none"}),
+                        mock.patch.dict("config.STORE_CACHE_CONFIG", {"enabled": False})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.manager = VectorStoreManager()
+
+    def update(self, pages):
+        self.embeddings.texts = []
+        _, stats = self.manager.update_vector_store(crawl(pages), "Website", "website_test")
+        return stats
+
+    def stored_texts(self):
+        return sorted(text for text, _ in FakeChroma.collections["website_test"].values())
+
+    def test_only_changed_pages_are_embedded(self):
+        site = "https://example.com"
+        stats = self.update([{"url": f"{site}/{name}", "content": f"{name} v1"} for name in ("same", "changed", "gone")])
+        self.assertEqual((stats["full_rebuild"], stats["pages_added"], stats["chunks_embedded"]), (1, 3, 3))
+
+        stats = self.update([{"url": f"{site}/same", "content": "same v1"},
+                             {"url": f"{site}/changed", "content": "changed v2"},
+                             {"url": f"{site}/new", "content": "new v1"}])
+        self.assertEqual((stats["pages_unchanged"], stats["pages_changed"], stats["pages_added"],
+                          stats["pages_removed"], stats["full_rebuild"]), (1, 1, 1, 1, 0))
+        self.assertEqual((stats["chunks_embedded"], stats["chunks_deleted"]), (2, 2))
+        self.assertEqual(sorted(self.embeddings.texts), ["changed v2", "new v1"])
+        self.assertEqual(self.stored_texts(), ["changed v2", "new v1", "same v1"])
+
+    def test_collection_without_page_hashes_is_rebuilt(self):
+        FakeChroma.collections["website_test"] = {"legacy-1": ("old text", {"source": "Website"})}
+        stats = self.update([{"url": "https://example.com/", "content": "home"}])
+        self.assertEqual((stats["full_rebuild"], stats["pages_added"], stats["chunks_embedded"]), (1, 1, 1))
+        self.assertEqual(self.stored_texts(), ["home"])
+
+        stats = self.update([{"url": "https://example.com/", "content": "home"}])
+        self.assertEqual((stats["full_rebuild"], stats["pages_unchanged"], stats["chunks_embedded"]), (0, 1, 0))
+
+    def test_unchanged_pdf_page_ranges_are_kept(self):
+        ranges = [{"url": "https://example.com/report.pdf", "content": f"pages {first}", "pages": [first, first + 15]}
+                  for first in (1, 17)]
+        self.update(ranges)
+        stats = self.update(ranges)
+        self.assertEqual((stats["pages_unchanged"], stats["chunks_deleted"], stats["chunks_embedded"]), (2, 0, 0))
+        self.assertEqual(self.stored_texts(), ["pages 1", "pages 17"])
+
+if __name__ == "__main__":
+    unittest.main()